@@ -0,0 +1,11 @@
+"""Reproducible performance benchmarks.
+
+Runs the application in-process against a temporary SQLite database seeded
+deterministically with 10k, 1M or 10M readings, and writes the results as
+JSON. A stored report can serve as the baseline of later runs; results that
+got worse by more than the threshold are flagged and fail the command.
+
+    python -m benchmarks run --size 1m --output baseline.json
+    python -m benchmarks run --size 1m --output current.json --baseline baseline.json
+    python -m benchmarks compare baseline.json current.json --threshold 0.15
+"""
@@ -0,0 +1,247 @@
+"""Command-line entry point: ``python -m benchmarks run|compare|load``."""
+
+import argparse
+import asyncio
+import logging
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import httpx
+
+from .fleet import Fleet
+from .loadgen import (
+    HttpTarget,
+    LoadShape,
+    ServiceTarget,
+    StepStats,
+    format_steps,
+    run_load,
+    step_results,
+)
+from .report import (
+    Result,
+    build_report,
+    compare_reports,
+    format_comparison,
+    load_report,
+    write_report,
+)
+
+DATABASE_NAME = "benchmark.db"
+
+
+def _configure(workdir: Path, database_url: str | None = None) -> None:
+    """
+    Point the application at the benchmark database before it is imported.
+
+    Background work that would compete with the measurements (scheduler,
+    line-protocol listener) and per-device admission limits are turned off;
+    other settings, such as SQLITE_SHARD_COUNT or HOT_TIER_ENABLED, are taken
+    from the environment so configurations can be benchmarked against each
+    other.
+    """
+    os.environ["DATABASE_URL"] = database_url or f"sqlite+aiosqlite:///{workdir / DATABASE_NAME}"
+    os.environ["ENABLE_SCHEDULER"] = "false"
+    os.environ["LINE_PROTOCOL_ENABLED"] = "false"
+    os.environ["ADMISSION_ENABLED"] = "false"
+    os.environ["SQL_ECHO"] = "false"
+
+
+def _copy_database(source: Path, target: Path) -> None:
+    """Copy the benchmark database files (main, WAL and shards) between directories."""
+    target.mkdir(parents=True, exist_ok=True)
+    for path in source.glob(f"{Path(DATABASE_NAME).stem}*"):
+        shutil.copy2(path, target / path.name)
+
+
+async def _run(args: argparse.Namespace, workdir: Path) -> list[Result]:
+    """Seed (or reuse) the dataset, then run the suites."""
+    from src.database import engine
+    from src.sharding import shards
+
+    from .seed import SIZES, seed_database
+    from .suites import run_suites
+
+    readings = SIZES[args.size]
+    seeded = await seed_database(readings, args.seed)
+    if seeded and args.data_dir:
+        # Keep a pristine copy of the seeded dataset for later runs
+        await engine.dispose()
+        if shards is not None:
+            await shards.dispose()
+        _copy_database(workdir, args.cache)
+
+    return await run_suites(readings, args.ingest_readings, args.query_requests, args.repeats)
+
+
+def run(args: argparse.Namespace) -> int:
+    """Run the benchmarks and write the JSON report."""
+    workdir = Path(tempfile.mkdtemp(prefix="benchmark-"))
+    try:
+        if args.data_dir:
+            shard_count = os.environ.get("SQLITE_SHARD_COUNT", "1")
+            args.cache = Path(args.data_dir) / f"{args.size}-seed{args.seed}-shards{shard_count}"
+            if args.cache.exists():
+                _copy_database(args.cache, workdir)
+        _configure(workdir)
+
+        results = asyncio.run(_run(args, workdir))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    parameters = {
+        "size": args.size,
+        "seed": args.seed,
+        "ingest_readings": args.ingest_readings,
+        "query_requests": args.query_requests,
+        "repeats": args.repeats,
+        "sqlite_shard_count": int(os.environ.get("SQLITE_SHARD_COUNT", "1")),
+        "hot_tier_enabled": os.environ.get("HOT_TIER_ENABLED", "false"),
+    }
+    report = build_report(results, parameters)
+    write_report(report, Path(args.output))
+    for result in results:
+        print(f"{result.key:<52} {result.value:>14.4g} {result.unit}")
+    print(f"Wrote {args.output}")
+
+    if args.baseline:
+        return _compare(load_report(Path(args.baseline)), report, args.threshold)
+    return 0
+
+
+async def _load(
+    args: argparse.Namespace, shape: LoadShape, rates: list[float]
+) -> list[StepStats]:
+    """Run the load steps against a server or the in-process service layer."""
+    fleet = Fleet(args.devices, args.seed)
+    if args.target == "http":
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=30.0) as client:
+            return await run_load(fleet, HttpTarget(client), shape, rates, args.seed)
+
+    from src.main import app
+
+    async with app.router.lifespan_context(app):
+        return await run_load(fleet, ServiceTarget(), shape, rates, args.seed)
+
+
+def load(args: argparse.Namespace) -> int:
+    """Drive a simulated fleet and report throughput, errors and latency per rate."""
+    shape = LoadShape(
+        duration=args.duration,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        flush_seconds=args.flush_seconds,
+        late_percent=args.late_percent,
+        late_seconds=args.late_seconds,
+        out_of_order_percent=args.out_of_order_percent,
+        burst_every=args.burst_every,
+        burst_seconds=args.burst_seconds,
+        burst_factor=args.burst_factor,
+    )
+    rates = [float(rate) for rate in args.rate.split(",")]
+    if args.devices < 1 or args.batch_size < 1 or any(rate <= 0 for rate in rates):
+        print("devices, batch size and rates must be positive", file=sys.stderr)
+        return 2
+
+    workdir = Path(tempfile.mkdtemp(prefix="loadgen-"))
+    try:
+        if args.target == "service":
+            _configure(workdir, args.database_url)
+        steps = asyncio.run(_load(args, shape, rates))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(format_steps(steps))
+    if args.output:
+        parameters = {
+            key: value for key, value in vars(args).items() if key not in ("handler", "output")
+        }
+        write_report(build_report(step_results(args.target, steps), parameters), Path(args.output))
+        print(f"Wrote {args.output}")
+    return 0
+
+
+def _compare(baseline: dict, current: dict, threshold: float) -> int:
+    """Print a comparison; non-zero when any result regressed past the threshold."""
+    if baseline.get("parameters") != current.get("parameters"):
+        print("warning: reports were produced with different parameters", file=sys.stderr)
+    changes, missing = compare_reports(baseline, current)
+    print(format_comparison(changes, missing, threshold))
+    regressions = [change for change in changes if change.regression > threshold]
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {threshold:.0%}")
+        return 1
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    """Compare two stored reports."""
+    baseline, current = load_report(Path(args.baseline)), load_report(Path(args.current))
+    return _compare(baseline, current, args.threshold)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Parse arguments and dispatch to a subcommand."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks and write a JSON report")
+    run_parser.add_argument("--size", choices=["10k", "1m", "10m"], default="10k")
+    run_parser.add_argument("--seed", type=int, default=1)
+    run_parser.add_argument("--output", default="benchmark-results.json")
+    run_parser.add_argument(
+        "--data-dir", help="Directory caching seeded datasets between runs (default: reseed)"
+    )
+    run_parser.add_argument("--ingest-readings", type=int, default=2000)
+    run_parser.add_argument("--query-requests", type=int, default=200)
+    run_parser.add_argument("--repeats", type=int, default=3)
+    run_parser.add_argument("--baseline", help="Compare the results against this report")
+    run_parser.add_argument("--threshold", type=float, default=0.10)
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="Compare a report against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument(
+        "--threshold", type=float, default=0.10, help="Relative slowdown flagged as a regression"
+    )
+    compare_parser.set_defaults(handler=compare)
+
+    load_parser = commands.add_parser(
+        "load", help="Drive a simulated device fleet to find the ingest saturation point"
+    )
+    load_parser.add_argument("--target", choices=["http", "service"], default="http")
+    load_parser.add_argument("--url", default="http://localhost:8000", help="Server (http target)")
+    load_parser.add_argument(
+        "--database-url",
+        help="Database of the service target (default: a temporary SQLite file)",
+    )
+    load_parser.add_argument("--devices", type=int, default=1000)
+    load_parser.add_argument(
+        "--rate", default="100", help="Readings per second; comma-separated for rate steps"
+    )
+    load_parser.add_argument("--duration", type=float, default=30.0, help="Seconds per step")
+    load_parser.add_argument("--batch-size", type=int, default=1)
+    load_parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight")
+    load_parser.add_argument("--flush-seconds", type=float, default=1.0)
+    load_parser.add_argument("--late-percent", type=float, default=0.0)
+    load_parser.add_argument("--late-seconds", type=float, default=60.0)
+    load_parser.add_argument("--out-of-order-percent", type=float, default=0.0)
+    load_parser.add_argument("--burst-every", type=float, default=0.0, help="0 disables bursts")
+    load_parser.add_argument("--burst-seconds", type=float, default=5.0)
+    load_parser.add_argument("--burst-factor", type=float, default=1.0)
+    load_parser.add_argument("--seed", type=int, default=1)
+    load_parser.add_argument("--output", help="Also write the results as a JSON report")
+    load_parser.set_defaults(handler=load)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
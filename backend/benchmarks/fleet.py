@@ -0,0 +1,141 @@
+"""Synthetic BME280 fleet.
+
+Each simulated device follows the model of the fake data producer
+(``docs/data_producer.md``): a bounded random walk per measurement, a daily
+temperature/humidity cycle and occasional weather events (storm, front,
+clear) lasting 10-50 readings, plus a per-device calibration offset so
+devices do not all report the same values. The cycle follows each reading's
+own timestamp rather than the wall clock, so historical and late readings
+stay consistent. All randomness comes from one seeded generator.
+"""
+
+import math
+import random
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+# (min, max, max drift per reading), as in the producer's defaults
+TEMPERATURE = (18.0, 28.0, 0.5)
+HUMIDITY = (30.0, 70.0, 2.0)
+PRESSURE = (1000.0, 1025.0, 0.5)
+NOISE_FACTOR = 0.1
+
+WEATHER_EVENT_PROBABILITY = 0.01
+# Event type -> (temperature, humidity, pressure) offset per reading
+WEATHER_OFFSETS = {
+    "storm": (-1.0, 5.0, -2.0),
+    "front": (2.0, -3.0, 3.0),
+    "clear": (0.5, -5.0, 1.5),
+}
+
+WELLS = ("W-1", "W-2", "W-3", "W-4")
+LOCATIONS = ("north", "south", "east", "west", "plant")
+
+
+def _drift(
+    rng: random.Random, value: float, bounds: tuple[float, float, float], offset: float
+) -> float:
+    """Random walk step that bounces back softly off the bounds."""
+    low, high, max_drift = bounds
+    value += rng.uniform(-max_drift, max_drift) + offset
+    if value < low:
+        value = low + (low - value) * 0.5
+    elif value > high:
+        value = high - (value - high) * 0.5
+    return max(low, min(high, value))
+
+
+@dataclass(slots=True)
+class SimulatedDevice:
+    """State of one simulated BME280."""
+
+    device_id: str
+    metadata: dict[str, str]
+    temperature_c: float
+    humidity: float
+    pressure_hpa: float
+    # Fixed calibration error of this device's temperature sensor
+    temperature_bias: float
+    weather: str | None = None
+    weather_remaining: int = 0
+
+    def reading(self, rng: random.Random, timestamp: datetime) -> dict[str, Any]:
+        """Advance the device by one reading taken at ``timestamp``."""
+        hour = timestamp.hour + timestamp.minute / 60
+        # Warmest at 14:00, coolest at 02:00; humidity moves the other way
+        cycle = math.sin((hour - 8) * math.pi / 12)
+
+        if self.weather is None and rng.random() < WEATHER_EVENT_PROBABILITY:
+            self.weather = rng.choice(tuple(WEATHER_OFFSETS))
+            self.weather_remaining = rng.randint(10, 50)
+        temperature_offset, humidity_offset, pressure_offset = (
+            WEATHER_OFFSETS[self.weather] if self.weather else (0.0, 0.0, 0.0)
+        )
+        if self.weather:
+            self.weather_remaining -= 1
+            if self.weather_remaining <= 0:
+                self.weather = None
+
+        self.temperature_c = _drift(
+            rng, self.temperature_c, TEMPERATURE, (3.0 * cycle + temperature_offset) * 0.1
+        )
+        self.humidity = _drift(
+            rng, self.humidity, HUMIDITY, (-10.0 * cycle + humidity_offset) * 0.1
+        )
+        self.pressure_hpa = _drift(rng, self.pressure_hpa, PRESSURE, pressure_offset * 0.1)
+
+        return {
+            "device_id": self.device_id,
+            "temperature_c": round(
+                self.temperature_c + self.temperature_bias + rng.gauss(0, NOISE_FACTOR * 0.2), 2
+            ),
+            "humidity": round(
+                min(100.0, max(0.0, self.humidity + rng.gauss(0, NOISE_FACTOR))), 2
+            ),
+            "pressure_hpa": round(self.pressure_hpa + rng.gauss(0, NOISE_FACTOR * 0.3), 2),
+            "timestamp": timestamp.isoformat(),
+            "metadata": self.metadata,
+        }
+
+
+class Fleet:
+    """A fixed set of simulated devices reporting in round-robin order."""
+
+    def __init__(self, size: int, seed: int = 1, prefix: str = "load") -> None:
+        """
+        Create a fleet with seeded starting values.
+
+        Args:
+            size: Number of devices
+            seed: Random seed
+            prefix: Device ID prefix
+        """
+        self.rng = random.Random(seed)
+        self.devices = [
+            SimulatedDevice(
+                device_id=f"{prefix}-{index:05d}",
+                metadata={
+                    "location": LOCATIONS[index % len(LOCATIONS)],
+                    "well": WELLS[index % len(WELLS)],
+                },
+                temperature_c=self.rng.uniform(TEMPERATURE[0] + 2, TEMPERATURE[1] - 2),
+                humidity=self.rng.uniform(HUMIDITY[0] + 5, HUMIDITY[1] - 5),
+                pressure_hpa=self.rng.uniform(PRESSURE[0] + 5, PRESSURE[1] - 5),
+                temperature_bias=self.rng.gauss(0, 0.3),
+            )
+            for index in range(size)
+        ]
+        self._next = 0
+
+    def __len__(self) -> int:
+        return len(self.devices)
+
+    def readings(self, count: int, timestamp: datetime) -> list[dict[str, Any]]:
+        """Take the next ``count`` readings, cycling through the devices."""
+        batch = []
+        for _ in range(count):
+            device = self.devices[self._next]
+            self._next = (self._next + 1) % len(self.devices)
+            batch.append(device.reading(self.rng, timestamp))
+        return batch
@@ -0,0 +1,350 @@
+"""High-rate fleet load generator.
+
+Drives a simulated fleet (see ``fleet``) at a target rate against either a
+running server over HTTP or the ingest service layer in-process, and reports
+achieved throughput, error rate and request latency for each rate step.
+Running several increasing steps finds the saturation point of a storage
+mode: the first step whose achieved rate falls short of its target or whose
+error rate climbs.
+
+Load shape:
+
+* rate: readings per second across the fleet, so each device reports every
+  ``devices / rate`` seconds
+* batch size: 1 posts single readings, larger sizes use the batch endpoint
+  (or bulk insert); partial batches are flushed after ``flush_seconds``
+* late arrival: a share of readings is held back for ``late_seconds`` and
+  then sent with its original timestamp, behind newer readings
+* out of order: a share of readings is backdated by up to two of its
+  device's reporting intervals, so it lands before the previous reading
+* bursts: every ``burst_every`` seconds the rate is multiplied by
+  ``burst_factor`` for ``burst_seconds``; the offered rate reported for a
+  step is the mean rate including bursts
+
+The generator is open loop but keeps at most ``concurrency`` requests in
+flight. When the target cannot keep up, it falls behind the schedule instead
+of piling up requests, which shows as an achieved rate below target.
+"""
+
+import asyncio
+import heapq
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Protocol
+
+import httpx
+
+from .fleet import Fleet
+from .report import Result, percentile
+
+# Achieved/offered rate ratio and error rate beyond which a step counts as saturated
+SATURATION_THROUGHPUT_RATIO = 0.95
+SATURATION_ERROR_RATE = 0.01
+
+TICK_SECONDS = 0.01
+
+
+class TargetError(Exception):
+    """A send that the target rejected or failed."""
+
+    def __init__(self, kind: str) -> None:
+        super().__init__(kind)
+        self.kind = kind
+
+
+class Target(Protocol):
+    """Where generated readings are sent."""
+
+    name: str
+
+    async def send(self, readings: list[dict[str, Any]]) -> None:
+        """Store readings, raising TargetError if they were not stored."""
+        ...
+
+
+class HttpTarget:
+    """Sends readings to the ingest endpoints of a running server."""
+
+    name = "http"
+
+    def __init__(self, client: httpx.AsyncClient) -> None:
+        self.client = client
+
+    async def send(self, readings: list[dict[str, Any]]) -> None:
+        try:
+            if len(readings) == 1:
+                response = await self.client.post("/api/v1/sensors/bme280", json=readings[0])
+            else:
+                response = await self.client.post(
+                    "/api/v1/sensors/bme280/batch", json={"readings": readings}
+                )
+        except httpx.HTTPError as e:
+            raise TargetError(type(e).__name__) from e
+        if response.status_code != 201:
+            raise TargetError(f"http_{response.status_code}")
+
+
+class ServiceTarget:
+    """Stores readings through the ingest service layer, one session per send."""
+
+    name = "service"
+
+    async def send(self, readings: list[dict[str, Any]]) -> None:
+        # Imported here so the HTTP target runs without the application's settings
+        from src.database import AsyncSessionLocal
+        from src.schemas.sensor import BME280Reading
+        from src.services.data_ingestion import create_sensor_reading, create_sensor_readings
+
+        try:
+            validated = [BME280Reading.model_validate(reading) for reading in readings]
+            async with AsyncSessionLocal() as db:
+                if len(validated) == 1:
+                    await create_sensor_reading(db, validated[0])
+                else:
+                    await create_sensor_readings(db, validated)
+                await db.commit()
+        except Exception as e:
+            raise TargetError(type(e).__name__) from e
+
+
+@dataclass(slots=True)
+class LoadShape:
+    """How readings are generated and sent."""
+
+    duration: float = 30.0
+    batch_size: int = 1
+    concurrency: int = 32
+    flush_seconds: float = 1.0
+    late_percent: float = 0.0
+    late_seconds: float = 60.0
+    out_of_order_percent: float = 0.0
+    burst_every: float = 0.0
+    burst_seconds: float = 5.0
+    burst_factor: float = 1.0
+
+    def rate_at(self, rate: float, elapsed: float) -> float:
+        """Target rate at ``elapsed`` seconds into a step, including bursts."""
+        if self.burst_every > 0 and elapsed % self.burst_every < self.burst_seconds:
+            return rate * self.burst_factor
+        return rate
+
+
+@dataclass(slots=True)
+class StepStats:
+    """Outcome of running one target rate."""
+
+    target_rate: float
+    # Mean rate the schedule called for, including bursts
+    offered_rate: float = 0.0
+    generated: int = 0
+    stored: int = 0
+    requests: int = 0
+    failed_requests: int = 0
+    elapsed: float = 0.0
+    # Seconds the generator was behind schedule when it finished generating
+    schedule_lag: float = 0.0
+    latencies: list[float] = field(default_factory=list)
+    errors: Counter[str] = field(default_factory=Counter)
+
+    @property
+    def achieved_rate(self) -> float:
+        """Readings stored per second of wall-clock time."""
+        return self.stored / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        """Share of requests that failed."""
+        return self.failed_requests / self.requests if self.requests else 0.0
+
+    @property
+    def saturated(self) -> bool:
+        """Whether the target fell short of the rate or started failing."""
+        return (
+            self.achieved_rate < SATURATION_THROUGHPUT_RATIO * self.offered_rate
+            or self.error_rate > SATURATION_ERROR_RATE
+        )
+
+    def latency_ms(self, q: float) -> float | None:
+        """Request latency percentile in milliseconds."""
+        return percentile(self.latencies, q) * 1000 if self.latencies else None
+
+
+async def run_step(
+    fleet: Fleet, target: Target, shape: LoadShape, rate: float, seed: int = 1
+) -> StepStats:
+    """
+    Generate and send readings at one target rate for ``shape.duration`` seconds.
+
+    Args:
+        fleet: Simulated devices
+        target: Where readings are sent
+        shape: Batching, lateness, ordering and burst settings
+        rate: Target readings per second (before bursts)
+        seed: Seed of the late/out-of-order choices
+
+    Returns:
+        Counts, errors and latencies of the step
+    """
+    rng = random.Random(seed)
+    stats = StepStats(target_rate=rate)
+    slots = asyncio.Semaphore(shape.concurrency)
+    tasks: set[asyncio.Task[None]] = set()
+    # Backdating of out-of-order readings: up to two reporting intervals
+    max_backdate = 2 * len(fleet) / rate
+    pending: list[dict[str, Any]] = []
+    pending_since = 0.0
+    # (release time, sequence, reading) of readings held back as late
+    held: list[tuple[float, int, dict[str, Any]]] = []
+
+    async def deliver(batch: list[dict[str, Any]]) -> None:
+        started = time.perf_counter()
+        try:
+            await target.send(batch)
+            stats.stored += len(batch)
+        except TargetError as e:
+            stats.failed_requests += 1
+            stats.errors[e.kind] += 1
+        finally:
+            stats.latencies.append(time.perf_counter() - started)
+            slots.release()
+
+    async def submit(batch: list[dict[str, Any]]) -> None:
+        # Waiting here is what makes the generator fall behind a saturated target
+        await slots.acquire()
+        stats.requests += 1
+        task = asyncio.create_task(deliver(batch))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    started = time.perf_counter()
+    last = 0.0
+    credit = 0.0
+    scheduled = 0.0
+    while (elapsed := time.perf_counter() - started) < shape.duration:
+        current = shape.rate_at(rate, elapsed)
+        credit += current * (elapsed - last)
+        scheduled += current * (elapsed - last)
+        last = elapsed
+        due = int(credit)
+        credit -= due
+
+        now = datetime.utcnow()
+        for reading in fleet.readings(due, now):
+            stats.generated += 1
+            if rng.random() * 100 < shape.out_of_order_percent:
+                backdated = now - timedelta(seconds=rng.uniform(0, max_backdate))
+                reading["timestamp"] = backdated.isoformat()
+            if rng.random() * 100 < shape.late_percent:
+                heapq.heappush(held, (elapsed + shape.late_seconds, stats.generated, reading))
+            else:
+                if not pending:
+                    pending_since = elapsed
+                pending.append(reading)
+        while held and held[0][0] <= elapsed:
+            if not pending:
+                pending_since = elapsed
+            pending.append(heapq.heappop(held)[2])
+
+        while len(pending) >= shape.batch_size:
+            batch, pending = pending[: shape.batch_size], pending[shape.batch_size :]
+            await submit(batch)
+        if pending and elapsed - pending_since >= shape.flush_seconds:
+            batch, pending = pending, []
+            await submit(batch)
+
+        await asyncio.sleep(TICK_SECONDS)
+
+    stats.offered_rate = scheduled / elapsed
+    stats.schedule_lag = (scheduled - stats.generated) / rate
+    # Readings still held back are sent now; they arrive late either way
+    pending.extend(reading for _, _, reading in sorted(held))
+    for offset in range(0, len(pending), shape.batch_size):
+        await submit(pending[offset : offset + shape.batch_size])
+    if tasks:
+        await asyncio.gather(*tasks)
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+
+async def run_load(
+    fleet: Fleet, target: Target, shape: LoadShape, rates: list[float], seed: int = 1
+) -> list[StepStats]:
+    """
+    Run increasing rate steps, stopping after the second saturated step.
+
+    Args:
+        fleet: Simulated devices
+        target: Where readings are sent
+        shape: Batching, lateness, ordering and burst settings
+        rates: Target rates in readings per second, one step each
+        seed: Seed of the late/out-of-order choices
+
+    Returns:
+        Statistics of every step that ran
+    """
+    steps: list[StepStats] = []
+    for index, rate in enumerate(rates):
+        steps.append(await run_step(fleet, target, shape, rate, seed + index))
+        if sum(step.saturated for step in steps) >= 2:
+            break
+    return steps
+
+
+def saturation_rate(steps: list[StepStats]) -> float | None:
+    """Highest target rate sustained before the first saturated step."""
+    sustained = None
+    for step in steps:
+        if step.saturated:
+            break
+        sustained = step.target_rate
+    return sustained
+
+
+def format_steps(steps: list[StepStats]) -> str:
+    """Render step statistics as a plain-text table."""
+    lines = [
+        f"{'target/s':>10} {'offered/s':>10} {'achieved/s':>11} {'readings':>9} "
+        f"{'requests':>9} {'errors':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} "
+        f"{'max ms':>8}  notes"
+    ]
+    for step in steps:
+        latency = [step.latency_ms(q) for q in (50, 90, 99, 100)]
+        notes = ", ".join(f"{kind} x{count}" for kind, count in step.errors.most_common(3))
+        if step.schedule_lag > 1:
+            notes = f"{step.schedule_lag:.1f}s behind schedule" + (f"; {notes}" if notes else "")
+        if step.saturated:
+            notes = "SATURATED" + (f"; {notes}" if notes else "")
+        lines.append(
+            f"{step.target_rate:>10.0f} {step.offered_rate:>10.1f} "
+            f"{step.achieved_rate:>11.1f} {step.stored:>9} {step.requests:>9} "
+            f"{step.error_rate:>8.2%} "
+            + " ".join(f"{value:>8.1f}" if value is not None else f"{'-':>8}" for value in latency)
+            + f"  {notes}"
+        )
+    sustained = saturation_rate(steps)
+    if sustained is None:
+        lines.append("Saturated at the first step")
+    elif any(step.saturated for step in steps):
+        lines.append(f"Sustained {sustained:.0f} readings/s before saturating")
+    else:
+        lines.append(f"Not saturated up to {sustained:.0f} readings/s")
+    return "\n".join(lines)
+
+
+def step_results(target: str, steps: list[StepStats]) -> list[Result]:
+    """Convert step statistics into report results."""
+    results = []
+    for step in steps:
+        name = f"load.{target}.rate_{step.target_rate:g}"
+        results.append(
+            Result(name, "achieved_readings_per_second", step.achieved_rate, "1/s", "higher")
+        )
+        results.append(Result(name, "error_rate", step.error_rate, "ratio", "lower"))
+        for q in (50, 99):
+            value = step.latency_ms(q)
+            if value is not None:
+                results.append(Result(name, f"p{q}_ms", value, "ms", "lower"))
+    return results
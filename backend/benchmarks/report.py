@@ -0,0 +1,171 @@
+"""Benchmark results, JSON reports and baseline comparison.
+
+This module does not import the application, so ``compare`` runs without a
+database or configured environment.
+"""
+
+import json
+import math
+import platform
+import subprocess
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+REPORT_VERSION = 1
+
+
+@dataclass(slots=True)
+class Result:
+    """One measured value."""
+
+    name: str
+    metric: str
+    value: float
+    unit: str
+    # "higher" or "lower": which direction is an improvement
+    better: str
+
+    @property
+    def key(self) -> str:
+        """Identifier matched between reports."""
+        return f"{self.name}:{self.metric}"
+
+
+@dataclass(slots=True)
+class Change:
+    """A result compared against its baseline."""
+
+    key: str
+    baseline: float
+    current: float
+    unit: str
+    better: str
+
+    @property
+    def relative(self) -> float:
+        """Relative change of the value from the baseline."""
+        if self.baseline:
+            return (self.current - self.baseline) / abs(self.baseline)
+        return 0.0 if not self.current else math.inf
+
+    @property
+    def regression(self) -> float:
+        """Relative change in the worse direction (negative for improvements)."""
+        return -self.relative if self.better == "higher" else self.relative
+
+
+def percentile(values: list[float], q: float) -> float:
+    """
+    Nearest-rank percentile of measured values.
+
+    Args:
+        values: Measurements (need not be sorted)
+        q: Percentile between 0 and 100
+
+    Returns:
+        The smallest value with at least q% of values at or below it
+    """
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _git_commit() -> str | None:
+    """Commit of the working tree, if it is a git checkout."""
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip() or None
+
+
+def build_report(results: list[Result], parameters: dict[str, Any]) -> dict[str, Any]:
+    """
+    Assemble a JSON-compatible report.
+
+    Args:
+        results: Measured values
+        parameters: Run parameters (size, seed, repeats, ...)
+
+    Returns:
+        Report with run metadata and one entry per result
+    """
+    return {
+        "version": REPORT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": parameters,
+        "results": [asdict(result) for result in results],
+    }
+
+
+def write_report(report: dict[str, Any], path: Path) -> None:
+    """Write a report as indented JSON."""
+    path.write_text(json.dumps(report, indent=2) + "\n")
+
+
+def load_report(path: Path) -> dict[str, Any]:
+    """
+    Read a report written by write_report.
+
+    Raises:
+        ValueError: If the file is not a benchmark report
+    """
+    report = json.loads(path.read_text())
+    if not isinstance(report, dict) or "results" not in report:
+        raise ValueError(f"{path} is not a benchmark report")
+    return report
+
+
+def compare_reports(
+    baseline: dict[str, Any], current: dict[str, Any]
+) -> tuple[list[Change], list[str]]:
+    """
+    Compare every result present in both reports.
+
+    Args:
+        baseline: Stored baseline report
+        current: Report of the run under test
+
+    Returns:
+        Changes for results in both reports (worst first), and the keys of
+        baseline results missing from the current report
+    """
+    before = {Result(**entry).key: Result(**entry) for entry in baseline["results"]}
+    changes: list[Change] = []
+    seen: set[str] = set()
+    for entry in current["results"]:
+        result = Result(**entry)
+        old = before.get(result.key)
+        if old is None:
+            continue
+        seen.add(result.key)
+        changes.append(Change(result.key, old.value, result.value, result.unit, result.better))
+
+    changes.sort(key=lambda change: change.regression, reverse=True)
+    missing = [key for key in before if key not in seen]
+    return changes, missing
+
+
+def format_comparison(changes: list[Change], missing: list[str], threshold: float) -> str:
+    """Render a comparison as a plain-text table, marking regressions."""
+    lines = [f"{'benchmark':<52} {'baseline':>14} {'current':>14} {'change':>9}"]
+    for change in changes:
+        flag = "  REGRESSION" if change.regression > threshold else ""
+        lines.append(
+            f"{change.key:<52} {change.baseline:>14.4g} {change.current:>14.4g} "
+            f"{change.relative:>+9.1%}{flag}"
+        )
+    for key in missing:
+        lines.append(f"{key:<52} missing from current run")
+    return "\n".join(lines)
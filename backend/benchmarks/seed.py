@@ -0,0 +1,138 @@
+"""Deterministic benchmark dataset.
+
+Readings are generated from a seeded random number generator on a fixed
+one-minute cadence ending at ``DATA_END``, so the same size and seed always
+produce the same rows. They are bulk inserted straight into
+``sensor_readings`` (and its shards); device state, rollups and the series
+index are then built by the application's own startup rebuild.
+"""
+
+import logging
+import math
+import random
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import func, insert, select
+
+from src.database import engine, init_db
+from src.models import SensorReading
+from src.sharding import shards
+
+logger = logging.getLogger(__name__)
+
+# Named dataset sizes accepted by ``--size``
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+
+DATA_END = datetime(2024, 1, 1)
+CADENCE = timedelta(minutes=1)
+INSERT_CHUNK_SIZE = 20_000
+
+WELLS = ("W-1", "W-2", "W-3", "W-4")
+LOCATIONS = ("north", "south", "east", "west", "plant")
+
+
+def device_count(readings: int) -> int:
+    """Devices in a dataset: one per 10k readings, between 10 and 1000."""
+    return min(1000, max(10, readings // 10_000))
+
+
+def device_ids(readings: int) -> list[str]:
+    """Device IDs of a dataset, in generation order."""
+    return [f"bench-{index:04d}" for index in range(device_count(readings))]
+
+
+def data_start(readings: int) -> datetime:
+    """Timestamp of the first reading of a dataset."""
+    per_device = math.ceil(readings / device_count(readings))
+    return DATA_END - CADENCE * (per_device - 1)
+
+
+def generate_rows(readings: int, seed: int) -> Iterator[list[dict[str, Any]]]:
+    """
+    Generate a dataset in insertion-sized chunks, oldest minute first.
+
+    Args:
+        readings: Total readings to generate
+        seed: Random seed
+
+    Yields:
+        Lists of at most INSERT_CHUNK_SIZE sensor_readings rows
+    """
+    rng = random.Random(seed)
+    devices = device_ids(readings)
+    metadata = [
+        {"location": LOCATIONS[index % len(LOCATIONS)], "well": WELLS[index % len(WELLS)]}
+        for index in range(len(devices))
+    ]
+    offsets = [rng.uniform(-3.0, 3.0) for _ in devices]
+    start = data_start(readings)
+
+    chunk: list[dict[str, Any]] = []
+    produced = 0
+    minute = 0
+    while produced < readings:
+        timestamp = start + CADENCE * minute
+        # Daily temperature cycle
+        daily = math.sin(2 * math.pi * minute / 1440)
+        for index, device_id in enumerate(devices):
+            if produced == readings:
+                break
+            chunk.append(
+                {
+                    "sensor_type": "bme280",
+                    "device_id": device_id,
+                    "timestamp": timestamp,
+                    "temperature_c": round(21 + offsets[index] + 4 * daily + rng.gauss(0, 0.3), 2),
+                    "humidity": round(45 - 10 * daily + rng.gauss(0, 1.0), 2),
+                    "pressure_hpa": round(1013 + rng.gauss(0, 0.8), 2),
+                    "extra_metadata": metadata[index],
+                    "created_at": timestamp,
+                }
+            )
+            produced += 1
+            if len(chunk) == INSERT_CHUNK_SIZE:
+                yield chunk
+                chunk = []
+        minute += 1
+    if chunk:
+        yield chunk
+
+
+async def seed_database(readings: int, seed: int) -> bool:
+    """
+    Create the schema and load a dataset unless readings are already stored.
+
+    Args:
+        readings: Total readings to generate
+        seed: Random seed
+
+    Returns:
+        True if the dataset was loaded, False if an existing one was reused
+    """
+    await init_db()
+    if shards is not None:
+        await shards.init()
+        engines = shards.engines
+    else:
+        engines = [engine]
+
+    for target in engines:
+        async with target.connect() as conn:
+            if await conn.scalar(select(func.count()).select_from(SensorReading.__table__)):
+                return False
+
+    statement = insert(SensorReading.__table__)
+    for chunk in generate_rows(readings, seed):
+        if shards is None:
+            parts = {0: chunk}
+        else:
+            parts = {}
+            for row in chunk:
+                parts.setdefault(shards.index_for(row["device_id"]), []).append(row)
+        for index, part in parts.items():
+            async with engines[index].begin() as conn:
+                await conn.execute(statement, part)
+    logger.info(f"Seeded {readings} readings")
+    return True
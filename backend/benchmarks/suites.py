@@ -0,0 +1,204 @@
+"""Benchmarks of ingest, raw queries, processing and the scheduler tick.
+
+Every benchmark drives the real application in-process: HTTP benchmarks go
+through the ASGI app (middleware, validation and serialization included)
+without a network socket, and processing benchmarks call the services.
+"""
+
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+from statistics import median
+from typing import Any
+
+import httpx
+
+from src.config import settings
+from src.database import AsyncSessionLocal
+from src.main import app
+from src.services.data_processing import process_sensor_data
+from src.services.scheduler import calculate_rolling_average_task
+
+from .report import Result, percentile
+from .seed import DATA_END, device_ids
+
+RAW_PAGE_SIZES = (10, 100, 1000)
+# Untimed requests per page size, so connection pools and caches are warm
+RAW_WARMUP_REQUESTS = 10
+BATCH_SIZES = (100, 1000)
+PROCESSING_WINDOWS = {"1h": timedelta(hours=1), "1d": timedelta(days=1), "7d": timedelta(days=7)}
+PROCESSOR = "average"
+
+
+def _reading(device_id: str, timestamp: datetime, index: int) -> dict[str, Any]:
+    """Request body of one ingested reading."""
+    return {
+        "device_id": device_id,
+        "temperature_c": 20 + (index % 50) / 10,
+        "humidity": 45.0,
+        "pressure_hpa": 1013.0,
+        "timestamp": timestamp.isoformat(),
+    }
+
+
+async def _timed(fn: Callable[[], Awaitable[Any]]) -> float:
+    """Seconds taken by one call."""
+    started = time.perf_counter()
+    await fn()
+    return time.perf_counter() - started
+
+
+async def bench_ingest(client: httpx.AsyncClient, readings: int) -> list[Result]:
+    """
+    Measure single-reading and batch ingest throughput.
+
+    Readings go to devices outside the seeded set, a day after the seeded
+    data ends, so they never overlap it.
+    """
+    results = []
+    start = DATA_END + timedelta(days=1)
+
+    async def single() -> None:
+        for index in range(readings):
+            response = await client.post(
+                "/api/v1/sensors/bme280",
+                json=_reading("ingest-single", start + timedelta(seconds=index), index),
+            )
+            response.raise_for_status()
+
+    elapsed = await _timed(single)
+    results.append(
+        Result("ingest.single", "readings_per_second", readings / elapsed, "1/s", "higher")
+    )
+
+    for size in BATCH_SIZES:
+        batches = max(1, readings // size)
+
+        async def batch() -> None:
+            for number in range(batches):
+                first = start + timedelta(hours=number + 1)
+                body = {
+                    "readings": [
+                        _reading(f"ingest-batch-{size}", first + timedelta(seconds=i), i)
+                        for i in range(size)
+                    ]
+                }
+                response = await client.post("/api/v1/sensors/bme280/batch", json=body)
+                response.raise_for_status()
+
+        elapsed = await _timed(batch)
+        results.append(
+            Result(
+                f"ingest.batch.{size}",
+                "readings_per_second",
+                batches * size / elapsed,
+                "1/s",
+                "higher",
+            )
+        )
+    return results
+
+
+async def bench_raw_queries(
+    client: httpx.AsyncClient, dataset_size: int, requests: int
+) -> list[Result]:
+    """Measure /data/raw latency percentiles per page size, rotating over devices."""
+    results = []
+    devices = device_ids(dataset_size)
+    for limit in RAW_PAGE_SIZES:
+        latencies = []
+        for index in range(-RAW_WARMUP_REQUESTS, requests):
+            params = {"device_id": devices[index % len(devices)], "limit": limit}
+            started = time.perf_counter()
+            response = await client.get("/api/v1/data/raw", params=params)
+            elapsed = time.perf_counter() - started
+            response.raise_for_status()
+            if index >= 0:
+                latencies.append(elapsed)
+        for q in (50, 99):
+            results.append(
+                Result(
+                    f"query.raw.limit_{limit}",
+                    f"p{q}_ms",
+                    percentile(latencies, q) * 1000,
+                    "ms",
+                    "lower",
+                )
+            )
+    return results
+
+
+async def _process(window: timedelta) -> None:
+    """Run the benchmark processor over the last ``window`` of seeded data."""
+    async with AsyncSessionLocal() as db:
+        await process_sensor_data(db, PROCESSOR, DATA_END - window, DATA_END)
+
+
+async def bench_processing(repeats: int) -> list[Result]:
+    """
+    Measure process_sensor_data time and peak Python memory per window size.
+
+    Time is the median of ``repeats`` runs; peak memory comes from one extra
+    run under tracemalloc, which would otherwise slow the timed runs.
+    """
+    results = []
+    for label, window in PROCESSING_WINDOWS.items():
+        timings = [await _timed(lambda: _process(window)) for _ in range(repeats)]
+        tracemalloc.start()
+        try:
+            await _process(window)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        name = f"processing.{PROCESSOR}.{label}"
+        results.append(Result(name, "seconds", median(timings), "s", "lower"))
+        results.append(Result(name, "peak_memory_mb", peak / 1024 / 1024, "MB", "lower"))
+    return results
+
+
+async def bench_scheduler_tick(repeats: int) -> list[Result]:
+    """Measure one rolling-average scheduler tick over the end of the seeded data."""
+    timings = [
+        await _timed(lambda: calculate_rolling_average_task(DATA_END)) for _ in range(repeats)
+    ]
+    return [
+        Result(
+            f"scheduler.rolling_average.{settings.rolling_average_window_hours}h",
+            "seconds",
+            median(timings),
+            "s",
+            "lower",
+        )
+    ]
+
+
+async def run_suites(
+    dataset_size: int,
+    ingest_readings: int,
+    query_requests: int,
+    repeats: int,
+) -> list[Result]:
+    """
+    Start the application and run every benchmark against it.
+
+    Args:
+        dataset_size: Seeded readings (used to pick query devices)
+        ingest_readings: Readings sent by each ingest benchmark
+        query_requests: Requests per raw query page size
+        repeats: Timed runs per processing window and scheduler tick
+
+    Returns:
+        Results in suite order
+    """
+    results = []
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            # Queries and processing run on the seeded data alone, before ingest adds to it
+            results += await bench_raw_queries(client, dataset_size, query_requests)
+            results += await bench_processing(repeats)
+            results += await bench_scheduler_tick(repeats)
+            results += await bench_ingest(client, ingest_readings)
+    return results
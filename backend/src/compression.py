@@ -0,0 +1,118 @@
+"""HTTP body compression.
+
+Responses from the query endpoints are compressed with brotli (when the
+optional ``brotli`` package is installed) or gzip, negotiated from the
+client's ``Accept-Encoding``. Ingest routes accept gzip-compressed JSON
+request bodies (``Content-Encoding: gzip``), decompressed with a size cap.
+"""
+
+import gzip
+import zlib
+from collections.abc import Callable, Coroutine
+from typing import Any
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
+
+from .config import settings
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """
+    Pick a response encoding from an Accept-Encoding header.
+
+    Args:
+        accept_encoding: Header value, e.g. "gzip, deflate, br;q=0.9"
+
+    Returns:
+        "br", "gzip" or None for identity
+    """
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best = max(candidates, key=lambda name: accepted.get(name, accepted.get("*", 0.0)))
+    return best if accepted.get(best, accepted.get("*", 0.0)) > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a body with the given encoding ("br" or "gzip")."""
+    if encoding == "br":
+        return bytes(brotli.compress(body, quality=BROTLI_QUALITY))
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def compress_response(response: Response, request: Request | None) -> Response:
+    """
+    Compress a response body in place if the client accepts it.
+
+    Bodies smaller than ``response_compression_min_bytes`` are left as is.
+    """
+    response.headers["Vary"] = "Accept-Encoding"
+    if request is None or len(response.body) < settings.response_compression_min_bytes:
+        return response
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    if encoding is None:
+        return response
+    response.body = compress(bytes(response.body), encoding)
+    response.headers["Content-Encoding"] = encoding
+    response.headers["Content-Length"] = str(len(response.body))
+    return response
+
+
+def _gunzip(body: bytes, limit: int) -> bytes:
+    """Decompress a gzip body, refusing output larger than limit bytes."""
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    try:
+        data = decompressor.decompress(body, limit)
+    except zlib.error as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid gzip body: {e}"
+        ) from e
+    if decompressor.unconsumed_tail:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Decompressed body exceeds {limit} bytes",
+        )
+    return data
+
+
+class GzipRequest(Request):
+    """Request whose body is transparently gunzipped when Content-Encoding is gzip."""
+
+    async def body(self) -> bytes:
+        if not hasattr(self, "_body"):
+            body = await super().body()
+            if "gzip" in self.headers.get("content-encoding", "").lower():
+                body = _gunzip(body, settings.max_decompressed_body_bytes)
+            self._body = body
+        return self._body
+
+
+class GzipRoute(APIRoute):
+    """API route accepting gzip-compressed request bodies."""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def gzip_handler(request: Request) -> Response:
+            return await handler(GzipRequest(request.scope, request.receive))
+
+        return gzip_handler
@@ -15,6 +15,8 @@ class Settings(BaseSettings):
 
     # Database
     database_url: str = "sqlite+aiosqlite:///./sensor_data.db"
+    sqlite_shard_count: int = 1  # >1 partitions sensor_readings across N SQLite files
+    sql_echo: bool = False  # Log every SQL statement (very verbose)
 
     # CORS
     cors_origins: str = "http://localhost:5173,http://localhost:3000"
@@ -27,12 +29,89 @@ class Settings(BaseSettings):
     rolling_average_interval_minutes: int = 1  # How often to calculate rolling average
     rolling_average_window_hours: int = 1  # Time window for rolling average
     rolling_average_sensor_type: str = "bme280"  # Default sensor type to process
+    # Run scheduled jobs in one process only (a database lease, for multi-worker deployments)
+    scheduler_leader_election: bool = True
+    scheduler_lease_seconds: float = 10.0  # Leadership lapses this long after the last renewal
+    scheduler_lease_renew_seconds: float = 3.0  # How often the leader renews and others retry
+
+    # Line-protocol ingest listener
+    line_protocol_enabled: bool = False
+    line_protocol_host: str = "0.0.0.0"
+    line_protocol_tcp_port: int = 8094  # 0 disables the TCP listener
+    line_protocol_udp_port: int = 8094  # 0 disables the UDP listener
+    line_protocol_batch_size: int = 5000  # Max rows per bulk insert
+    line_protocol_flush_interval_ms: int = 200  # Max time rows wait before being written
+    line_protocol_max_pending_batches: int = 64  # Parsed batches buffered before backpressure
+
+    # Ingest admission control
+    admission_enabled: bool = True
+    admission_device_rate: float = 5.0  # Sustained readings per second per device
+    # Readings a device may send in one burst; a larger batch is admitted but
+    # locks the device out for at most about burst / rate seconds
+    admission_device_burst: int = 100
+    admission_max_in_flight: int = 64  # Concurrent ingest requests before shedding (429)
+
+    # CSV measurement upload
+    csv_upload_chunk_bytes: int = 1024 * 1024  # Bytes parsed, validated and inserted per chunk
+    csv_upload_max_errors: int = 100  # Rejected rows reported per upload
+
+    # In-memory hot tier of recent readings (single-process deployments only)
+    hot_tier_enabled: bool = False
+    hot_tier_retention_hours: float = 24.0  # Window of recent readings served from memory
+    hot_tier_max_points_per_device: int = 100_000  # ~32 bytes per reading
+
+    # Device health
+    device_heartbeat_miss_threshold: int = 3  # Missed reporting intervals before "offline"
+    device_default_interval_seconds: float = 300.0  # Assumed cadence until two readings arrive
+
+    # Streaming anomaly detection at ingest
+    anomaly_detection_enabled: bool = True
+    anomaly_ewma_alpha: float = 0.1  # Weight of each reading in the running mean and variance
+    anomaly_warmup_readings: int = 20  # Readings per device measurement before spikes are scored
+    anomaly_z_threshold: float = 4.0  # Deviations from the running mean that make a spike
+    # Largest plausible change per minute, per measurement
+    anomaly_rate_limits: str = "temperature_c=2.0,humidity=10.0,pressure_hpa=3.0"
+    anomaly_flatline_readings: int = 30  # Identical consecutive values before a sensor is stuck
+    anomaly_subscriber_queue_size: int = 1000  # Events buffered per stream subscriber
+
+    # Metadata tag index
+    tag_keys: str = "location,well"  # Metadata keys indexed as series tags (comma-separated)
+
+    # HTTP compression
+    response_compression_min_bytes: int = 1024  # Smaller query responses are sent uncompressed
+    max_decompressed_body_bytes: int = 32 * 1024 * 1024  # Cap for gzip request bodies (413 above)
+
+    # Startup warm-up and health checks
+    warmup_enabled: bool = True  # Warm pools, statement cache and detectors before ready
+    warmup_pool_connections: int = 5  # Connections opened per database ahead of first requests
+    warmup_anomaly_minutes: float = 60.0  # Recent readings replayed into the detectors (0 = off)
+    health_db_timeout_seconds: float = 2.0  # Readiness fails when the database check is slower
+
+    # Profiling and slow-query log
+    admin_token: str | None = None  # Required in X-Admin-Token for admin endpoints and profiling
+    slow_query_threshold_ms: float = 200.0  # Statements slower than this are logged
+    slow_query_log_size: int = 100  # Slow queries kept in memory
 
     @property
     def cors_origins_list(self) -> list[str]:
         """Parse CORS origins into a list."""
         return [origin.strip() for origin in self.cors_origins.split(",")]
 
+    @property
+    def anomaly_rate_limits_map(self) -> dict[str, float]:
+        """Parse per-measurement rate-of-change limits into a mapping."""
+        limits = {}
+        for item in self.anomaly_rate_limits.split(","):
+            name, sep, limit = item.partition("=")
+            if sep:
+                limits[name.strip()] = float(limit)
+        return limits
+
+    @property
+    def tag_keys_list(self) -> list[str]:
+        """Parse indexed metadata tag keys into a list."""
+        return [key.strip() for key in self.tag_keys.split(",") if key.strip()]
+
 
 # Global settings instance
 settings = Settings()
@@ -1,20 +1,45 @@
 """Database setup and session management."""
 
-from collections.abc import AsyncGenerator
+import asyncio
+import time
+from collections.abc import AsyncGenerator, Callable
+from typing import Any
 
-from sqlalchemy import text
+from sqlalchemy import Connection, Table, event, inspect, text
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, Session
 
+from . import profiling
 from .config import settings
+from .metrics import CallbackMetric, instrument_engine, registry
 
 # Create async engine
 engine = create_async_engine(
     settings.database_url,
-    echo=settings.debug,
+    echo=settings.sql_echo,
     connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {},
 )
 
+
+def _pool_checked_out() -> dict[tuple[str, ...], float]:
+    """Connections currently checked out of the main engine's pool."""
+    pool = engine.sync_engine.pool
+    return {("main",): pool.checkedout() if hasattr(pool, "checkedout") else 0}
+
+
+instrument_engine(engine, "main")
+profiling.instrument_engine(engine, "main")
+registry.register(
+    CallbackMetric(
+        "db_pool_checked_out",
+        "Database connections currently checked out of the pool",
+        _pool_checked_out,
+        ("database",),
+    )
+)
+
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -44,10 +69,124 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+def dialect_insert(db: AsyncSession) -> Callable[..., Any]:
+    """Return the insert construct with ``ON CONFLICT`` support for the session's dialect."""
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql_insert
+    return sqlite_insert
+
+
+def reset_on_rollback(flag: str, reset: Callable[[], None]) -> None:
+    """
+    Reset an in-process cache whenever a transaction that changed its rows rolls back.
+
+    Writers set ``session.info[flag]`` before writing rows the cache mirrors.
+    The flag is dropped on commit; on rollback ``reset`` is called, since the
+    cache may already hold what the transaction wrote.
+
+    Args:
+        flag: Session info key marking a transaction as dirty
+        reset: Clears the cache
+    """
+
+    @event.listens_for(Session, "after_rollback")
+    def _reset_cache(session: Session) -> None:
+        if session.info.pop(flag, False):
+            reset()
+
+    @event.listens_for(Session, "after_commit")
+    def _clear_dirty(session: Session) -> None:
+        session.info.pop(flag, None)
+
+
+# Indexes replaced by the composite (filter columns, then sort column) indexes
+# of the models; dropped from databases created before them
+OBSOLETE_INDEXES = {
+    "sensor_readings": (
+        "idx_sensor_device",
+        "ix_sensor_readings_sensor_type",
+        "ix_sensor_readings_device_id",
+        "ix_sensor_readings_timestamp",
+    ),
+    "processed_data": (
+        "idx_processor_time",
+        "idx_time_range",
+        "ix_processed_data_processor_name",
+        "ix_processed_data_sensor_type",
+    ),
+}
+
+
+def sync_columns(conn: Connection, tables: list[Table] | None = None) -> None:
+    """
+    Add columns added to the models to existing tables.
+
+    ``create_all`` never alters an existing table, so missing columns are
+    added here (as nullable, without a default); tables it just created are
+    already complete.
+
+    Args:
+        conn: Synchronous connection (run through ``run_sync``)
+        tables: Tables to update (default: all)
+    """
+    inspector = inspect(conn)
+    for table in tables if tables is not None else Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(conn.dialect)
+                conn.exec_driver_sql(
+                    f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+                )
+
+
+def sync_indexes(conn: Connection, tables: list[Table] | None = None) -> None:
+    """
+    Bring the indexes of existing tables up to date with the models.
+
+    ``create_all`` only creates indexes along with new tables, so indexes
+    added to a model are created here and the ones they replace dropped.
+
+    Args:
+        conn: Synchronous connection (run through ``run_sync``)
+        tables: Tables to update (default: all)
+    """
+    for table in tables if tables is not None else Base.metadata.sorted_tables:
+        for name in OBSOLETE_INDEXES.get(table.name, ()):
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
 async def init_db() -> None:
     """Initialize database tables."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(sync_columns)
+        await conn.run_sync(sync_indexes)
         # Enable WAL mode for SQLite to allow concurrent reads
         if "sqlite" in settings.database_url:
             await conn.execute(text("PRAGMA journal_mode=WAL"))
+
+
+async def check_database(timeout: float) -> float:
+    """
+    Check that the main database answers a trivial query.
+
+    Args:
+        timeout: Seconds to wait for a connection and the query
+
+    Returns:
+        Round-trip time in seconds
+
+    Raises:
+        Exception: If the database is unreachable or slower than the timeout
+    """
+    started = time.perf_counter()
+
+    async def ping() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.wait_for(ping(), timeout)
+    return time.perf_counter() - started
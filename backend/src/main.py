@@ -5,11 +5,31 @@ from typing import AsyncGenerator
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from .config import settings
 from .database import init_db
-from .routers import processing_router, query_router, sensors_router
-from .services.scheduler import start_scheduler, stop_scheduler
+from .metrics import MetricsMiddleware, registry
+from .profiling import ProfilingMiddleware
+from .routers import (
+    admin_router,
+    anomalies_router,
+    devices_router,
+    health_router,
+    processing_router,
+    query_router,
+    sensors_router,
+)
+from .services.data_processing import rebuild_processed_metrics
+from .services.device_state import rebuild_device_state
+from .services.hot_tier import warm_hot_tier
+from .services.line_protocol import start_line_protocol_listener, stop_line_protocol_listener
+from .services.rollups import rebuild_rollups
+from .services.scheduler import release_scheduler_lease, start_scheduler, stop_scheduler
+from .services.tags import rebuild_series_index
+from .services.warmup import prime_anomaly_engine, warm_connection_pool, warm_statement_cache
+from .sharding import shards
+from .startup import startup
 
 
 @asynccontextmanager
@@ -17,19 +37,65 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """
     Application lifespan handler.
 
-    Initializes database and scheduler on startup.
-    Cleans up scheduler on shutdown.
+    Initializes database, shards, device state, rollups, series index,
+    processed metrics, hot tier, scheduler and ingest listener on startup,
+    and warms connection pools, compiled statements and anomaly detector
+    state before reporting ready. Each step is timed as a startup phase.
+    Cleans up listener, scheduler and shard connections on shutdown.
     """
+    startup.reset()
+
     # Startup: Initialize database
-    await init_db()
+    async with startup.phase("init_db"):
+        await init_db()
+        if shards is not None:
+            await shards.init()
+
+    # Startup: Summarize existing readings into device_state, rollups and the
+    # series index, and stored results into processed_metrics (first run only)
+    async with startup.phase("rebuild_summaries"):
+        await rebuild_device_state()
+        await rebuild_rollups()
+        await rebuild_series_index()
+        await rebuild_processed_metrics()
+
+    # Startup: Rebuild the in-memory hot tier (if enabled) before ingest starts
+    async with startup.phase("hot_tier"):
+        await warm_hot_tier()
+
+    # Startup: Warm pools, compiled statements and detector state, so the
+    # first requests after a deploy are not slower than the rest
+    if settings.warmup_enabled:
+        async with startup.phase("connection_pool"):
+            await warm_connection_pool()
+        async with startup.phase("statement_cache"):
+            await warm_statement_cache()
+        async with startup.phase("anomaly_state"):
+            await prime_anomaly_engine()
 
     # Startup: Start background scheduler
-    start_scheduler()
+    async with startup.phase("scheduler"):
+        start_scheduler()
+
+    # Startup: Start line-protocol ingest listener (if enabled)
+    async with startup.phase("line_protocol"):
+        await start_line_protocol_listener()
+
+    startup.mark_ready()
 
     yield
 
-    # Shutdown: Stop scheduler
+    # Shutdown: Fail readiness first so load balancers stop routing here
+    startup.mark_draining()
+
+    # Shutdown: Stop listener, flushing queued readings
+    await stop_line_protocol_listener()
+
+    # Shutdown: Stop scheduler and hand over its lease
     stop_scheduler()
+    await release_scheduler_lease()
+    if shards is not None:
+        await shards.dispose()
 
 
 # Create FastAPI application
@@ -51,20 +117,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Record request latency per route
+app.add_middleware(MetricsMiddleware)
+
+# Profile admin-flagged requests (X-Profile: 1 plus X-Admin-Token)
+app.add_middleware(ProfilingMiddleware)
+
 # Include routers
 app.include_router(sensors_router)
 app.include_router(query_router)
 app.include_router(processing_router)
+app.include_router(devices_router)
+app.include_router(admin_router)
+app.include_router(anomalies_router)
+app.include_router(health_router)
 
 
-@app.get("/api/v1/health")
-async def health_check() -> dict[str, str]:
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics() -> PlainTextResponse:
     """
-    Health check endpoint.
+    Prometheus metrics endpoint.
 
-    Returns the system status.
+    Exposes request, database, ingest, processing and scheduler metrics in the
+    Prometheus text format.
     """
-    return {"status": "healthy", "database": "connected"}
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
 
 @app.get("/")
@@ -78,4 +155,6 @@ async def root() -> dict[str, str]:
         "message": "BME280 Data Collection System API",
         "docs": "/docs",
         "health": "/api/v1/health",
+        "ready": "/api/v1/health/ready",
+        "metrics": "/metrics",
     }
@@ -0,0 +1,302 @@
+"""Prometheus-style metrics.
+
+A small, dependency-free metrics registry rendered in the Prometheus text
+exposition format at ``/metrics``. All updates happen on the event loop
+thread (request handlers, SQLAlchemy events under the async engine and the
+asyncio scheduler), so series are plain Python numbers updated without locks.
+Series are keyed by label tuples and histogram buckets are preallocated, so
+recording an observation allocates nothing once a series exists.
+"""
+
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Latency buckets in seconds, from 0.5 ms to 10 s
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+Labels = tuple[Any, ...]
+
+
+def _escape(value: Any) -> str:
+    """Escape a label value."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: Labels, extra: str = "") -> str:
+    """Render a label set as {a="x",b="y"}."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value."""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Common metric metadata."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.label_names = labels
+
+    def samples(self) -> Iterable[str]:
+        """Yield sample lines."""
+        return ()
+
+    def render(self) -> list[str]:
+        """Render HELP, TYPE and sample lines."""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self.samples())
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> None:
+        super().__init__(name, help_text, labels)
+        self.values: dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, labels: Labels = ()) -> None:
+        """Increase the counter."""
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self.values.items():
+            yield f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """Distribution of observations in fixed buckets."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text, labels)
+        self.buckets = buckets
+        # labels -> [per-bucket counts (last is +Inf), sum]
+        self.series: dict[Labels, list[Any]] = {}
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        """Record one observation."""
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def samples(self) -> Iterable[str]:
+        for labels, (counts, total) in self.series.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = _format_labels(self.label_names, labels, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{le} {cumulative}"
+            label_text = _format_labels(self.label_names, labels)
+            yield f"{self.name}_sum{label_text} {_format_value(total)}"
+            yield f"{self.name}_count{label_text} {cumulative}"
+
+
+class CallbackMetric(_Metric):
+    """Gauge or counter whose values are read from existing state at scrape time."""
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        callback: Callable[[], dict[Labels, float]],
+        labels: tuple[str, ...] = (),
+        type_name: str = "gauge",
+    ) -> None:
+        super().__init__(name, help_text, labels)
+        self.callback = callback
+        self.type_name = type_name
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self.callback().items():
+            yield f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self) -> None:
+        self.metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> Any:
+        """Add a metric, replacing any previous one of the same name."""
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text format."""
+        lines: list[str] = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+HTTP_REQUEST_DURATION: Histogram = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency by route and status",
+        ("method", "route", "status"),
+    )
+)
+DB_QUERY_DURATION: Histogram = registry.register(
+    Histogram(
+        "db_query_duration_seconds",
+        "Database statement execution time",
+        ("database", "operation"),
+    )
+)
+DB_POOL_CONNECT_DURATION: Histogram = registry.register(
+    Histogram(
+        "db_pool_connect_seconds",
+        "Time spent opening a new database connection for the pool",
+        ("database",),
+    )
+)
+DB_POOL_CHECKOUTS: Counter = registry.register(
+    Counter("db_pool_checkouts_total", "Connections checked out of the pool", ("database",))
+)
+INGEST_ROWS: Counter = registry.register(
+    Counter("ingest_rows_total", "Sensor readings stored, by ingest path", ("source",))
+)
+PROCESSING_JOB_DURATION: Histogram = registry.register(
+    Histogram(
+        "processing_job_duration_seconds",
+        "Processing job duration (load, compute and save)",
+        ("processor",),
+    )
+)
+PROCESSING_ROWS_SCANNED: Counter = registry.register(
+    Counter(
+        "processing_rows_scanned_total",
+        "Raw readings read by processing jobs",
+        ("processor",),
+    )
+)
+SCHEDULER_JOB_LAG: Histogram = registry.register(
+    Histogram(
+        "scheduler_job_lag_seconds",
+        "Delay between a job's scheduled time and its start",
+        ("job",),
+    )
+)
+SCHEDULER_JOB_DURATION: Histogram = registry.register(
+    Histogram("scheduler_job_duration_seconds", "Scheduled job run time", ("job",))
+)
+
+_OPERATIONS = ("SELECT", "INSERT", "UPDATE", "DELETE", "PRAGMA", "BEGIN", "COMMIT", "CREATE")
+
+
+def _operation(statement: str) -> str:
+    """Classify a statement by its leading keyword without parsing it."""
+    head = statement.lstrip()[:6].upper()
+    for operation in _OPERATIONS:
+        if head.startswith(operation):
+            return operation
+    return "OTHER"
+
+
+def instrument_engine(engine: AsyncEngine, database: str = "main") -> None:
+    """
+    Record statement durations, pool checkouts and connection setup for an engine.
+
+    Args:
+        engine: Async engine to instrument
+        database: Label identifying the engine (e.g. "main", "shard0")
+    """
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        started = conn.info["metrics_query_start"].pop()
+        DB_QUERY_DURATION.observe(
+            time.perf_counter() - started, (database, _operation(statement))
+        )
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(context: Any) -> None:
+        # A failed statement never reaches after_cursor_execute
+        conn = context.connection
+        if conn is not None and context.statement is not None:
+            starts = conn.info.get("metrics_query_start")
+            if starts:
+                starts.pop()
+
+    @event.listens_for(sync_engine, "do_connect")
+    def _before_connect(dialect: Any, record: Any, cargs: Any, cparams: Any) -> None:
+        record.info["metrics_connect_start"] = time.perf_counter()
+
+    @event.listens_for(sync_engine.pool, "connect")
+    def _connect(dbapi_connection: Any, record: Any) -> None:
+        started = record.info.pop("metrics_connect_start", None)
+        if started is not None:
+            DB_POOL_CONNECT_DURATION.observe(time.perf_counter() - started, (database,))
+
+    @event.listens_for(sync_engine.pool, "checkout")
+    def _checkout(dbapi_connection: Any, record: Any, proxy: Any) -> None:
+        DB_POOL_CHECKOUTS.inc(1, (database,))
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency per route template and status."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Route templates keep label cardinality bounded
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                (scope["method"], getattr(route, "path", "unmatched"), status_code),
+            )
@@ -1,6 +1,22 @@
 """Database models."""
 
+from .anomaly_event import AnomalyEvent
+from .device_state import DeviceState
 from .processed_data import ProcessedData
+from .processed_metric import ProcessedMetric
+from .reading_rollup import ReadingRollup
+from .scheduler_lease import SchedulerLease
+from .series import Series, SeriesTag
 from .sensor_data import SensorReading
 
-__all__ = ["SensorReading", "ProcessedData"]
+__all__ = [
+    "SensorReading",
+    "ProcessedData",
+    "ProcessedMetric",
+    "DeviceState",
+    "ReadingRollup",
+    "Series",
+    "SeriesTag",
+    "AnomalyEvent",
+    "SchedulerLease",
+]
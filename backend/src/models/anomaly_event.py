@@ -0,0 +1,40 @@
+"""Anomaly event database model."""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from ..database import Base
+
+
+class AnomalyEvent(Base):
+    """A reading flagged by the streaming anomaly engine at ingest."""
+
+    __tablename__ = "anomaly_events"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    sensor_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    device_id: Mapped[str] = mapped_column(String(100), nullable=False)
+    # Timestamp of the flagged reading
+    timestamp: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    measurement: Mapped[str] = mapped_column(String(50), nullable=False)
+    # spike, rate_of_change or flat_line
+    kind: Mapped[str] = mapped_column(String(50), nullable=False)
+    value: Mapped[float] = mapped_column(Float, nullable=False)
+    # z-score (spike), change per minute (rate_of_change) or repeat count (flat_line)
+    score: Mapped[float] = mapped_column(Float, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=func.now())
+
+    __table_args__ = (
+        Index("idx_anomaly_device_time", "device_id", "timestamp"),
+        Index("idx_anomaly_time", "timestamp"),
+    )
+
+    def __repr__(self) -> str:
+        """String representation."""
+        return (
+            f"<AnomalyEvent(id={self.id}, device_id={self.device_id}, "
+            f"measurement={self.measurement}, kind={self.kind}, timestamp={self.timestamp})>"
+        )
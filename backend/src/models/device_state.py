@@ -0,0 +1,33 @@
+"""Device state database model."""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..database import Base
+
+
+class DeviceState(Base):
+    """Latest reading and reporting cadence of a device, maintained on ingest."""
+
+    __tablename__ = "device_state"
+
+    sensor_type: Mapped[str] = mapped_column(String(50), primary_key=True)
+    device_id: Mapped[str] = mapped_column(String(100), primary_key=True)
+    first_timestamp: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    last_timestamp: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    last_temperature_c: Mapped[float | None] = mapped_column(Float, nullable=True)
+    last_humidity: Mapped[float | None] = mapped_column(Float, nullable=True)
+    last_pressure_hpa: Mapped[float | None] = mapped_column(Float, nullable=True)
+    last_seen_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    reading_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Smoothed seconds between consecutive readings (None until two have arrived)
+    interval_seconds: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+    def __repr__(self) -> str:
+        """String representation."""
+        return (
+            f"<DeviceState(sensor_type={self.sensor_type}, device_id={self.device_id}, "
+            f"last_timestamp={self.last_timestamp}, reading_count={self.reading_count})>"
+        )
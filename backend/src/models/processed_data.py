@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy import JSON, DateTime, Index, Integer, String
+from sqlalchemy import JSON, DateTime, Index, Integer, String, text
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 
@@ -16,19 +16,32 @@ class ProcessedData(Base):
     __tablename__ = "processed_data"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    processor_name: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
+    processor_name: Mapped[str] = mapped_column(String(100), nullable=False)
     processor_version: Mapped[str] = mapped_column(String(20), nullable=False)
     start_time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     end_time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
-    sensor_type: Mapped[str] = mapped_column(String(50), nullable=False, index=True)
+    sensor_type: Mapped[str] = mapped_column(String(50), nullable=False)
     device_id: Mapped[str | None] = mapped_column(String(100), nullable=True)
     result: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
     raw_count: Mapped[int] = mapped_column(Integer, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=func.now())
 
+    # Listings are newest first, so each filter prefix is followed by created_at
     __table_args__ = (
-        Index("idx_processor_time", "processor_name", "start_time", "end_time"),
-        Index("idx_time_range", "start_time", "end_time"),
+        Index("idx_processor_sensor_created", "processor_name", "sensor_type", "created_at"),
+        Index("idx_processor_created", "processor_name", "created_at"),
+        Index("idx_sensor_created", "sensor_type", "created_at"),
+        Index("idx_created", "created_at"),
+        # Stored windows merged by merge_percentiles, in the order it walks them
+        Index(
+            "idx_processor_windows",
+            "processor_name",
+            "sensor_type",
+            "device_id",
+            "start_time",
+            text("end_time DESC"),
+            text("created_at DESC"),
+        ),
     )
 
     def __repr__(self) -> str:
@@ -0,0 +1,44 @@
+"""Processed metric database model."""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..database import Base
+
+
+class ProcessedMetric(Base):
+    """
+    One numeric field of a stored processing result, as a typed column.
+
+    Written alongside each ``processed_data`` row so result series can be
+    read through an index instead of parsing the JSON ``result`` blobs.
+    """
+
+    __tablename__ = "processed_metrics"
+
+    processed_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("processed_data.id", ondelete="CASCADE"), primary_key=True
+    )
+    # Result key; fields of nested results are dotted, e.g. "temperature_c.p95"
+    field: Mapped[str] = mapped_column(String(100), primary_key=True)
+    processor_name: Mapped[str] = mapped_column(String(100), nullable=False)
+    sensor_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    device_id: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    start_time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    end_time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    value: Mapped[float] = mapped_column(Float, nullable=False)
+
+    __table_args__ = (
+        Index(
+            "idx_metric_series", "processor_name", "sensor_type", "field", "device_id", "end_time"
+        ),
+    )
+
+    def __repr__(self) -> str:
+        """String representation."""
+        return (
+            f"<ProcessedMetric(processed_id={self.processed_id}, field={self.field}, "
+            f"end_time={self.end_time}, value={self.value})>"
+        )
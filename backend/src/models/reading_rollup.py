@@ -0,0 +1,39 @@
+"""Reading rollup database model."""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..database import Base
+
+
+class ReadingRollup(Base):
+    """
+    Running totals of a device's readings at an hourly bucket boundary.
+
+    Every total covers all readings of the device up to the end of the bucket
+    (not just the bucket itself), so the totals over any span of whole hours
+    are the difference of two rows.
+    """
+
+    __tablename__ = "reading_rollups"
+
+    sensor_type: Mapped[str] = mapped_column(String(50), primary_key=True)
+    device_id: Mapped[str] = mapped_column(String(100), primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    reading_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Per measurement: number of non-null values and their sum
+    temperature_c_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    temperature_c_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    humidity_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    humidity_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    pressure_hpa_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    pressure_hpa_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+
+    def __repr__(self) -> str:
+        """String representation."""
+        return (
+            f"<ReadingRollup(sensor_type={self.sensor_type}, device_id={self.device_id}, "
+            f"bucket_start={self.bucket_start}, reading_count={self.reading_count})>"
+        )
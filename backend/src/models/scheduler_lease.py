@@ -0,0 +1,29 @@
+"""Scheduler lease database model."""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..database import Base
+
+
+class SchedulerLease(Base):
+    """Time-limited leadership of a background job group, held by one process."""
+
+    __tablename__ = "scheduler_leases"
+
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    # Process holding the lease (host:pid:random suffix)
+    holder: Mapped[str] = mapped_column(String(200), nullable=False)
+    # Fencing token: increases every time the lease changes hands
+    token: Mapped[int] = mapped_column(Integer, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    renewed_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    def __repr__(self) -> str:
+        """String representation."""
+        return (
+            f"<SchedulerLease(name={self.name}, holder={self.holder}, "
+            f"token={self.token}, expires_at={self.expires_at})>"
+        )
@@ -16,20 +16,27 @@ class SensorReading(Base):
     __tablename__ = "sensor_readings"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    sensor_type: Mapped[str] = mapped_column(String(50), nullable=False, index=True)
-    device_id: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
+    sensor_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    device_id: Mapped[str] = mapped_column(String(100), nullable=False)
     timestamp: Mapped[datetime] = mapped_column(
-        DateTime, nullable=False, default=func.now(), index=True
+        DateTime, nullable=False, default=func.now()
     )
     temperature_c: Mapped[float | None] = mapped_column(Float, nullable=True)
     humidity: Mapped[float | None] = mapped_column(Float, nullable=True)
     pressure_hpa: Mapped[float | None] = mapped_column(Float, nullable=True)
     extra_metadata: Mapped[dict[str, Any] | None] = mapped_column("metadata", JSON, nullable=True)
+    # Series (sensor type, device, tag set) of the reading, in the same database
+    series_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=func.now())
 
+    # Every index ends in timestamp so filtered reads come back in time order
+    # without a sort (tests/test_query_plans.py checks each filter combination)
     __table_args__ = (
-        Index("idx_sensor_device", "sensor_type", "device_id"),
+        Index("idx_sensor_device_time", "sensor_type", "device_id", "timestamp"),
+        Index("idx_sensor_time", "sensor_type", "timestamp"),
+        Index("idx_device_time", "device_id", "timestamp"),
         Index("idx_timestamp_range", "timestamp"),
+        Index("idx_series_time", "series_id", "timestamp"),
     )
 
     def __repr__(self) -> str:
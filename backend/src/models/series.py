@@ -0,0 +1,54 @@
+"""Series and tag index database models."""
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import JSON, DateTime, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..database import Base
+
+
+class Series(Base):
+    """
+    A (sensor type, device, tag set) combination seen on ingest.
+
+    Tags are the configured metadata keys of the device's readings; a device
+    whose tags change starts a new series. The timestamps bound the readings
+    that carried this tag set.
+    """
+
+    __tablename__ = "series"
+    __table_args__ = (UniqueConstraint("sensor_type", "device_id", "tags_key"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    sensor_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    device_id: Mapped[str] = mapped_column(String(100), nullable=False)
+    # Canonical JSON of the tag set, so equal sets share one series
+    tags_key: Mapped[str] = mapped_column(String(500), nullable=False)
+    tags: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+    first_timestamp: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    last_timestamp: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    def __repr__(self) -> str:
+        """String representation."""
+        return (
+            f"<Series(id={self.id}, sensor_type={self.sensor_type}, "
+            f"device_id={self.device_id}, tags={self.tags})>"
+        )
+
+
+class SeriesTag(Base):
+    """One tag of a series, keyed for lookup by (key, value)."""
+
+    __tablename__ = "series_tags"
+
+    key: Mapped[str] = mapped_column(String(100), primary_key=True)
+    value: Mapped[str] = mapped_column(String(200), primary_key=True)
+    series_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("series.id", ondelete="CASCADE"), primary_key=True
+    )
+
+    def __repr__(self) -> str:
+        """String representation."""
+        return f"<SeriesTag(series_id={self.series_id}, {self.key}={self.value})>"
@@ -1,13 +1,31 @@
 """Data processing algorithms."""
 
 from .average import AverageProcessor
-from .base import BaseProcessor
+from .base import BaseProcessor, TransformProcessor
+from .downsample import DownsampleProcessor
+from .percentile import PercentileProcessor
 from .rolling_average import RollingAverageProcessor
+from .rolling_series import RollingSeriesProcessor
+from .threshold import ThresholdProcessor
 
 # Registry of available processors
 PROCESSORS: dict[str, type[BaseProcessor]] = {
     "average": AverageProcessor,
     "rolling_average": RollingAverageProcessor,
+    "percentile": PercentileProcessor,
+    "downsample": DownsampleProcessor,
+    "threshold": ThresholdProcessor,
+    "rolling_series": RollingSeriesProcessor,
 }
 
-__all__ = ["BaseProcessor", "AverageProcessor", "RollingAverageProcessor", "PROCESSORS"]
+__all__ = [
+    "BaseProcessor",
+    "TransformProcessor",
+    "AverageProcessor",
+    "RollingAverageProcessor",
+    "PercentileProcessor",
+    "DownsampleProcessor",
+    "ThresholdProcessor",
+    "RollingSeriesProcessor",
+    "PROCESSORS",
+]
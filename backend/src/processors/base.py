@@ -11,6 +11,23 @@ class BaseProcessor(ABC):
     name: str = "base"
     version: str = "1.0.0"
     description: str = "Base processor"
+    # Parameters accepted from a job or pipeline step, with their defaults
+    parameters: dict[str, Any] = {}
+
+    def __init__(self, **params: Any) -> None:
+        """
+        Create a processor instance.
+
+        Args:
+            **params: Values overriding the defaults in ``parameters``
+
+        Raises:
+            ValueError: If a parameter is not accepted by the processor
+        """
+        unknown = sorted(set(params) - set(self.parameters))
+        if unknown:
+            raise ValueError(f"Processor {self.name} has no parameter(s): {', '.join(unknown)}")
+        self.params = {**self.parameters, **params}
 
     @abstractmethod
     async def process(
@@ -44,3 +61,45 @@ class BaseProcessor(ABC):
             "version": cls.version,
             "description": cls.description,
         }
+
+
+class TransformProcessor(BaseProcessor):
+    """
+    Processor that derives a new series of readings from its input.
+
+    In a pipeline the derived readings feed later steps (e.g. a downsampled
+    series feeding a threshold check); the stored result is a summary of them.
+    """
+
+    @abstractmethod
+    async def transform(
+        self,
+        readings: list[dict[str, Any]],
+        start_time: datetime,
+        end_time: datetime,
+        sensor_type: str,
+        device_id: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Derive readings from the input readings.
+
+        Returns:
+            Readings with device_id, timestamp and measurement keys, oldest first
+        """
+
+    @abstractmethod
+    def summarize(
+        self, readings: list[dict[str, Any]], derived: list[dict[str, Any]]
+    ) -> dict[str, Any]:
+        """Build the stored result from the input and derived readings."""
+
+    async def process(
+        self,
+        readings: list[dict[str, Any]],
+        start_time: datetime,
+        end_time: datetime,
+        sensor_type: str,
+        device_id: str | None = None,
+    ) -> dict[str, Any]:
+        derived = await self.transform(readings, start_time, end_time, sensor_type, device_id)
+        return self.summarize(readings, derived)
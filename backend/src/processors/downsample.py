@@ -0,0 +1,94 @@
+"""Downsample processor implementation."""
+
+from datetime import datetime, timedelta
+from typing import Any
+
+from ..timestamps import naive_utc
+from .base import TransformProcessor
+from .percentile import MEASUREMENTS
+
+
+class DownsampleProcessor(TransformProcessor):
+    """Average sensor readings into fixed time buckets per device."""
+
+    name = "downsample"
+    version = "1.0.0"
+    description = "Average sensor readings into fixed time buckets per device"
+    parameters = {"bucket_seconds": 300}
+
+    def __init__(self, **params: Any) -> None:
+        super().__init__(**params)
+        bucket_seconds = self.params["bucket_seconds"]
+        if not isinstance(bucket_seconds, (int, float)) or bucket_seconds <= 0:
+            raise ValueError("bucket_seconds must be a positive number")
+        self.bucket = timedelta(seconds=bucket_seconds)
+
+    async def transform(
+        self,
+        readings: list[dict[str, Any]],
+        start_time: datetime,
+        end_time: datetime,
+        sensor_type: str,
+        device_id: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Average each device's readings per bucket.
+
+        Buckets are aligned to ``start_time``; each output reading carries the
+        bucket start as its timestamp and the number of input readings.
+
+        Args:
+            readings: List of sensor readings
+            start_time: Start of time range (first bucket start)
+            end_time: End of time range
+            sensor_type: Type of sensor
+            device_id: Optional specific device ID
+
+        Returns:
+            One reading per device and non-empty bucket, oldest first
+        """
+        # Readings are naive UTC; an aware start would not subtract from them
+        start_time = naive_utc(start_time)
+        # (device, bucket index) -> [count, then (sum, n) per measurement]
+        buckets: dict[tuple[str, int], list[Any]] = {}
+        for reading in readings:
+            key = (reading["device_id"], (reading["timestamp"] - start_time) // self.bucket)
+            totals = buckets.get(key)
+            if totals is None:
+                totals = buckets[key] = [0] + [[0.0, 0] for _ in MEASUREMENTS]
+            totals[0] += 1
+            for index, name in enumerate(MEASUREMENTS, 1):
+                value = reading.get(name)
+                if value is not None:
+                    totals[index][0] += value
+                    totals[index][1] += 1
+
+        derived = []
+        for (device, index), totals in sorted(buckets.items(), key=lambda item: item[0][::-1]):
+            row: dict[str, Any] = {
+                "device_id": device,
+                "timestamp": start_time + index * self.bucket,
+                "count": totals[0],
+            }
+            for position, name in enumerate(MEASUREMENTS, 1):
+                total, count = totals[position]
+                row[name] = round(total / count, 2) if count else None
+            derived.append(row)
+        return derived
+
+    def summarize(
+        self, readings: list[dict[str, Any]], derived: list[dict[str, Any]]
+    ) -> dict[str, Any]:
+        """
+        Describe the downsampled series.
+
+        Returns:
+            Dictionary with the bucket size, counts and the series itself
+        """
+        return {
+            "bucket_seconds": self.params["bucket_seconds"],
+            "count": len(readings),
+            "buckets": len(derived),
+            "devices": sorted({r["device_id"] for r in derived}),
+            "series": [{**row, "timestamp": row["timestamp"].isoformat()} for row in derived],
+        }
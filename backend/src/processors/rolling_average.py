@@ -7,7 +7,13 @@ from .base import BaseProcessor
 
 
 class RollingAverageProcessor(BaseProcessor):
-    """Calculate rolling average of sensor readings over a time window."""
+    """
+    Calculate rolling average of sensor readings over a time window.
+
+    Returns one mean for the whole window (the scheduler runs it every minute
+    over the last hour); ``rolling_series`` computes a moving average at every
+    reading instead.
+    """
 
     name = "rolling_average"
     version = "1.0.0"
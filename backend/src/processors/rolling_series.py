@@ -0,0 +1,233 @@
+"""Rolling series processor implementation."""
+
+import math
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any
+
+from .base import TransformProcessor
+from .percentile import MEASUREMENTS
+
+STATS = ("mean", "min", "max", "std")
+
+
+class SlidingStats:
+    """
+    Mean, min, max and standard deviation of one measurement over a sliding window.
+
+    Values enter at increasing positions and leave from the oldest end, so
+    each value is added and removed once: a running sum and sum of squares
+    give the mean and variance, and monotonic deques (increasing for min,
+    decreasing for max) keep the extremes at their fronts. Values are
+    shifted by the first value seen to keep the sum of squares from losing
+    precision on large offsets such as pressure.
+    """
+
+    __slots__ = ("values", "total", "squares", "shift", "mins", "maxs")
+
+    def __init__(self) -> None:
+        self.values: deque[tuple[int, float]] = deque()
+        self.total = 0.0
+        self.squares = 0.0
+        self.shift: float | None = None
+        self.mins: deque[tuple[int, float]] = deque()
+        self.maxs: deque[tuple[int, float]] = deque()
+
+    def push(self, position: int, value: float) -> None:
+        """Add the value at ``position`` (greater than any position pushed before)."""
+        if self.shift is None:
+            self.shift = value
+        shifted = value - self.shift
+        self.values.append((position, shifted))
+        self.total += shifted
+        self.squares += shifted * shifted
+        while self.mins and self.mins[-1][1] >= value:
+            self.mins.pop()
+        self.mins.append((position, value))
+        while self.maxs and self.maxs[-1][1] <= value:
+            self.maxs.pop()
+        self.maxs.append((position, value))
+
+    def evict(self, oldest: int) -> None:
+        """Drop the values at positions before ``oldest``."""
+        values = self.values
+        while values and values[0][0] < oldest:
+            _, shifted = values.popleft()
+            self.total -= shifted
+            self.squares -= shifted * shifted
+        if not values:
+            # Restart exactly, so rounding errors do not carry over
+            self.total = self.squares = 0.0
+            self.shift = None
+        while self.mins and self.mins[0][0] < oldest:
+            self.mins.popleft()
+        while self.maxs and self.maxs[0][0] < oldest:
+            self.maxs.popleft()
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def mean(self) -> float | None:
+        # The shift is set exactly while the window holds values
+        if self.shift is None:
+            return None
+        return self.shift + self.total / len(self.values)
+
+    def min(self) -> float | None:
+        return self.mins[0][1] if self.mins else None
+
+    def max(self) -> float | None:
+        return self.maxs[0][1] if self.maxs else None
+
+    def std(self) -> float | None:
+        """Population standard deviation of the window."""
+        count = len(self.values)
+        if not count:
+            return None
+        variance = (self.squares - self.total * self.total / count) / count
+        return math.sqrt(max(variance, 0.0))
+
+
+class RollingSeriesProcessor(TransformProcessor):
+    """Moving statistics at every reading, over a time- or count-based window."""
+
+    name = "rolling_series"
+    version = "1.0.0"
+    description = (
+        "Moving average (optionally min, max and standard deviation) at every reading "
+        "over a trailing time or count window per device, computed in one pass"
+    )
+    parameters = {
+        "window_seconds": None,
+        "window_count": None,
+        "stats": ["mean"],
+        "measurements": list(MEASUREMENTS),
+    }
+
+    def __init__(self, **params: Any) -> None:
+        super().__init__(**params)
+        window_seconds = self.params["window_seconds"]
+        window_count = self.params["window_count"]
+        if (window_seconds is None) == (window_count is None):
+            raise ValueError("Set exactly one of window_seconds or window_count")
+        if window_seconds is not None and (
+            not isinstance(window_seconds, (int, float)) or window_seconds <= 0
+        ):
+            raise ValueError("window_seconds must be a positive number")
+        if window_count is not None and (not isinstance(window_count, int) or window_count < 1):
+            raise ValueError("window_count must be a positive integer")
+        if not self.params["stats"] or set(self.params["stats"]) - set(STATS):
+            raise ValueError(f"stats must be a non-empty list of: {', '.join(STATS)}")
+        measurements = self.params["measurements"]
+        if not measurements or set(measurements) - set(MEASUREMENTS):
+            raise ValueError(f"measurements must be a non-empty list of: {', '.join(MEASUREMENTS)}")
+        self.window = timedelta(seconds=window_seconds) if window_seconds is not None else None
+
+    async def transform(
+        self,
+        readings: list[dict[str, Any]],
+        start_time: datetime,
+        end_time: datetime,
+        sensor_type: str,
+        device_id: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Compute the moving statistics at each reading.
+
+        Each device has its own trailing window: the readings within
+        ``window_seconds`` up to and including the current one, or its last
+        ``window_count`` readings. Readings are taken in the given order,
+        which must be oldest first per device.
+
+        Args:
+            readings: List of sensor readings (raw or derived, e.g. downsampled)
+            start_time: Start of time range
+            end_time: End of time range
+            sensor_type: Type of sensor
+            device_id: Optional specific device ID
+
+        Returns:
+            One reading per input reading: the moving mean under each
+            measurement's own key (so later steps can read it like a reading),
+            ``<measurement>_min``/``_max``/``_std`` when requested, and the
+            window size as ``count``
+        """
+        measurements = self.params["measurements"]
+        stats = [stat for stat in self.params["stats"] if stat != "mean"]
+        window_count = self.params["window_count"]
+        # device -> (timestamps seen, index of the oldest one in the window, stats)
+        devices: dict[str, tuple[list[datetime], list[int], dict[str, SlidingStats]]] = {}
+
+        derived = []
+        for reading in readings:
+            state = devices.get(reading["device_id"])
+            if state is None:
+                state = devices[reading["device_id"]] = (
+                    [],
+                    [0],
+                    {name: SlidingStats() for name in measurements},
+                )
+            timestamps, oldest, windows = state
+            position = len(timestamps)
+            timestamp = reading["timestamp"]
+            timestamps.append(timestamp)
+
+            if self.window is not None:
+                cutoff = timestamp - self.window
+                while timestamps[oldest[0]] <= cutoff:
+                    oldest[0] += 1
+            else:
+                oldest[0] = max(0, position - window_count + 1)
+
+            row: dict[str, Any] = {
+                "device_id": reading["device_id"],
+                "timestamp": timestamp,
+                "count": position - oldest[0] + 1,
+            }
+            for name in measurements:
+                window = windows[name]
+                window.evict(oldest[0])
+                if reading.get(name) is not None:
+                    window.push(position, reading[name])
+                mean = window.mean()
+                row[name] = round(mean, 3) if mean is not None else None
+                for stat in stats:
+                    value = getattr(window, stat)()
+                    row[f"{name}_{stat}"] = round(value, 3) if value is not None else None
+            derived.append(row)
+        return derived
+
+    def summarize(
+        self, readings: list[dict[str, Any]], derived: list[dict[str, Any]]
+    ) -> dict[str, Any]:
+        """
+        Store the series as arrays per device rather than one row per point.
+
+        Returns:
+            Dictionary with the window settings, counts and per-device arrays
+            of timestamps, window sizes and each requested statistic
+        """
+        keys = ["count"]
+        for name in self.params["measurements"]:
+            keys.extend(
+                name if stat == "mean" else f"{name}_{stat}" for stat in self.params["stats"]
+            )
+
+        series: dict[str, dict[str, list[Any]]] = {}
+        for row in derived:
+            arrays = series.get(row["device_id"])
+            if arrays is None:
+                arrays = series[row["device_id"]] = {key: [] for key in ["timestamps", *keys]}
+            arrays["timestamps"].append(row["timestamp"].isoformat())
+            for key in keys:
+                arrays[key].append(row[key])
+
+        return {
+            "window_seconds": self.params["window_seconds"],
+            "window_count": self.params["window_count"],
+            "stats": self.params["stats"],
+            "count": len(readings),
+            "points": len(derived),
+            "devices": sorted(series),
+            "series": series,
+        }
@@ -0,0 +1,170 @@
+"""Mergeable t-digest quantile sketch.
+
+A t-digest summarizes a stream of values as a sorted list of centroids (mean,
+weight). Centroids near the median may hold many values while those near the
+tails stay small, so extreme quantiles remain accurate. Two digests merge by
+re-compressing the union of their centroids, which is what lets stored
+per-window digests answer quantiles over any longer period.
+
+Error bounds (merging t-digest with the k1 scale function): a centroid
+around quantile q holds at most ``(2 * pi / compression) * sqrt(q * (1 - q))``
+of all values, and interpolating inside it bounds the rank error of an
+estimate by half that:
+
+    compression 200:  q=0.50 -> 0.79%   q=0.95/0.05 -> 0.34%   q=0.99/0.01 -> 0.16%
+
+In practice the error is usually an order of magnitude below the bound.
+Minimum and maximum are exact. Merged digests keep the same bound.
+"""
+
+import math
+from collections.abc import Iterable
+from typing import Any
+
+DEFAULT_COMPRESSION = 200.0
+
+# Buffered raw values per unit of compression before they are folded in
+BUFFER_FACTOR = 5
+
+
+class TDigest:
+    """Merging t-digest over float values."""
+
+    def __init__(self, compression: float = DEFAULT_COMPRESSION) -> None:
+        """
+        Create an empty digest.
+
+        Args:
+            compression: Accuracy/size trade-off; a digest keeps about
+                ``compression / 2`` centroids
+        """
+        self.compression = compression
+        self.means: list[float] = []
+        self.weights: list[float] = []
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer: list[float] = []
+
+    def __len__(self) -> int:
+        return self.count
+
+    def update(self, values: Iterable[float]) -> None:
+        """Add values to the digest."""
+        for value in values:
+            self._buffer.append(value)
+            self.count += 1
+            if value < self.min:
+                self.min = value
+            if value > self.max:
+                self.max = value
+        if len(self._buffer) >= BUFFER_FACTOR * self.compression:
+            self._compress()
+
+    def merge(self, other: "TDigest") -> None:
+        """Fold another digest into this one."""
+        other._compress()
+        if not other.count:
+            return
+        self._compress()
+        self._compress(other.means, other.weights)
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def _k(self, q: float) -> float:
+        """k1 scale function: centroid index at quantile q."""
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _q(self, k: float) -> float:
+        """Inverse of the scale function."""
+        if k >= self.compression / 4:
+            return 1.0
+        return (math.sin(2 * math.pi * k / self.compression) + 1) / 2
+
+    def _compress(
+        self, extra_means: list[float] | None = None, extra_weights: list[float] | None = None
+    ) -> None:
+        """Merge buffered values (and extra centroids) into the centroid list."""
+        if not self._buffer and not extra_means:
+            return
+
+        points = list(zip(self.means, self.weights))
+        points.extend((value, 1) for value in self._buffer)
+        if extra_means:
+            points.extend(zip(extra_means, extra_weights or []))
+        points.sort(key=lambda point: point[0])
+        self._buffer = []
+
+        total = sum(weight for _, weight in points)
+        means: list[float] = []
+        weights: list[float] = []
+        mean, weight = points[0]
+        done = 0.0
+        limit = self._q(self._k(0.0) + 1) * total
+        for next_mean, next_weight in points[1:]:
+            if done + weight + next_weight <= limit:
+                weight += next_weight
+                mean += (next_mean - mean) * next_weight / weight
+            else:
+                means.append(mean)
+                weights.append(weight)
+                done += weight
+                limit = self._q(self._k(done / total) + 1) * total
+                mean, weight = next_mean, next_weight
+        means.append(mean)
+        weights.append(weight)
+
+        self.means, self.weights = means, weights
+
+    def quantile(self, q: float) -> float | None:
+        """
+        Estimate the value at quantile q (0-1); None when the digest is empty.
+
+        Interpolates linearly between centroid centers, anchored at the exact
+        minimum and maximum.
+        """
+        self._compress()
+        if not self.count:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+
+        target = q * self.count
+        position, value = 0.0, self.min
+        seen = 0.0
+        for mean, weight in zip(self.means, self.weights):
+            center = seen + weight / 2
+            if target < center:
+                span = center - position
+                return value + (mean - value) * (target - position) / span if span else mean
+            position, value = center, mean
+            seen += weight
+        span = self.count - position
+        return value + (self.max - value) * (target - position) / span if span else self.max
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize the digest as JSON-compatible data."""
+        self._compress()
+        return {
+            "compression": self.compression,
+            "count": self.count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "means": self.means,
+            "weights": [int(weight) for weight in self.weights],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "TDigest":
+        """Restore a digest serialized by to_dict."""
+        digest = cls(data.get("compression", DEFAULT_COMPRESSION))
+        if data.get("count"):
+            digest.means = list(data["means"])
+            digest.weights = list(data["weights"])
+            digest.count = int(data["count"])
+            digest.min = data["min"]
+            digest.max = data["max"]
+        return digest
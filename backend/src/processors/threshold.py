@@ -0,0 +1,106 @@
+"""Threshold check processor implementation."""
+
+from datetime import datetime
+from typing import Any
+
+from .base import TransformProcessor
+from .percentile import MEASUREMENTS
+
+
+class ThresholdProcessor(TransformProcessor):
+    """Find sensor readings outside configured limits."""
+
+    name = "threshold"
+    version = "1.0.0"
+    description = "Count and sample sensor readings outside min/max limits per measurement"
+    # limits: measurement -> {"min": value, "max": value}, either bound optional
+    parameters = {"limits": {}, "samples": 10}
+
+    def __init__(self, **params: Any) -> None:
+        super().__init__(**params)
+        limits = self.params["limits"]
+        if not isinstance(limits, dict) or not limits:
+            raise ValueError("limits must map at least one measurement to min/max bounds")
+        for name, bounds in limits.items():
+            if name not in MEASUREMENTS:
+                raise ValueError(f"Unknown measurement in limits: {name}")
+            if (
+                not isinstance(bounds, dict)
+                or not bounds
+                or set(bounds) - {"min", "max"}
+                or not all(isinstance(value, (int, float)) for value in bounds.values())
+            ):
+                raise ValueError(f"Limits of {name} must be numeric min and/or max values")
+        if not isinstance(self.params["samples"], int) or self.params["samples"] < 0:
+            raise ValueError("samples must be a non-negative integer")
+
+    async def transform(
+        self,
+        readings: list[dict[str, Any]],
+        start_time: datetime,
+        end_time: datetime,
+        sensor_type: str,
+        device_id: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Keep the readings that break a limit.
+
+        Args:
+            readings: List of sensor readings
+            start_time: Start of time range
+            end_time: End of time range
+            sensor_type: Type of sensor
+            device_id: Optional specific device ID
+
+        Returns:
+            Violating readings, each with a ``violations`` list of
+            "<measurement>_below"/"<measurement>_above" entries
+        """
+        limits = self.params["limits"]
+        derived = []
+        for reading in readings:
+            violations = []
+            for name, bounds in limits.items():
+                value = reading.get(name)
+                if value is None:
+                    continue
+                if "min" in bounds and value < bounds["min"]:
+                    violations.append(f"{name}_below")
+                elif "max" in bounds and value > bounds["max"]:
+                    violations.append(f"{name}_above")
+            if violations:
+                derived.append({**reading, "violations": violations})
+        return derived
+
+    def summarize(
+        self, readings: list[dict[str, Any]], derived: list[dict[str, Any]]
+    ) -> dict[str, Any]:
+        """
+        Count the violations per limit and keep the first few as samples.
+
+        Returns:
+            Dictionary with violation counts, affected devices and samples
+        """
+        counts = {
+            f"{name}_{side}": 0
+            for name, bounds in self.params["limits"].items()
+            for side, bound in (("below", "min"), ("above", "max"))
+            if bound in bounds
+        }
+        for reading in derived:
+            for violation in reading["violations"]:
+                counts[violation] += 1
+
+        return {
+            "limits": self.params["limits"],
+            "count": len(readings),
+            "violations": len(derived),
+            "by_limit": counts,
+            "devices": sorted({r["device_id"] for r in derived}),
+            "first_violation": derived[0]["timestamp"].isoformat() if derived else None,
+            "last_violation": derived[-1]["timestamp"].isoformat() if derived else None,
+            "samples": [
+                {**r, "timestamp": r["timestamp"].isoformat()}
+                for r in derived[: self.params["samples"]]
+            ],
+        }
@@ -0,0 +1,298 @@
+"""On-demand request profiling and slow-query log.
+
+Profiling is opt-in per request and admin-gated: when ``admin_token`` is
+configured, a request carrying ``X-Profile: 1`` (or ``?profile=1``) and a
+matching ``X-Admin-Token`` header is profiled. The profile splits wall time
+into phases (DB execute, ORM hydration, processor compute, serialization,
+other) and includes a sampled stack profile of the event loop thread. It is
+returned in a ``Server-Timing`` header and stored for retrieval via
+``/api/v1/admin/profiles``. Concurrent requests share the event loop thread,
+so stack samples may include their frames too.
+
+Independently, every statement slower than ``slow_query_threshold_ms`` is
+recorded with its parameters and query plan.
+"""
+
+import hmac
+import logging
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+from urllib.parse import parse_qs
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_STORED_PROFILES = 50
+SAMPLE_INTERVAL_SECONDS = 0.001
+TOP_STACKS = 25
+
+
+@dataclass
+class RequestProfile:
+    """Timing breakdown of one profiled request."""
+
+    profile_id: str
+    method: str
+    path: str
+    started_at: datetime
+    total_ms: float = 0.0
+    status: int | None = None
+    phases_ms: dict[str, float] = field(default_factory=dict)
+    db_statements: int = 0
+    samples: int = 0
+    top_stacks: list[dict[str, Any]] = field(default_factory=list)
+
+    def add(self, phase: str, seconds: float) -> None:
+        """Accumulate time spent in a phase."""
+        self.phases_ms[phase] = self.phases_ms.get(phase, 0.0) + seconds * 1000
+
+    def server_timing(self) -> str:
+        """Render phases as a Server-Timing header value."""
+        entries = [f"{name};dur={ms:.2f}" for name, ms in self.phases_ms.items()]
+        entries.append(f"total;dur={self.total_ms:.2f}")
+        return ", ".join(entries)
+
+
+@dataclass
+class SlowQuery:
+    """A statement that exceeded the slow-query threshold."""
+
+    recorded_at: datetime
+    database: str
+    duration_ms: float
+    statement: str
+    parameters: str
+    plan: list[str] | None
+
+
+_current_profile: ContextVar[RequestProfile | None] = ContextVar("current_profile", default=None)
+profiles: deque[RequestProfile] = deque(maxlen=MAX_STORED_PROFILES)
+slow_queries: deque[SlowQuery] = deque(maxlen=settings.slow_query_log_size)
+
+
+class _Phase:
+    """Context manager adding elapsed time to a phase of the current profile."""
+
+    __slots__ = ("profile", "name", "started")
+
+    def __init__(self, profile: RequestProfile, name: str) -> None:
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc: object) -> None:
+        self.profile.add(self.name, time.perf_counter() - self.started)
+
+
+class _NoPhase:
+    """No-op context manager used when the request is not being profiled."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *exc: object) -> None:
+        pass
+
+
+_NO_PHASE = _NoPhase()
+
+
+def phase(name: str) -> _Phase | _NoPhase:
+    """
+    Time a block as part of the current request's profile.
+
+    Costs one context-variable lookup when profiling is off.
+
+    Args:
+        name: Phase name (e.g. "orm_hydration", "processor_compute", "serialization")
+    """
+    profile = _current_profile.get()
+    return _NO_PHASE if profile is None else _Phase(profile, name)
+
+
+class _StackSampler(threading.Thread):
+    """Periodically samples the stack of one thread."""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL_SECONDS) -> None:
+        super().__init__(daemon=True, name="request-profiler")
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_filename.rsplit('/', 1)[-1]}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+            self.samples += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+def admin_token_matches(token: str | bytes | None) -> bool:
+    """Check a request's admin token against the configured one in constant time."""
+    if not settings.admin_token or token is None:
+        return False
+    if isinstance(token, str):
+        token = token.encode()
+    return hmac.compare_digest(token, settings.admin_token.encode())
+
+
+def _wants_profile(scope: Scope) -> bool:
+    """Check the profile flag and admin token on a request."""
+    if not settings.admin_token:
+        return False
+    headers = dict(scope["headers"])
+    flag = headers.get(b"x-profile", b"").decode()
+    if flag not in ("1", "true"):
+        query = parse_qs(scope.get("query_string", b"").decode())
+        flag = query.get("profile", [""])[0]
+    if flag not in ("1", "true"):
+        return False
+    return admin_token_matches(headers.get(b"x-admin-token"))
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles admin-flagged requests."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not _wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(
+            profile_id=uuid.uuid4().hex,
+            method=scope["method"],
+            path=scope["path"],
+            started_at=datetime.utcnow(),
+        )
+        sampler = _StackSampler(threading.get_ident())
+        started = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                profile.total_ms = (time.perf_counter() - started) * 1000
+                accounted = sum(profile.phases_ms.values())
+                profile.phases_ms["other"] = max(profile.total_ms - accounted, 0.0)
+                message.setdefault("headers", [])
+                message["headers"] = [
+                    *message["headers"],
+                    (b"server-timing", profile.server_timing().encode()),
+                    (b"x-profile-id", profile.profile_id.encode()),
+                ]
+            await send(message)
+
+        token = _current_profile.set(profile)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            sampler.stop()
+            _current_profile.reset(token)
+            profile.samples = sampler.samples
+            profile.top_stacks = [
+                {"stack": stack, "samples": count}
+                for stack, count in sampler.stacks.most_common(TOP_STACKS)
+            ]
+            profiles.append(profile)
+
+
+def _explain(conn: Any, statement: str, parameters: Any) -> list[str] | None:
+    """Fetch the query plan for a statement on the connection that ran it."""
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    try:
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(prefix + statement, parameters)
+            return [" ".join(str(col) for col in row) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+    except Exception as e:
+        logger.debug(f"Could not explain slow query: {e}")
+        return None
+
+
+def instrument_engine(engine: AsyncEngine, database: str = "main") -> None:
+    """
+    Attribute statement time to profiled requests and log slow queries.
+
+    Args:
+        engine: Async engine to instrument
+        database: Label identifying the engine (e.g. "main", "shard0")
+    """
+    sync_engine = engine.sync_engine
+    threshold = settings.slow_query_threshold_ms / 1000
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        conn.info.setdefault("profiling_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        elapsed = time.perf_counter() - conn.info["profiling_query_start"].pop()
+
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.add("db_execute", elapsed)
+            profile.db_statements += 1
+
+        if elapsed < threshold:
+            return
+        explainable = not executemany and statement.lstrip()[:6].upper() == "SELECT"
+        slow_queries.append(
+            SlowQuery(
+                recorded_at=datetime.utcnow(),
+                database=database,
+                duration_ms=elapsed * 1000,
+                statement=statement,
+                parameters=repr(parameters)[:1000],
+                plan=_explain(conn, statement, parameters) if explainable else None,
+            )
+        )
+        logger.warning(f"Slow query ({elapsed * 1000:.1f} ms) on {database}: {statement[:200]}")
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(context: Any) -> None:
+        # A failed statement never reaches after_cursor_execute
+        conn = context.connection
+        if conn is not None and context.statement is not None:
+            starts = conn.info.get("profiling_query_start")
+            if starts:
+                starts.pop()
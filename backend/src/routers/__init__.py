@@ -1,7 +1,19 @@
 """API route handlers."""
 
+from .admin import router as admin_router
+from .anomalies import router as anomalies_router
+from .devices import router as devices_router
+from .health import router as health_router
 from .processing import router as processing_router
 from .query import router as query_router
 from .sensors import router as sensors_router
 
-__all__ = ["sensors_router", "processing_router", "query_router"]
+__all__ = [
+    "sensors_router",
+    "processing_router",
+    "query_router",
+    "admin_router",
+    "devices_router",
+    "anomalies_router",
+    "health_router",
+]
@@ -0,0 +1,64 @@
+"""Admin endpoints for request profiles and the slow-query log."""
+
+from dataclasses import asdict
+from typing import Any
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+
+from .. import profiling
+from ..config import settings
+
+
+async def require_admin(x_admin_token: str | None = Header(None)) -> None:
+    """Reject requests without the configured admin token."""
+    if not profiling.admin_token_matches(x_admin_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin token required")
+
+
+router = APIRouter(
+    prefix="/api/v1/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_admin)],
+)
+
+
+@router.get("/profiles")
+async def list_profiles() -> dict[str, Any]:
+    """
+    List recent request profiles, newest first.
+
+    Stack samples are omitted; fetch a single profile to see them.
+    """
+    summaries = [
+        {key: value for key, value in asdict(profile).items() if key != "top_stacks"}
+        for profile in reversed(profiling.profiles)
+    ]
+    return {"count": len(summaries), "profiles": summaries}
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str) -> dict[str, Any]:
+    """
+    Get a stored request profile, including its sampled stacks.
+    """
+    for profile in profiling.profiles:
+        if profile.profile_id == profile_id:
+            return asdict(profile)
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+
+
+@router.get("/slow-queries")
+async def list_slow_queries(
+    limit: int = Query(50, ge=1, le=1000, description="Maximum number of results"),
+) -> dict[str, Any]:
+    """
+    List recent slow queries, newest first.
+
+    Each entry has the statement, its parameters, duration and query plan.
+    """
+    entries = [asdict(query) for query in reversed(profiling.slow_queries)][:limit]
+    return {
+        "threshold_ms": settings.slow_query_threshold_ms,
+        "count": len(entries),
+        "queries": entries,
+    }
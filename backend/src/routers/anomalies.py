@@ -0,0 +1,86 @@
+"""Anomaly event endpoints."""
+
+import asyncio
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+import orjson
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_db
+from ..schemas.anomaly import AnomalyEventResponse
+from ..services.anomaly import anomaly_broker, get_anomaly_status, query_anomalies
+
+router = APIRouter(prefix="/api/v1/anomalies", tags=["anomalies"])
+
+# Seconds between keep-alive comments on an idle stream
+KEEPALIVE_SECONDS = 15.0
+
+
+@router.get("", response_model=dict[str, int | list[AnomalyEventResponse]])
+async def get_anomalies(
+    sensor_type: str | None = Query(None, description="Filter by sensor type"),
+    device_id: str | None = Query(None, description="Filter by device ID"),
+    kind: str | None = Query(
+        None, description="Filter by detector (spike, rate_of_change, flat_line)"
+    ),
+    start: datetime | None = Query(None, description="Start of time range"),
+    end: datetime | None = Query(None, description="End of time range"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of results"),
+    db: AsyncSession = Depends(get_db),
+) -> dict[str, int | list[AnomalyEventResponse]]:
+    """
+    Query readings flagged by the anomaly engine, newest first.
+    """
+    events = await query_anomalies(db, sensor_type, device_id, kind, start, end, limit)
+    return {
+        "count": len(events),
+        "data": [AnomalyEventResponse.model_validate(e) for e in events],
+    }
+
+
+@router.get("/stream")
+async def stream_anomalies(
+    request: Request,
+    device_id: str | None = Query(None, description="Only stream this device's events"),
+) -> StreamingResponse:
+    """
+    Stream anomaly events as server-sent events as soon as they are committed.
+
+    Each event is sent as ``event: anomaly`` with a JSON ``data`` line. Events
+    a slow client cannot keep up with are dropped rather than delaying ingest.
+    """
+    queue = anomaly_broker.subscribe()
+
+    async def events() -> AsyncIterator[bytes]:
+        try:
+            while not await request.is_disconnected():
+                try:
+                    item = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                if device_id and item["device_id"] != device_id:
+                    continue
+                yield b"event: anomaly\ndata: " + orjson.dumps(item) + b"\n\n"
+        finally:
+            anomaly_broker.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/status")
+async def get_anomaly_info() -> dict:
+    """
+    Get the anomaly engine configuration and state.
+
+    Returns the detector thresholds, the number of tracked device
+    measurements, and stream subscriber and dropped event counts.
+    """
+    return get_anomaly_status()
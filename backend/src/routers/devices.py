@@ -0,0 +1,102 @@
+"""Device listing and health endpoints."""
+
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_db
+from ..schemas.device import DeviceLatestReading, DeviceStatus, DeviceSummary, SummaryTile
+from ..services.device_state import device_health, list_device_states
+from ..services.rollups import device_summary
+
+router = APIRouter(prefix="/api/v1/devices", tags=["devices"])
+
+
+@router.get("", response_model=dict[str, int | list[DeviceStatus]])
+async def list_devices(
+    sensor_type: str | None = Query(None, description="Filter by sensor type"),
+    status: str | None = Query(None, description="Filter by status (online or offline)"),
+    db: AsyncSession = Depends(get_db),
+) -> dict[str, int | list[DeviceStatus]]:
+    """
+    List known devices with their reporting cadence and health.
+
+    A device is offline once it has missed DEVICE_HEARTBEAT_MISS_THRESHOLD
+    reporting intervals.
+    """
+    now = datetime.utcnow()
+    devices = []
+    for state in await list_device_states(db, sensor_type):
+        health, missed = device_health(state, now)
+        if status and health != status:
+            continue
+        devices.append(
+            DeviceStatus(
+                device_id=state.device_id,
+                sensor_type=state.sensor_type,
+                first_timestamp=state.first_timestamp,
+                last_timestamp=state.last_timestamp,
+                last_seen_at=state.last_seen_at,
+                reading_count=state.reading_count,
+                interval_seconds=state.interval_seconds,
+                status=health,
+                missed_heartbeats=missed,
+            )
+        )
+
+    return {"count": len(devices), "devices": devices}
+
+
+@router.get("/latest", response_model=dict[str, int | list[DeviceLatestReading]])
+async def get_latest_readings(
+    sensor_type: str | None = Query(None, description="Filter by sensor type"),
+    db: AsyncSession = Depends(get_db),
+) -> dict[str, int | list[DeviceLatestReading]]:
+    """
+    Get the most recent reading of every device.
+
+    Intended for "current value" tiles; one row per device.
+    """
+    now = datetime.utcnow()
+    readings = [
+        DeviceLatestReading(
+            device_id=state.device_id,
+            sensor_type=state.sensor_type,
+            timestamp=state.last_timestamp,
+            temperature_c=state.last_temperature_c,
+            humidity=state.last_humidity,
+            pressure_hpa=state.last_pressure_hpa,
+            status=device_health(state, now)[0],
+        )
+        for state in await list_device_states(db, sensor_type)
+    ]
+
+    return {"count": len(readings), "data": readings}
+
+
+@router.get("/{device_id}/summary", response_model=DeviceSummary)
+async def get_device_summary(
+    device_id: str,
+    sensor_type: str = Query("bme280", description="Sensor type"),
+    start: datetime | None = Query(None, description="Start of an extra custom period"),
+    end: datetime | None = Query(None, description="End of every period (default: now)"),
+    db: AsyncSession = Depends(get_db),
+) -> DeviceSummary:
+    """
+    Get a device's totals and averages for every dashboard period in one call.
+
+    Returns day, week, month, six-month, year and year-to-date tiles ending at
+    ``end``, plus a custom tile when ``start`` is given. Whole hours are read
+    from the prefix-sum rollups, so the cost does not grow with the period.
+    """
+    try:
+        tiles = await device_summary(db, sensor_type, device_id, end or datetime.utcnow(), start)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+
+    return DeviceSummary(
+        device_id=device_id,
+        sensor_type=sensor_type,
+        tiles=[SummaryTile.model_validate(tile) for tile in tiles],
+    )
@@ -0,0 +1,66 @@
+"""Health check endpoints."""
+
+import time
+from typing import Any
+
+from fastapi import APIRouter, Response, status
+
+from ..config import settings
+from ..database import check_database
+from ..startup import startup
+
+router = APIRouter(prefix="/api/v1/health", tags=["health"])
+
+
+async def _database_status() -> dict[str, Any]:
+    """Run the database check and describe the outcome."""
+    try:
+        seconds = await check_database(settings.health_db_timeout_seconds)
+    except Exception as e:
+        return {"status": "unreachable", "error": str(e) or type(e).__name__}
+    return {"status": "connected", "latency_ms": round(seconds * 1000, 1)}
+
+
+@router.get("")
+async def health_check(response: Response) -> dict[str, str]:
+    """
+    Health check endpoint.
+
+    Returns the system status; 503 when the database does not answer.
+    """
+    database = await _database_status()
+    if database["status"] != "connected":
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "unhealthy", "database": database["status"]}
+    return {"status": "healthy", "database": "connected"}
+
+
+@router.get("/live")
+async def liveness() -> dict[str, Any]:
+    """
+    Liveness probe.
+
+    Succeeds while the process can serve requests, without touching the
+    database, so a slow database does not get healthy instances restarted.
+    """
+    return {"status": "alive", "uptime_seconds": round(time.perf_counter() - startup.started, 1)}
+
+
+@router.get("/ready")
+async def readiness(response: Response) -> dict[str, Any]:
+    """
+    Readiness probe.
+
+    Succeeds once every startup phase (including warm-up) has finished,
+    until shutdown begins, and while the database answers within
+    HEALTH_DB_TIMEOUT_SECONDS. Reports the startup phase timings.
+    """
+    database = await _database_status() if startup.ready else None
+    ready = startup.ready and database is not None and database["status"] == "connected"
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {
+        "status": "ready" if ready else "not_ready",
+        "database": database,
+        "startup": startup.status(),
+    }
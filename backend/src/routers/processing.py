@@ -2,22 +2,36 @@
 
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_db
 from ..processors import PROCESSORS
 from ..schemas.processing import (
+    PipelineRequest,
+    PipelineResponse,
+    PipelineStepResult,
     ProcessedDataResponse,
     ProcessingJobRequest,
     ProcessingJobResponse,
     ProcessorInfo,
 )
-from ..services.data_processing import process_sensor_data, query_processed_data
+from ..serialization import ResponseFormat, json_response, rows_response
+from ..processors.percentile import DEFAULT_QUANTILES
+from ..services.data_processing import (
+    merge_percentiles,
+    process_sensor_data,
+    query_processed_rows,
+    query_processed_series,
+    run_pipeline,
+)
 from ..services.scheduler import get_scheduler_status
 
 router = APIRouter(prefix="/api/v1/processing", tags=["processing"])
 
+# Fields that are often identical across a page (hoisted in the columnar format)
+RESULT_HOISTED_FIELDS = ("processor_name", "processor_version", "sensor_type", "device_id")
+
 
 @router.post("/run", response_model=ProcessingJobResponse, status_code=status.HTTP_201_CREATED)
 async def run_processing_job(
@@ -37,6 +51,8 @@ async def run_processing_job(
             end_time=job.end_time,
             sensor_type=job.sensor_type,
             device_id=job.device_id,
+            tags=job.tags,
+            params=job.params,
         )
 
         return ProcessingJobResponse(
@@ -57,6 +73,55 @@ async def run_processing_job(
         ) from e
 
 
+@router.post(
+    "/pipeline", response_model=PipelineResponse, status_code=status.HTTP_201_CREATED
+)
+async def run_processing_pipeline(
+    pipeline: PipelineRequest,
+    db: AsyncSession = Depends(get_db),
+) -> PipelineResponse:
+    """
+    Run several processors over one scan of the raw data.
+
+    Steps form a DAG: each reads the raw readings or the output of a transform
+    step (e.g. downsample). All step results are stored in one transaction.
+    """
+    try:
+        raw_count, results = await run_pipeline(
+            db,
+            steps=pipeline.steps,
+            start_time=pipeline.start_time,
+            end_time=pipeline.end_time,
+            sensor_type=pipeline.sensor_type,
+            device_id=pipeline.device_id,
+            tags=pipeline.tags,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Processing failed: {str(e)}",
+        ) from e
+
+    return PipelineResponse(
+        status="completed",
+        raw_count=raw_count,
+        steps=[
+            PipelineStepResult(
+                id=step.id,
+                processor=step.processor,
+                input=step.input,
+                job_id=processed.id,
+                result=processed.result,
+                raw_count=processed.raw_count,
+            )
+            for step, processed in results
+        ],
+        created_at=results[0][1].created_at,
+    )
+
+
 @router.get("/processors", response_model=dict[str, list[ProcessorInfo]])
 async def list_processors() -> dict[str, list[ProcessorInfo]]:
     """
@@ -69,6 +134,7 @@ async def list_processors() -> dict[str, list[ProcessorInfo]]:
             name=proc.name,
             version=proc.version,
             description=proc.description,
+            parameters=proc.parameters,
         )
         for proc in PROCESSORS.values()
     ]
@@ -78,19 +144,23 @@ async def list_processors() -> dict[str, list[ProcessorInfo]]:
 
 @router.get("/results", response_model=dict[str, int | list[ProcessedDataResponse]])
 async def get_processed_results(
+    request: Request,
     processor: str | None = Query(None, description="Filter by processor name"),
     sensor_type: str | None = Query(None, description="Filter by sensor type"),
     start: datetime | None = Query(None, description="Start of time range"),
     end: datetime | None = Query(None, description="End of time range"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of results"),
+    response_format: ResponseFormat = Query(
+        "rows", alias="format", description="rows (default) or columnar arrays"
+    ),
     db: AsyncSession = Depends(get_db),
-) -> dict[str, int | list[ProcessedDataResponse]]:
+) -> Response:
     """
     Query processed data results with optional filters.
 
     Returns paginated processed data matching the specified criteria.
     """
-    results = await query_processed_data(
+    results = await query_processed_rows(
         db,
         processor_name=processor,
         sensor_type=sensor_type,
@@ -99,10 +169,76 @@ async def get_processed_results(
         limit=limit,
     )
 
-    return {
-        "count": len(results),
-        "data": [ProcessedDataResponse.model_validate(r) for r in results],
-    }
+    return rows_response(results, request, response_format, RESULT_HOISTED_FIELDS)
+
+
+@router.get("/series")
+async def get_processed_series(
+    request: Request,
+    processor: str = Query(..., description="Processor name"),
+    field: list[str] = Query(
+        ..., description="Result field (repeatable), e.g. avg_temperature_c or temperature_c.p95"
+    ),
+    sensor_type: str = Query("bme280", description="Sensor type"),
+    device_id: str | None = Query(
+        None, description="Device ID (omit for results over all devices)"
+    ),
+    start: datetime | None = Query(None, description="Start of time range (window end)"),
+    end: datetime | None = Query(None, description="End of time range (window end)"),
+    limit: int = Query(10_000, ge=1, le=100_000, description="Maximum number of points"),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """
+    Read chosen result fields of a processor over time as aligned arrays.
+
+    Served from typed, indexed metric columns, so plotting e.g. a day of
+    scheduled rolling averages does not load or parse the full result rows.
+    """
+    try:
+        series = await query_processed_series(
+            db,
+            processor_name=processor,
+            fields=field,
+            sensor_type=sensor_type,
+            device_id=device_id,
+            start_time=start,
+            end_time=end,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+
+    return json_response(series, request)
+
+
+@router.get("/percentiles")
+async def get_percentiles(
+    start: datetime = Query(..., description="Start of time range"),
+    end: datetime = Query(..., description="End of time range"),
+    sensor_type: str = Query("bme280", description="Sensor type"),
+    device_id: str | None = Query(None, description="Device ID (omit for all devices)"),
+    q: list[float] | None = Query(
+        None, description="Quantiles between 0 and 1 (repeatable; default 0.05, 0.5, 0.95, 0.99)"
+    ),
+    db: AsyncSession = Depends(get_db),
+) -> dict:
+    """
+    Estimate percentiles over an arbitrary period.
+
+    Merges the t-digest sketches of stored ``percentile`` results inside the
+    period and scans raw readings only for the gaps between them.
+    """
+    try:
+        return await merge_percentiles(
+            db,
+            start_time=start,
+            end_time=end,
+            sensor_type=sensor_type,
+            device_id=device_id,
+            quantiles=tuple(q) if q else DEFAULT_QUANTILES,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
 
 
 @router.get("/scheduler/status")
@@ -1,64 +1,152 @@
 """Data query endpoints."""
 
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_db
-from ..schemas.sensor import SensorReadingResponse
-from ..services.data_ingestion import query_raw_data
+from ..schemas.sensor import ComparisonResponse, SensorReadingResponse, SeriesInfo
+from ..serialization import ResponseFormat, json_response, rows_response
+from ..services.comparison import compare_devices
+from ..services.data_ingestion import query_raw_rows
+from ..services.hot_tier import get_hot_tier_status
+from ..services.tags import list_series, parse_tag_filters
 
 router = APIRouter(prefix="/api/v1/data", tags=["query"])
 
+# Fields that are often identical across a page (hoisted in the columnar format)
+RAW_HOISTED_FIELDS = ("sensor_type", "device_id", "metadata", "created_at")
+
+TAG_QUERY = Query(None, description="Metadata tag filter as key=value (repeatable)")
+
+
+def _tag_filters(tag: list[str] | None) -> dict[str, str]:
+    """Parse tag query parameters, rejecting malformed or unindexed ones with 400."""
+    try:
+        return parse_tag_filters(tag)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+
 
 @router.get("/raw", response_model=dict[str, int | list[SensorReadingResponse]])
 async def get_raw_data(
+    request: Request,
     sensor_type: str | None = Query(None, description="Filter by sensor type"),
     device_id: str | None = Query(None, description="Filter by device ID"),
     start: datetime | None = Query(None, description="Start of time range"),
     end: datetime | None = Query(None, description="End of time range"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of results"),
+    tag: list[str] | None = TAG_QUERY,
+    response_format: ResponseFormat = Query(
+        "rows", alias="format", description="rows (default) or columnar arrays"
+    ),
     db: AsyncSession = Depends(get_db),
-) -> dict[str, int | list[SensorReadingResponse]]:
+) -> Response:
     """
     Query raw sensor readings with optional filters.
 
-    Returns paginated sensor data matching the specified criteria.
+    Returns paginated sensor data matching the specified criteria. Tag filters
+    (e.g. ``tag=location=office``) are resolved through the series index.
     """
-    readings = await query_raw_data(
+    readings = await query_raw_rows(
         db,
         sensor_type=sensor_type,
         device_id=device_id,
         start_time=start,
         end_time=end,
         limit=limit,
+        tags=_tag_filters(tag),
     )
 
-    return {
-        "count": len(readings),
-        "data": [SensorReadingResponse.model_validate(r) for r in readings],
-    }
+    return rows_response(readings, request, response_format, RAW_HOISTED_FIELDS)
 
 
 @router.get("/raw/{device_id}", response_model=dict[str, int | list[SensorReadingResponse]])
 async def get_device_data(
+    request: Request,
     device_id: str,
     start: datetime | None = Query(None, description="Start of time range"),
     end: datetime | None = Query(None, description="End of time range"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of results"),
+    tag: list[str] | None = TAG_QUERY,
+    response_format: ResponseFormat = Query(
+        "rows", alias="format", description="rows (default) or columnar arrays"
+    ),
     db: AsyncSession = Depends(get_db),
-) -> dict[str, int | list[SensorReadingResponse]]:
+) -> Response:
     """
     Query raw sensor readings for a specific device.
 
     Returns paginated sensor data for the specified device.
     """
-    readings = await query_raw_data(
-        db, device_id=device_id, start_time=start, end_time=end, limit=limit
+    readings = await query_raw_rows(
+        db,
+        device_id=device_id,
+        start_time=start,
+        end_time=end,
+        limit=limit,
+        tags=_tag_filters(tag),
     )
 
-    return {
-        "count": len(readings),
-        "data": [SensorReadingResponse.model_validate(r) for r in readings],
-    }
+    return rows_response(readings, request, response_format, RAW_HOISTED_FIELDS)
+
+
+@router.get("/compare", response_model=ComparisonResponse)
+async def compare_device_data(
+    request: Request,
+    device_id: list[str] = Query(..., description="Device IDs to compare (repeat the parameter)"),
+    start: datetime | None = Query(None, description="Start of time range (default: end - 24h)"),
+    end: datetime | None = Query(None, description="End of time range (default: now)"),
+    bucket: int = Query(300, ge=1, description="Bucket width in seconds"),
+    sensor_type: str = Query("bme280", description="Sensor type"),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """
+    Compare several devices on one aligned time grid.
+
+    Averages each device's readings into the same buckets with one grouped
+    query. Buckets without readings have a zero count and null values.
+    """
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(hours=24)
+    try:
+        result = await compare_devices(
+            db,
+            device_ids=device_id,
+            start_time=start,
+            end_time=end,
+            bucket_seconds=bucket,
+            sensor_type=sensor_type,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+
+    return json_response(result, request)
+
+
+@router.get("/series", response_model=dict[str, int | list[SeriesInfo]])
+async def get_series(
+    sensor_type: str | None = Query(None, description="Filter by sensor type"),
+    tag: list[str] | None = TAG_QUERY,
+    db: AsyncSession = Depends(get_db),
+) -> dict[str, int | list[SeriesInfo]]:
+    """
+    List indexed series (sensor type, device and tag set) matching tag filters.
+
+    A device whose tags changed appears once per tag set, with the time span
+    of the readings that carried it.
+    """
+    series = await list_series(db, sensor_type, _tag_filters(tag))
+    return {"count": len(series), "series": [SeriesInfo.model_validate(s) for s in series]}
+
+
+@router.get("/hot-tier/status")
+async def get_hot_tier_info() -> dict:
+    """
+    Get the in-memory hot tier status.
+
+    Returns whether it is enabled and warmed, its retention, and the series,
+    readings and bytes it holds.
+    """
+    return get_hot_tier_status()
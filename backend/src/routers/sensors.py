@@ -1,13 +1,43 @@
 """Sensor data ingestion endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from collections import Counter
+from collections.abc import AsyncIterator, Mapping
+from contextlib import asynccontextmanager
+from typing import Any
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..compression import GzipRoute
 from ..database import get_db
-from ..schemas.sensor import BME280Reading, SensorReadingResponse
-from ..services.data_ingestion import create_sensor_reading
+from ..schemas.sensor import (
+    BatchIngestResponse,
+    BME280Batch,
+    BME280Reading,
+    SensorReadingResponse,
+    UploadStatus,
+)
+from ..services.admission import AdmissionRejected, ingest_admission
+from ..services.csv_upload import CSVFormatError, get_upload_status, import_csv, list_uploads
+from ..services.data_ingestion import create_sensor_reading, create_sensor_readings
+from ..services.line_protocol import get_line_protocol_status
+
+# GzipRoute lets devices send Content-Encoding: gzip JSON bodies
+router = APIRouter(prefix="/api/v1/sensors", tags=["sensors"], route_class=GzipRoute)
+
 
-router = APIRouter(prefix="/api/v1/sensors", tags=["sensors"])
+@asynccontextmanager
+async def _admitted(costs: Mapping[str, int]) -> AsyncIterator[None]:
+    """Run an ingest request under admission control, rejecting with 429."""
+    try:
+        async with ingest_admission.admit(costs):
+            yield
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        ) from e
 
 
 @router.post("/bme280", response_model=SensorReadingResponse, status_code=status.HTTP_201_CREATED)
@@ -19,12 +49,110 @@ async def ingest_bme280_reading(
     Ingest a BME280 sensor reading.
 
     Stores temperature, humidity, and pressure data from a BME280 sensor.
+    Returns 429 with Retry-After when the device exceeds its rate or the
+    server is shedding load.
     """
-    try:
-        db_reading = await create_sensor_reading(db, reading, sensor_type="bme280")
-        return SensorReadingResponse.model_validate(db_reading)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to store sensor reading: {str(e)}",
-        ) from e
+    async with _admitted({reading.device_id: 1}):
+        try:
+            db_reading = await create_sensor_reading(db, reading, sensor_type="bme280")
+            return SensorReadingResponse.model_validate(db_reading)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to store sensor reading: {str(e)}",
+            ) from e
+
+
+@router.post(
+    "/bme280/batch", response_model=BatchIngestResponse, status_code=status.HTTP_201_CREATED
+)
+async def ingest_bme280_batch(
+    batch: BME280Batch,
+    db: AsyncSession = Depends(get_db),
+) -> BatchIngestResponse:
+    """
+    Ingest a batch of BME280 sensor readings.
+
+    Stores all readings with a single bulk insert (one per shard when sharded
+    storage is enabled). Each reading counts against its device's rate limit.
+    """
+    async with _admitted(Counter(r.device_id for r in batch.readings)):
+        try:
+            inserted = await create_sensor_readings(db, batch.readings, sensor_type="bme280")
+            return BatchIngestResponse(inserted=inserted)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to store sensor readings: {str(e)}",
+            ) from e
+
+
+@router.post(
+    "/bme280/upload", response_model=UploadStatus, status_code=status.HTTP_201_CREATED
+)
+async def upload_bme280_csv(
+    file: UploadFile = File(
+        ...,
+        description="CSV with device_id, timestamp, temperature_c, humidity, pressure_hpa columns",
+    ),
+    db: AsyncSession = Depends(get_db),
+) -> UploadStatus:
+    """
+    Upload BME280 measurements from a CSV file.
+
+    The file is parsed, validated and inserted in chunks; invalid rows are
+    skipped and reported. Progress can be followed via GET /uploads while the
+    upload runs.
+    """
+    async with _admitted({}):
+        try:
+            return await import_csv(
+                db, file, filename=file.filename, total_bytes=file.size, sensor_type="bme280"
+            )
+        except CSVFormatError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Upload failed: {str(e)}",
+            ) from e
+
+
+@router.get("/uploads", response_model=list[UploadStatus])
+async def get_uploads() -> list[UploadStatus]:
+    """
+    List recent CSV uploads.
+
+    Returns progress and results of running and recently finished uploads, newest first.
+    """
+    return list_uploads()
+
+
+@router.get("/uploads/{upload_id}", response_model=UploadStatus)
+async def get_upload(upload_id: str) -> UploadStatus:
+    """Get progress and results of a CSV upload."""
+    upload = get_upload_status(upload_id)
+    if upload is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+    return upload
+
+
+@router.get("/line-protocol/status")
+async def get_line_protocol_info() -> dict[str, Any]:
+    """
+    Get the line-protocol listener status.
+
+    Returns writer throughput, queue depth and per-connection error counters.
+    """
+    return get_line_protocol_status()
+
+
+@router.get("/admission/status")
+async def get_admission_info() -> dict[str, Any]:
+    """
+    Get ingest admission control status.
+
+    Returns configured limits, current in-flight requests and counters of
+    admitted, throttled and shed requests.
+    """
+    return ingest_admission.status()
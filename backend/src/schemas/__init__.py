@@ -1,18 +1,43 @@
 """Pydantic schemas for API validation."""
 
+from .anomaly import AnomalyEventResponse
+from .device import DeviceLatestReading, DeviceStatus, DeviceSummary, PeriodStats, SummaryTile
 from .processing import (
     ProcessedDataResponse,
     ProcessingJobRequest,
     ProcessingJobResponse,
     ProcessorInfo,
 )
-from .sensor import BME280Reading, SensorReadingResponse
+from .sensor import (
+    BatchIngestResponse,
+    BME280Batch,
+    BME280Reading,
+    ComparisonResponse,
+    ComparisonSeries,
+    SensorReadingResponse,
+    SeriesInfo,
+    UploadRowError,
+    UploadStatus,
+)
 
 __all__ = [
     "BME280Reading",
+    "BME280Batch",
+    "BatchIngestResponse",
     "SensorReadingResponse",
+    "ComparisonSeries",
+    "ComparisonResponse",
+    "SeriesInfo",
+    "UploadRowError",
+    "UploadStatus",
     "ProcessingJobRequest",
     "ProcessingJobResponse",
     "ProcessedDataResponse",
     "ProcessorInfo",
+    "DeviceStatus",
+    "DeviceLatestReading",
+    "PeriodStats",
+    "SummaryTile",
+    "DeviceSummary",
+    "AnomalyEventResponse",
 ]
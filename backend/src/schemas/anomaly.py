@@ -0,0 +1,25 @@
+"""Anomaly event schemas."""
+
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class AnomalyEventResponse(BaseModel):
+    """Schema for a reading flagged by the anomaly engine."""
+
+    id: int
+    sensor_type: str
+    device_id: str
+    timestamp: datetime = Field(..., description="Timestamp of the flagged reading")
+    measurement: str
+    kind: str = Field(..., description="'spike', 'rate_of_change' or 'flat_line'")
+    value: float
+    score: float = Field(
+        ...,
+        description="z-score (spike), change per minute (rate_of_change) "
+        "or identical readings in a row (flat_line)",
+    )
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
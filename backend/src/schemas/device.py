@@ -0,0 +1,63 @@
+"""Device schemas."""
+
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class DeviceStatus(BaseModel):
+    """Schema for a device's reporting state."""
+
+    device_id: str
+    sensor_type: str
+    first_timestamp: datetime
+    last_timestamp: datetime
+    last_seen_at: datetime = Field(..., description="Server time of the last ingest")
+    reading_count: int
+    interval_seconds: float | None = Field(
+        None, description="Smoothed seconds between readings (null until two have arrived)"
+    )
+    status: str = Field(..., description="'online' or 'offline'")
+    missed_heartbeats: int = Field(
+        ..., description="Reporting intervals elapsed since last reading"
+    )
+
+
+class DeviceLatestReading(BaseModel):
+    """Schema for a device's most recent reading."""
+
+    device_id: str
+    sensor_type: str
+    timestamp: datetime
+    temperature_c: float | None
+    humidity: float | None
+    pressure_hpa: float | None
+    status: str = Field(..., description="'online' or 'offline'")
+
+
+class PeriodStats(BaseModel):
+    """Totals of one measurement over a period (null values excluded)."""
+
+    count: int
+    sum: float
+    mean: float | None
+
+
+class SummaryTile(BaseModel):
+    """Schema for one period tile of a device summary."""
+
+    period: str = Field(..., description="day, week, month, six_months, year, ytd or custom")
+    start: datetime
+    end: datetime
+    reading_count: int
+    temperature_c: PeriodStats
+    humidity: PeriodStats
+    pressure_hpa: PeriodStats
+
+
+class DeviceSummary(BaseModel):
+    """Schema for a device's period totals and averages."""
+
+    device_id: str
+    sensor_type: str
+    tiles: list[SummaryTile]
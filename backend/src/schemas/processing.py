@@ -14,6 +14,12 @@ class ProcessingJobRequest(BaseModel):
     end_time: datetime = Field(..., description="End of time range to process")
     sensor_type: str = Field(default="bme280", description="Sensor type to process")
     device_id: str | None = Field(None, description="Specific device ID (null for all devices)")
+    tags: dict[str, str] | None = Field(
+        None, description="Only process readings carrying these metadata tags (e.g. a well)"
+    )
+    params: dict[str, Any] | None = Field(
+        None, description="Processor parameters (e.g. bucket_seconds for 'downsample')"
+    )
 
     model_config = {"json_schema_extra": {
         "example": {
@@ -36,6 +42,71 @@ class ProcessingJobResponse(BaseModel):
     created_at: datetime
 
 
+class PipelineStep(BaseModel):
+    """Schema for one step of a processing pipeline."""
+
+    id: str = Field(
+        ..., min_length=1, max_length=64, description="Step name, unique in the pipeline"
+    )
+    processor: str = Field(..., description="Processor name (e.g., 'downsample')")
+    input: str = Field(
+        "raw", description="'raw' for the scanned readings, or the id of a transform step"
+    )
+    params: dict[str, Any] = Field(default_factory=dict, description="Processor parameters")
+
+
+class PipelineRequest(BaseModel):
+    """Schema for a processing pipeline request."""
+
+    start_time: datetime = Field(..., description="Start of time range to process")
+    end_time: datetime = Field(..., description="End of time range to process")
+    sensor_type: str = Field(default="bme280", description="Sensor type to process")
+    device_id: str | None = Field(None, description="Specific device ID (null for all devices)")
+    tags: dict[str, str] | None = Field(
+        None, description="Only process readings carrying these metadata tags (e.g. a well)"
+    )
+    steps: list[PipelineStep] = Field(..., min_length=1, max_length=32)
+
+    model_config = {"json_schema_extra": {
+        "example": {
+            "start_time": "2025-11-14T00:00:00Z",
+            "end_time": "2025-11-14T23:59:59Z",
+            "sensor_type": "bme280",
+            "steps": [
+                {"id": "avg", "processor": "average"},
+                {"id": "pct", "processor": "percentile"},
+                {"id": "5min", "processor": "downsample", "params": {"bucket_seconds": 300}},
+                {
+                    "id": "hot",
+                    "processor": "threshold",
+                    "input": "5min",
+                    "params": {"limits": {"temperature_c": {"max": 30}}},
+                },
+            ],
+        }
+    }}
+
+
+class PipelineStepResult(BaseModel):
+    """Schema for the stored result of one pipeline step."""
+
+    id: str
+    processor: str
+    input: str
+    job_id: int
+    result: dict[str, Any]
+    raw_count: int
+
+
+class PipelineResponse(BaseModel):
+    """Schema for processing pipeline response."""
+
+    status: str
+    raw_count: int
+    steps: list[PipelineStepResult]
+    created_at: datetime
+
+
 class ProcessedDataResponse(BaseModel):
     """Schema for processed data response."""
 
@@ -59,6 +130,7 @@ class ProcessorInfo(BaseModel):
     name: str
     version: str
     description: str
+    parameters: dict[str, Any] = {}
 
     model_config = {"json_schema_extra": {
         "example": {
@@ -5,14 +5,42 @@ from typing import Any
 
 from pydantic import BaseModel, Field
 
+# Valid (min, max) range of each BME280 measurement, shared by all ingest paths
+BME280_RANGES: dict[str, tuple[float, float]] = {
+    "temperature_c": (-40, 85),
+    "humidity": (0, 100),
+    "pressure_hpa": (300, 1100),
+}
+DEVICE_ID_MAX_LENGTH = 100
+
 
 class BME280Reading(BaseModel):
     """Schema for BME280 sensor reading input."""
 
-    device_id: str = Field(..., description="Unique device identifier", min_length=1, max_length=100)
-    temperature_c: float = Field(..., description="Temperature in Celsius", ge=-40, le=85)
-    humidity: float = Field(..., description="Relative humidity percentage", ge=0, le=100)
-    pressure_hpa: float = Field(..., description="Atmospheric pressure in hPa", ge=300, le=1100)
+    device_id: str = Field(
+        ...,
+        description="Unique device identifier",
+        min_length=1,
+        max_length=DEVICE_ID_MAX_LENGTH,
+    )
+    temperature_c: float = Field(
+        ...,
+        description="Temperature in Celsius",
+        ge=BME280_RANGES["temperature_c"][0],
+        le=BME280_RANGES["temperature_c"][1],
+    )
+    humidity: float = Field(
+        ...,
+        description="Relative humidity percentage",
+        ge=BME280_RANGES["humidity"][0],
+        le=BME280_RANGES["humidity"][1],
+    )
+    pressure_hpa: float = Field(
+        ...,
+        description="Atmospheric pressure in hPa",
+        ge=BME280_RANGES["pressure_hpa"][0],
+        le=BME280_RANGES["pressure_hpa"][1],
+    )
     timestamp: datetime | None = Field(None, description="Reading timestamp (defaults to server time)")
     metadata: dict[str, Any] | None = Field(None, description="Additional metadata")
 
@@ -28,6 +56,46 @@ class BME280Reading(BaseModel):
     }}
 
 
+class BME280Batch(BaseModel):
+    """Schema for a batch of BME280 sensor readings."""
+
+    readings: list[BME280Reading] = Field(
+        ..., description="Readings to store", min_length=1, max_length=10000
+    )
+
+
+class BatchIngestResponse(BaseModel):
+    """Schema for batch ingest response."""
+
+    inserted: int
+
+
+class UploadRowError(BaseModel):
+    """A rejected CSV row."""
+
+    row: int = Field(..., description="1-based line number in the file (header is line 1)")
+    error: str
+
+
+class UploadStatus(BaseModel):
+    """Progress and outcome of a CSV measurement upload."""
+
+    upload_id: str
+    filename: str | None
+    status: str = Field(..., description="'running', 'completed' or 'failed'")
+    bytes_read: int = 0
+    total_bytes: int | None = None
+    rows_processed: int = 0
+    rows_inserted: int = 0
+    rows_rejected: int = 0
+    errors: list[UploadRowError] = Field(
+        default_factory=list, description="First rejected rows (capped)"
+    )
+    detail: str | None = None
+    started_at: datetime
+    finished_at: datetime | None = None
+
+
 class SensorReadingResponse(BaseModel):
     """Schema for sensor reading response."""
 
@@ -42,3 +110,34 @@ class SensorReadingResponse(BaseModel):
     created_at: datetime
 
     model_config = {"from_attributes": True, "populate_by_name": True}
+
+
+class ComparisonSeries(BaseModel):
+    """One device's values on the comparison bucket grid (null = no readings)."""
+
+    device_id: str
+    count: list[int]
+    temperature_c: list[float | None]
+    humidity: list[float | None]
+    pressure_hpa: list[float | None]
+
+
+class ComparisonResponse(BaseModel):
+    """Schema for aligned multi-device comparison data."""
+
+    sensor_type: str
+    bucket_seconds: int
+    timestamps: list[datetime] = Field(..., description="Start time of each bucket")
+    series: list[ComparisonSeries]
+
+
+class SeriesInfo(BaseModel):
+    """Schema for an indexed series."""
+
+    sensor_type: str
+    device_id: str
+    tags: dict[str, str]
+    first_timestamp: datetime
+    last_timestamp: datetime
+
+    model_config = {"from_attributes": True}
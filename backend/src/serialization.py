@@ -0,0 +1,95 @@
+"""Fast JSON responses for large query results.
+
+Query endpoints return plain row dictionaries encoded directly with orjson,
+which handles datetimes and floats natively. Returning a Response skips
+FastAPI's response-model validation and re-encoding; the route decorators keep
+their ``response_model`` so the OpenAPI schema is unchanged. Naive datetimes
+are rendered without an offset, as Pydantic does.
+
+Time-series endpoints also offer ``format=columnar``: one array per field
+instead of one object per row, with fields that are the same in every row
+hoisted into ``constants``. Bodies are compressed when the client accepts it.
+"""
+
+from collections.abc import Iterable
+from typing import Any, Literal
+
+import orjson
+from fastapi import Request, Response
+
+from .compression import compress_response
+from .profiling import phase
+
+ResponseFormat = Literal["rows", "columnar"]
+
+
+def to_columnar(rows: list[dict[str, Any]], hoist: Iterable[str] = ()) -> dict[str, Any]:
+    """
+    Convert row dictionaries into a columnar payload.
+
+    Row i can be rebuilt as ``{**constants, **{k: data[k][i] for k in data}}``.
+
+    Args:
+        rows: Row dictionaries sharing the same keys
+        hoist: Fields moved to ``constants`` when every row has the same value
+
+    Returns:
+        Dictionary with count, constants and data (field name to value array)
+    """
+    if not rows:
+        return {"count": 0, "format": "columnar", "constants": {}, "data": {}}
+
+    with phase("serialization"):
+        first = rows[0]
+        constants = {
+            key: first[key]
+            for key in hoist
+            if key in first and all(row[key] == first[key] for row in rows)
+        }
+        data = {key: [row[key] for row in rows] for key in first if key not in constants}
+    return {"count": len(rows), "format": "columnar", "constants": constants, "data": data}
+
+
+def json_response(
+    content: Any,
+    request: Request | None = None,
+    status_code: int = 200,
+) -> Response:
+    """
+    Encode content as a JSON response with orjson.
+
+    Args:
+        content: JSON-compatible data (dicts, lists, datetimes, numbers, strings)
+        request: Incoming request, used to negotiate compression (None disables it)
+        status_code: HTTP status code
+
+    Returns:
+        Response with an application/json body, gzip or brotli encoded if accepted
+    """
+    with phase("serialization"):
+        body = orjson.dumps(content)
+        response = Response(body, status_code=status_code, media_type="application/json")
+        return compress_response(response, request)
+
+
+def rows_response(
+    rows: list[dict[str, Any]],
+    request: Request,
+    response_format: ResponseFormat = "rows",
+    hoist: Iterable[str] = (),
+) -> Response:
+    """
+    Respond with query rows in the requested format.
+
+    Args:
+        rows: Row dictionaries
+        request: Incoming request
+        response_format: "rows" for {"count", "data": [...]} or "columnar"
+        hoist: Fields eligible for hoisting in the columnar format
+
+    Returns:
+        Encoded JSON response
+    """
+    if response_format == "columnar":
+        return json_response(to_columnar(rows, hoist), request)
+    return json_response({"count": len(rows), "data": rows}, request)
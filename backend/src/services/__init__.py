@@ -1,11 +1,31 @@
 """Business logic services."""
 
-from .data_ingestion import create_sensor_reading, query_raw_data
-from .data_processing import process_sensor_data, query_processed_data
+from .comparison import compare_devices
+from .data_ingestion import (
+    create_sensor_reading,
+    create_sensor_readings,
+    fetch_readings,
+    insert_readings,
+    query_raw_data,
+    query_raw_rows,
+)
+from .data_processing import (
+    merge_percentiles,
+    process_sensor_data,
+    query_processed_data,
+    query_processed_rows,
+)
 
 __all__ = [
+    "compare_devices",
     "create_sensor_reading",
+    "create_sensor_readings",
+    "insert_readings",
+    "fetch_readings",
     "query_raw_data",
+    "query_raw_rows",
     "process_sensor_data",
     "query_processed_data",
+    "query_processed_rows",
+    "merge_percentiles",
 ]
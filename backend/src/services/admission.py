@@ -0,0 +1,195 @@
+"""Ingest admission control.
+
+Protects the ingest path from misbehaving devices and from overload:
+
+- Each device has a token bucket refilled at ``rate`` readings per second up to
+  ``burst`` tokens. A request costs one token per reading. A bucket holding at
+  least ``min(cost, burst)`` tokens admits the request and may go negative, so
+  large batches are accepted and the device then waits for the debt to be
+  repaid. The debt is capped at ``burst`` tokens: a batch or backfill of any
+  size locks its device out for at most about ``burst / rate`` seconds.
+- A global limit on in-flight ingest requests sheds load before the database
+  saturates, so well-behaved devices keep low latency during a flood.
+
+Rejected requests carry a Retry-After hint in seconds.
+"""
+
+import math
+import time
+from collections.abc import AsyncIterator, Callable, Mapping
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from ..config import settings
+from ..metrics import CallbackMetric, registry
+
+
+class AdmissionRejected(Exception):
+    """Raised when an ingest request is throttled or shed."""
+
+    def __init__(self, reason: str, retry_after: int, device_id: str | None = None) -> None:
+        self.reason = reason
+        self.retry_after = retry_after
+        self.device_id = device_id
+        target = f" for device {device_id}" if device_id else ""
+        super().__init__(f"Ingest {reason}{target}; retry after {retry_after}s")
+
+
+@dataclass(slots=True)
+class TokenBucket:
+    """Token bucket state for one device."""
+
+    tokens: float
+    updated: float
+
+
+class AdmissionController:
+    """Per-device token buckets plus a global in-flight limit."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        max_in_flight: int,
+        enabled: bool = True,
+        max_devices: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Create an admission controller.
+
+        Args:
+            rate: Sustained readings per second allowed per device
+            burst: Bucket capacity (readings a device may send at once)
+            max_in_flight: Concurrent admitted requests before shedding
+            enabled: When False every request is admitted (counters still kept)
+            max_devices: Bucket count above which idle buckets are pruned
+            clock: Monotonic time source (overridable for tests)
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.enabled = enabled
+        self.max_devices = max_devices
+        self.clock = clock
+        self.buckets: dict[str, TokenBucket] = {}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.admitted = 0
+        self.throttled = 0
+        self.shed = 0
+
+    def _refill(self, device_id: str, now: float) -> TokenBucket:
+        """Get a device's bucket with tokens accrued since its last update."""
+        bucket = self.buckets.get(device_id)
+        if bucket is None:
+            if len(self.buckets) >= self.max_devices:
+                self._prune(now)
+            bucket = self.buckets[device_id] = TokenBucket(float(self.burst), now)
+        else:
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+            bucket.updated = now
+        return bucket
+
+    def _prune(self, now: float) -> None:
+        """Drop buckets that would be full by now; they carry no state."""
+        full_after = self.burst / self.rate if self.rate > 0 else math.inf
+        self.buckets = {
+            device_id: bucket
+            for device_id, bucket in self.buckets.items()
+            if now - bucket.updated < full_after
+        }
+
+    def check(self, costs: Mapping[str, int]) -> None:
+        """
+        Admit or reject a request without tracking it as in flight.
+
+        Args:
+            costs: Readings per device in the request
+
+        Raises:
+            AdmissionRejected: If the system is overloaded or a device is over its rate
+        """
+        if not self.enabled:
+            return
+
+        if self.in_flight >= self.max_in_flight:
+            self.shed += 1
+            raise AdmissionRejected("shed", retry_after=1)
+
+        now = self.clock()
+        buckets = [(self._refill(device_id, now), cost) for device_id, cost in costs.items()]
+        for (bucket, cost), device_id in zip(buckets, costs):
+            needed = min(cost, self.burst)
+            if bucket.tokens < needed:
+                self.throttled += 1
+                wait = (needed - bucket.tokens) / self.rate if self.rate > 0 else 60
+                raise AdmissionRejected("throttled", max(1, math.ceil(wait)), device_id)
+        for bucket, cost in buckets:
+            bucket.tokens = max(bucket.tokens - cost, -self.burst)
+
+    @asynccontextmanager
+    async def admit(self, costs: Mapping[str, int]) -> AsyncIterator[None]:
+        """
+        Admit a request and count it as in flight until the block exits.
+
+        Args:
+            costs: Readings per device in the request (empty for device-less work)
+
+        Raises:
+            AdmissionRejected: If the request is throttled or shed
+        """
+        self.check(costs)
+        self.admitted += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+
+    def status(self) -> dict[str, Any]:
+        """Return limits and counters."""
+        return {
+            "enabled": self.enabled,
+            "device_rate": self.rate,
+            "device_burst": self.burst,
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "admitted": self.admitted,
+            "throttled": self.throttled,
+            "shed": self.shed,
+            "tracked_devices": len(self.buckets),
+        }
+
+
+# Global admission controller for HTTP ingest
+ingest_admission = AdmissionController(
+    rate=settings.admission_device_rate,
+    burst=settings.admission_device_burst,
+    max_in_flight=settings.admission_max_in_flight,
+    enabled=settings.admission_enabled,
+)
+
+registry.register(
+    CallbackMetric(
+        "ingest_admission_requests_total",
+        "Ingest requests by admission outcome",
+        lambda: {
+            ("admitted",): ingest_admission.admitted,
+            ("throttled",): ingest_admission.throttled,
+            ("shed",): ingest_admission.shed,
+        },
+        ("outcome",),
+        type_name="counter",
+    )
+)
+registry.register(
+    CallbackMetric(
+        "ingest_requests_in_flight",
+        "Admitted ingest requests currently being processed",
+        lambda: {(): ingest_admission.in_flight},
+    )
+)
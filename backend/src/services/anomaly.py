@@ -0,0 +1,352 @@
+"""Streaming anomaly detection at ingest time.
+
+Every reading is scored as it is stored, against a small in-memory slot per
+(sensor type, device, measurement):
+
+* spike: the value deviates from an exponentially weighted running mean by
+  more than ``ANOMALY_Z_THRESHOLD`` running standard deviations
+* rate_of_change: the change since the previous reading exceeds the
+  measurement's limit in ``ANOMALY_RATE_LIMITS`` (per minute)
+* flat_line: the value has not changed for ``ANOMALY_FLATLINE_READINGS``
+  consecutive readings (a stuck sensor; reported once per run)
+
+Scoring is O(1) per value and never reads the database. Flagged readings are
+written to ``anomaly_events`` in the ingest transaction (in the device's
+shard when storage is sharded) and published to
+stream subscribers once it commits. Slot updates are staged on the session
+the same way and only applied on commit, so a batch that is rolled back and
+retried is scored again; of two transactions scoring the same device at once,
+the later commit's state wins. Slots start empty after a restart, so
+spikes are only scored after a warm-up of ``ANOMALY_WARMUP_READINGS``.
+Readings older than a slot's latest one are not scored.
+"""
+
+import asyncio
+import math
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass, replace
+from datetime import datetime
+from heapq import merge
+from itertools import islice
+from typing import Any
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..metrics import CallbackMetric, Counter, registry
+from ..models import AnomalyEvent
+from ..sharding import shards
+from .hot_tier import MEASUREMENTS, to_micros
+
+PENDING_KEY = "anomaly_events_pending"
+SLOTS_KEY = "anomaly_slots_pending"
+
+ANOMALY_EVENTS: Counter = registry.register(
+    Counter("anomaly_events_total", "Readings flagged by the anomaly engine", ("kind",))
+)
+
+SlotKey = tuple[str, str, str]
+
+
+@dataclass(slots=True)
+class _Slot:
+    """Running state of one device measurement."""
+
+    count: int = 0
+    mean: float = 0.0
+    variance: float = 0.0
+    last_value: float = 0.0
+    last_seconds: float = -math.inf
+    # Consecutive readings equal to the previous one
+    repeats: int = 0
+
+
+class AnomalyEngine:
+    """Per-device online detectors for spikes, rate of change and stuck sensors."""
+
+    def __init__(
+        self,
+        alpha: float,
+        warmup: int,
+        z_threshold: float,
+        rate_limits: Mapping[str, float],
+        flatline_readings: int,
+        enabled: bool = True,
+    ) -> None:
+        """
+        Create an engine with empty slots.
+
+        Args:
+            alpha: Weight of each reading in the running mean and variance
+            warmup: Readings per slot before spikes are scored
+            z_threshold: Standard deviations from the mean that make a spike
+            rate_limits: Largest plausible change per minute, per measurement
+            flatline_readings: Identical consecutive values that make a stuck sensor
+            enabled: When False nothing is scored
+        """
+        self.alpha = alpha
+        self.warmup = warmup
+        self.z_threshold = z_threshold
+        self.rate_limits = dict(rate_limits)
+        self.flatline_readings = flatline_readings
+        self.enabled = enabled
+        self.slots: dict[SlotKey, _Slot] = {}
+
+    def score(
+        self,
+        rows: Iterable[Mapping[str, Any]],
+        staged: dict[SlotKey, _Slot] | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Score readings in timestamp order and update the slots.
+
+        Args:
+            rows: Stored rows with sensor_type, device_id, timestamp and measurement keys
+            staged: Slots to update instead of the engine's own; a slot missing
+                from it starts as a copy of the engine's (see ``apply``)
+
+        Returns:
+            One event per flagged (reading, measurement, detector)
+        """
+        events: list[dict[str, Any]] = []
+        for row in sorted(rows, key=lambda row: to_micros(row["timestamp"])):
+            seconds = to_micros(row["timestamp"]) / 1_000_000
+            for name in MEASUREMENTS:
+                value = row.get(name)
+                if value is None:
+                    continue
+                key = (row["sensor_type"], row["device_id"], name)
+                slot = self._slot(key, staged)
+                if seconds <= slot.last_seconds:
+                    continue
+                for kind, score in self._check(slot, name, value, seconds):
+                    events.append(
+                        {
+                            "sensor_type": key[0],
+                            "device_id": key[1],
+                            "timestamp": row["timestamp"].replace(tzinfo=None),
+                            "measurement": name,
+                            "kind": kind,
+                            "value": value,
+                            "score": score,
+                        }
+                    )
+        return events
+
+    def _slot(self, key: SlotKey, staged: dict[SlotKey, _Slot] | None) -> _Slot:
+        """Find or create the slot to update, in the staged slots if given."""
+        slots = self.slots if staged is None else staged
+        slot = slots.get(key)
+        if slot is None:
+            current = self.slots.get(key) if staged is not None else None
+            slot = slots[key] = replace(current) if current else _Slot()
+        return slot
+
+    def apply(self, staged: Mapping[SlotKey, _Slot]) -> None:
+        """Make staged slot updates the engine's state."""
+        self.slots.update(staged)
+
+    def _check(
+        self, slot: _Slot, name: str, value: float, seconds: float
+    ) -> list[tuple[str, float]]:
+        """Run the detectors for one value, then fold it into the slot."""
+        flags: list[tuple[str, float]] = []
+        if slot.count:
+            change = value - slot.last_value
+            limit = self.rate_limits.get(name)
+            if limit is not None and change:
+                per_minute = change * 60 / (seconds - slot.last_seconds)
+                if abs(per_minute) > limit:
+                    flags.append(("rate_of_change", per_minute))
+            if change:
+                slot.repeats = 0
+            else:
+                slot.repeats += 1
+                if slot.repeats + 1 == self.flatline_readings:
+                    flags.append(("flat_line", float(slot.repeats + 1)))
+            if slot.count >= self.warmup and slot.variance > 0:
+                z = (value - slot.mean) / math.sqrt(slot.variance)
+                if abs(z) > self.z_threshold:
+                    flags.append(("spike", z))
+
+            # Exponentially weighted mean and variance
+            diff = value - slot.mean
+            increment = self.alpha * diff
+            slot.mean += increment
+            slot.variance = (1 - self.alpha) * (slot.variance + diff * increment)
+        else:
+            slot.mean = value
+
+        slot.count += 1
+        slot.last_value = value
+        slot.last_seconds = seconds
+        return flags
+
+    def clear(self) -> None:
+        """Forget all device state."""
+        self.slots.clear()
+
+
+class AnomalyBroker:
+    """In-process fan-out of committed anomaly events to stream subscribers."""
+
+    def __init__(self, queue_size: int) -> None:
+        """
+        Create a broker without subscribers.
+
+        Args:
+            queue_size: Events buffered per subscriber; a slow subscriber
+                misses events beyond this instead of slowing ingest
+        """
+        self.queue_size = queue_size
+        self.subscribers: set[asyncio.Queue[dict[str, Any]]] = set()
+        self.dropped = 0
+
+    def subscribe(self) -> "asyncio.Queue[dict[str, Any]]":
+        """Register a subscriber and return its event queue."""
+        queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: "asyncio.Queue[dict[str, Any]]") -> None:
+        """Remove a subscriber."""
+        self.subscribers.discard(queue)
+
+    def publish(self, events: list[dict[str, Any]]) -> None:
+        """Hand events to every subscriber without waiting."""
+        for queue in self.subscribers:
+            for item in events:
+                try:
+                    queue.put_nowait(item)
+                except asyncio.QueueFull:
+                    self.dropped += 1
+
+
+# Global engine and broker
+anomaly_engine = AnomalyEngine(
+    alpha=settings.anomaly_ewma_alpha,
+    warmup=settings.anomaly_warmup_readings,
+    z_threshold=settings.anomaly_z_threshold,
+    rate_limits=settings.anomaly_rate_limits_map,
+    flatline_readings=settings.anomaly_flatline_readings,
+    enabled=settings.anomaly_detection_enabled,
+)
+anomaly_broker = AnomalyBroker(settings.anomaly_subscriber_queue_size)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed(session: Session) -> None:
+    """Apply slots and publish events staged on a session once its transaction has committed."""
+    slots = session.info.pop(SLOTS_KEY, None)
+    if slots:
+        anomaly_engine.apply(slots)
+    events = session.info.pop(PENDING_KEY, None)
+    if events:
+        anomaly_broker.publish(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    """Forget slots and events staged on a session whose transaction rolled back."""
+    session.info.pop(SLOTS_KEY, None)
+    session.info.pop(PENDING_KEY, None)
+
+
+async def record_anomalies(db: AsyncSession, rows: Sequence[Mapping[str, Any]]) -> None:
+    """
+    Score a batch of stored readings and persist any anomalies.
+
+    Runs in the caller's transaction; the insert only happens when a reading
+    is flagged. Slot updates are staged on the session until it commits.
+
+    Args:
+        db: Session the readings are written with (main database or their shard)
+        rows: Stored rows with sensor_type, device_id, timestamp and measurement keys
+    """
+    if not anomaly_engine.enabled or not rows:
+        return
+
+    events = anomaly_engine.score(rows, db.info.setdefault(SLOTS_KEY, {}))
+    if not events:
+        return
+
+    await db.execute(insert(AnomalyEvent), events)
+    db.info.setdefault(PENDING_KEY, []).extend(events)
+    for item in events:
+        ANOMALY_EVENTS.inc(1, (item["kind"],))
+
+
+async def query_anomalies(
+    db: AsyncSession,
+    sensor_type: str | None = None,
+    device_id: str | None = None,
+    kind: str | None = None,
+    start_time: datetime | None = None,
+    end_time: datetime | None = None,
+    limit: int = 100,
+) -> list[AnomalyEvent]:
+    """
+    Query stored anomaly events with filters.
+
+    Args:
+        db: Database session
+        sensor_type: Filter by sensor type
+        device_id: Filter by device ID
+        kind: Filter by detector (spike, rate_of_change, flat_line)
+        start_time: Filter events for readings after this time
+        end_time: Filter events for readings before this time
+        limit: Maximum number of results
+
+    Returns:
+        List of AnomalyEvent objects, newest reading first
+    """
+    query = select(AnomalyEvent)
+    if sensor_type:
+        query = query.where(AnomalyEvent.sensor_type == sensor_type)
+    if device_id:
+        query = query.where(AnomalyEvent.device_id == device_id)
+    if kind:
+        query = query.where(AnomalyEvent.kind == kind)
+    if start_time:
+        query = query.where(AnomalyEvent.timestamp >= start_time)
+    if end_time:
+        query = query.where(AnomalyEvent.timestamp <= end_time)
+    query = query.order_by(AnomalyEvent.timestamp.desc(), AnomalyEvent.id.desc()).limit(limit)
+
+    async def fetch(session: AsyncSession) -> list[AnomalyEvent]:
+        result = await session.execute(query)
+        return list(result.scalars().all())
+
+    if shards is None:
+        return await fetch(db)
+    indexes = [shards.index_for(device_id)] if device_id else None
+    parts = await shards.gather(fetch, indexes)
+    # Each shard returns its newest `limit` events; merge them newest first
+    newest = merge(*parts, key=lambda item: (item.timestamp, item.id), reverse=True)
+    return list(islice(newest, limit))
+
+
+def get_anomaly_status() -> dict[str, Any]:
+    """Return the engine configuration, tracked slots and subscriber counts."""
+    return {
+        "enabled": anomaly_engine.enabled,
+        "ewma_alpha": anomaly_engine.alpha,
+        "warmup_readings": anomaly_engine.warmup,
+        "z_threshold": anomaly_engine.z_threshold,
+        "rate_limits_per_minute": anomaly_engine.rate_limits,
+        "flatline_readings": anomaly_engine.flatline_readings,
+        "tracked_slots": len(anomaly_engine.slots),
+        "subscribers": len(anomaly_broker.subscribers),
+        "dropped_events": anomaly_broker.dropped,
+    }
+
+
+registry.register(
+    CallbackMetric(
+        "anomaly_stream_subscribers",
+        "Connected anomaly stream subscribers",
+        lambda: {(): len(anomaly_broker.subscribers)},
+    )
+)
@@ -0,0 +1,155 @@
+"""Multi-device comparison queries.
+
+Averages several devices' readings into one shared grid of fixed-width time
+buckets with a single grouped query (per shard holding the devices), or from
+the hot tier when it covers the range. Buckets without readings are returned
+as gaps, so every series lines up with the same ``timestamps`` array.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import Integer, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from ..models import SensorReading
+from ..sharding import shards
+from ..timestamps import naive_utc
+from .hot_tier import EPOCH, MEASUREMENTS, hot_tier, to_micros
+
+MAX_BUCKETS = 10_000
+MAX_DEVICES = 50
+
+# device_id -> bucket index -> (count, mean temperature, mean humidity, mean pressure)
+BucketMeans = dict[str, dict[int, tuple[int, float | None, float | None, float | None]]]
+
+
+def _epoch_seconds(dialect: str) -> ColumnElement[int]:
+    """Whole seconds since the epoch of the reading timestamp, per dialect."""
+    if dialect == "postgresql":
+        return cast(func.floor(func.extract("epoch", SensorReading.timestamp)), Integer)
+    # Truncate the stored text to whole seconds first: strftime('%s') rounds fractions
+    return cast(func.strftime("%s", func.substr(SensorReading.timestamp, 1, 19)), Integer)
+
+
+async def _query_bucket_means(
+    db: AsyncSession,
+    sensor_type: str,
+    device_ids: list[str],
+    start_time: datetime,
+    end_time: datetime,
+    bucket_seconds: int,
+) -> BucketMeans:
+    """Run the grouped bucket query on the database(s) holding the devices."""
+    origin = to_micros(start_time) // 1_000_000
+
+    def build(dialect: str) -> Any:
+        # Integer floor division; timestamps are >= start, so never negative
+        bucket = ((_epoch_seconds(dialect) - origin) // bucket_seconds).label("bucket")
+        return (
+            select(
+                SensorReading.device_id,
+                bucket,
+                func.count(),
+                func.avg(SensorReading.temperature_c),
+                func.avg(SensorReading.humidity),
+                func.avg(SensorReading.pressure_hpa),
+            )
+            .where(
+                SensorReading.sensor_type == sensor_type,
+                SensorReading.device_id.in_(device_ids),
+                SensorReading.timestamp >= start_time,
+                SensorReading.timestamp <= end_time,
+            )
+            .group_by(SensorReading.device_id, bucket)
+        )
+
+    async def fetch(session: AsyncSession) -> list[Any]:
+        query = build(session.get_bind().dialect.name)
+        result = await session.execute(query)
+        return list(result.all())
+
+    if shards is None:
+        parts = [await fetch(db)]
+    else:
+        indexes = sorted({shards.index_for(device_id) for device_id in device_ids})
+        parts = await shards.gather(fetch, indexes)
+
+    means: BucketMeans = {device_id: {} for device_id in device_ids}
+    for rows in parts:
+        for device_id, index, count, temperature, humidity, pressure in rows:
+            means[device_id][int(index)] = (count, temperature, humidity, pressure)
+    return means
+
+
+async def compare_devices(
+    db: AsyncSession,
+    device_ids: list[str],
+    start_time: datetime,
+    end_time: datetime,
+    bucket_seconds: int,
+    sensor_type: str = "bme280",
+) -> dict[str, Any]:
+    """
+    Average several devices' readings onto a shared bucket grid.
+
+    Args:
+        db: Database session
+        device_ids: Devices to compare (duplicates are ignored)
+        start_time: Start of time range (inclusive; aware values are converted to UTC)
+        end_time: End of time range (inclusive)
+        bucket_seconds: Bucket width in seconds
+        sensor_type: Type of sensor
+
+    Returns:
+        Dictionary with the bucket start ``timestamps`` and one series per
+        device holding per-bucket ``count`` and mean measurements, with null
+        means (and a zero count) for buckets without readings
+
+    Raises:
+        ValueError: If the range, bucket width or device list is invalid, or the
+            range yields too many buckets
+    """
+    if bucket_seconds < 1:
+        raise ValueError("bucket must be at least 1 second")
+    start_time, end_time = naive_utc(start_time), naive_utc(end_time)
+    if end_time < start_time:
+        raise ValueError("end must not be before start")
+    device_ids = list(dict.fromkeys(device_ids))
+    if not device_ids or len(device_ids) > MAX_DEVICES:
+        raise ValueError(f"Compare between 1 and {MAX_DEVICES} devices")
+
+    origin = to_micros(start_time) // 1_000_000
+    last = to_micros(end_time) // 1_000_000
+    bucket_count = (last - origin) // bucket_seconds + 1
+    if bucket_count > MAX_BUCKETS:
+        raise ValueError(
+            f"Range spans {bucket_count} buckets (max {MAX_BUCKETS}); use a wider bucket"
+        )
+
+    means = hot_tier.bucket_means(sensor_type, device_ids, start_time, end_time, bucket_seconds)
+    if means is None:
+        means = await _query_bucket_means(
+            db, sensor_type, device_ids, start_time, end_time, bucket_seconds
+        )
+
+    timestamps = [
+        EPOCH + timedelta(seconds=origin + i * bucket_seconds) for i in range(bucket_count)
+    ]
+    gap = (0, None, None, None)
+    series = []
+    for device_id in device_ids:
+        buckets = means.get(device_id, {})
+        columns = list(zip(*(buckets.get(i, gap) for i in range(bucket_count))))
+        entry: dict[str, Any] = {"device_id": device_id, "count": list(columns[0])}
+        for name, values in zip(MEASUREMENTS, columns[1:]):
+            entry[name] = list(values)
+        series.append(entry)
+
+    return {
+        "sensor_type": sensor_type,
+        "bucket_seconds": bucket_seconds,
+        "timestamps": timestamps,
+        "series": series,
+    }
@@ -0,0 +1,245 @@
+"""Streaming CSV measurement upload service.
+
+Imports SCADA-style CSV exports without holding the file in memory. The
+upload is read in fixed-size byte chunks; each chunk's complete lines are
+parsed and validated in a worker thread (keeping the event loop free), then
+bulk inserted and committed before the next chunk is read.
+
+Expected columns (header required, case-insensitive, any order):
+``device_id``, ``timestamp``, ``temperature_c``, ``humidity``, ``pressure_hpa``.
+Timestamps may be ISO 8601 (converted to UTC when they carry an offset) or
+Unix epoch seconds. Any other non-empty columns are stored as reading metadata.
+"""
+
+import asyncio
+import codecs
+import csv
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Protocol
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..schemas.sensor import BME280_RANGES, DEVICE_ID_MAX_LENGTH, UploadRowError, UploadStatus
+from ..timestamps import naive_utc
+from .data_ingestion import insert_readings
+
+REQUIRED_COLUMNS = ("device_id", "timestamp", *BME280_RANGES)
+MAX_TRACKED_UPLOADS = 20
+
+# Recent uploads by ID, oldest first
+_uploads: OrderedDict[str, UploadStatus] = OrderedDict()
+
+
+class CSVFormatError(ValueError):
+    """Raised when the file as a whole cannot be imported (e.g. bad header)."""
+
+
+class AsyncReadable(Protocol):
+    """Minimal async file interface (satisfied by FastAPI's UploadFile)."""
+
+    async def read(self, size: int = -1) -> bytes:
+        """Read up to size bytes."""
+        ...
+
+
+def _parse_header(line: str) -> dict[str, int]:
+    """Map column names to indexes, checking required columns are present."""
+    names = [name.strip().lower() for name in next(csv.reader([line]), [])]
+    missing = [name for name in REQUIRED_COLUMNS if name not in names]
+    if missing:
+        raise CSVFormatError(f"Missing required column(s): {', '.join(missing)}")
+    return {name: index for index, name in enumerate(names) if name}
+
+
+def _parse_timestamp(value: str) -> datetime:
+    """Parse an ISO 8601 or epoch-seconds timestamp into naive UTC."""
+    value = value.strip()
+    if not value:
+        raise ValueError("missing timestamp")
+    if value.replace(".", "", 1).isdigit():
+        return datetime.utcfromtimestamp(float(value))
+    return naive_utc(datetime.fromisoformat(value))
+
+
+def _validate_lines(
+    lines: list[str],
+    columns: dict[str, int],
+    first_line: int,
+    sensor_type: str,
+) -> tuple[list[dict[str, Any]], list[tuple[int, str]], int]:
+    """
+    Parse and validate one chunk of CSV lines.
+
+    Runs in a worker thread. Bounds are the same as BME280Reading.
+
+    Args:
+        lines: Complete lines from the file
+        columns: Column name to index mapping from the header
+        first_line: File line number of lines[0]
+        sensor_type: Sensor type stored with each row
+
+    Returns:
+        Tuple of (valid rows, (line number, error) pairs, rows seen)
+    """
+    device_index = columns["device_id"]
+    timestamp_index = columns["timestamp"]
+    value_columns = [(name, columns[name], *BME280_RANGES[name]) for name in BME280_RANGES]
+    extra_columns = [
+        (name, index) for name, index in columns.items() if name not in REQUIRED_COLUMNS
+    ]
+    width = max(columns.values()) + 1
+    created_at = datetime.utcnow()
+
+    rows: list[dict[str, Any]] = []
+    errors: list[tuple[int, str]] = []
+    seen = 0
+    reader = csv.reader(lines)
+    for record in reader:
+        if not record:
+            continue
+        seen += 1
+        line = first_line + reader.line_num - 1
+        if len(record) < width:
+            errors.append((line, f"expected {width} columns, got {len(record)}"))
+            continue
+        try:
+            device_id = record[device_index].strip()
+            if not device_id or len(device_id) > DEVICE_ID_MAX_LENGTH:
+                raise ValueError("invalid device_id")
+            row: dict[str, Any] = {
+                "sensor_type": sensor_type,
+                "device_id": device_id,
+                "timestamp": _parse_timestamp(record[timestamp_index]),
+            }
+            for name, index, low, high in value_columns:
+                raw = record[index]
+                try:
+                    value = float(raw)
+                except ValueError:
+                    raise ValueError(f"invalid {name}: {raw!r}") from None
+                if not low <= value <= high:
+                    raise ValueError(f"{name}={raw} outside [{low}, {high}]")
+                row[name] = value
+        # Out-of-range epochs raise OverflowError or OSError rather than ValueError
+        except (ValueError, OverflowError, OSError) as e:
+            errors.append((line, str(e)))
+            continue
+        metadata = {name: record[index] for name, index in extra_columns if record[index]}
+        row["extra_metadata"] = metadata or None
+        row["created_at"] = created_at
+        rows.append(row)
+    return rows, errors, seen
+
+
+def _track(status: UploadStatus) -> None:
+    """Register an upload, forgetting the oldest beyond the tracking limit."""
+    _uploads[status.upload_id] = status
+    while len(_uploads) > MAX_TRACKED_UPLOADS:
+        _uploads.popitem(last=False)
+
+
+async def import_csv(
+    db: AsyncSession,
+    file: AsyncReadable,
+    filename: str | None = None,
+    total_bytes: int | None = None,
+    sensor_type: str = "bme280",
+) -> UploadStatus:
+    """
+    Stream a CSV file into the readings table chunk by chunk.
+
+    Each chunk is committed before the next is read, so a failure part-way
+    keeps the rows already imported and reports how far the upload got.
+
+    Args:
+        db: Database session
+        file: Uploaded file
+        filename: Original file name (for progress reporting)
+        total_bytes: File size if known (for progress reporting)
+        sensor_type: Type of sensor
+
+    Returns:
+        Final upload status with counts and the first rejected rows
+
+    Raises:
+        CSVFormatError: If the header is missing required columns
+    """
+    status = UploadStatus(
+        upload_id=uuid.uuid4().hex,
+        filename=filename,
+        status="running",
+        total_bytes=total_bytes,
+        started_at=datetime.utcnow(),
+    )
+    _track(status)
+
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    columns: dict[str, int] | None = None
+    pending = ""
+    next_line = 1
+    try:
+        while True:
+            chunk = await file.read(settings.csv_upload_chunk_bytes)
+            status.bytes_read += len(chunk)
+            final = not chunk
+            text = pending + decoder.decode(chunk, final=final)
+            if final:
+                pending = ""
+            else:
+                end = text.rfind("\n")
+                if end < 0:
+                    pending = text
+                    continue
+                text, pending = text[:end], text[end + 1 :]
+            # split("\n") rather than splitlines() keeps blank lines so row numbers
+            # stay exact; csv.reader tolerates the "\r" left by CRLF files.
+            lines = text.split("\n") if text or not final else []
+
+            if columns is None and lines:
+                columns = _parse_header(lines.pop(0))
+                next_line += 1
+
+            # The header is always parsed by the time data lines remain
+            if lines and columns is not None:
+                rows, errors, seen = await asyncio.to_thread(
+                    _validate_lines, lines, columns, next_line, sensor_type
+                )
+                next_line += len(lines)
+                await insert_readings(db, rows, source="csv")
+                await db.commit()
+
+                status.rows_processed += seen
+                status.rows_inserted += len(rows)
+                status.rows_rejected += len(errors)
+                room = settings.csv_upload_max_errors - len(status.errors)
+                status.errors.extend(
+                    UploadRowError(row=line, error=message) for line, message in errors[:room]
+                )
+
+            if final:
+                break
+
+        if columns is None:
+            raise CSVFormatError("File is empty")
+        status.status = "completed"
+    except Exception as e:
+        status.status = "failed"
+        status.detail = str(e)
+        raise
+    finally:
+        status.finished_at = datetime.utcnow()
+
+    return status
+
+
+def get_upload_status(upload_id: str) -> UploadStatus | None:
+    """Get the progress of a recent upload."""
+    return _uploads.get(upload_id)
+
+
+def list_uploads() -> list[UploadStatus]:
+    """List recent uploads, newest first."""
+    return list(reversed(_uploads.values()))
@@ -1,12 +1,103 @@
 """Data ingestion service."""
 
+import asyncio
+import heapq
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
 from datetime import datetime
+from itertools import islice
+from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import Select, insert, literal_column, select, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..metrics import INGEST_ROWS
 from ..models import SensorReading
+from ..profiling import phase
 from ..schemas.sensor import BME280Reading
+from ..sharding import shards
+from ..timestamps import naive_utc
+from .anomaly import record_anomalies
+from .device_state import record_readings
+from .hot_tier import MEASUREMENTS, hot_tier
+from .rollups import record_rollups
+from .tags import SeriesSpan, record_series, resolve_series, series_by_device, span_filter
+
+# Series combined into one UNION ALL query of a tag filter (SQLite allows 500 arms)
+SERIES_PER_QUERY = 100
+
+
+def reading_to_row(reading: BME280Reading, sensor_type: str = "bme280") -> dict[str, Any]:
+    """
+    Convert a validated reading into a row for bulk insertion.
+
+    Aware timestamps are converted to naive UTC, as on every ingest path.
+
+    Args:
+        reading: Validated BME280 reading data
+        sensor_type: Type of sensor (default: bme280)
+
+    Returns:
+        Dictionary keyed by SensorReading attribute names
+    """
+    now = datetime.utcnow()
+    return {
+        "sensor_type": sensor_type,
+        "device_id": reading.device_id,
+        "timestamp": naive_utc(reading.timestamp) if reading.timestamp else now,
+        "temperature_c": reading.temperature_c,
+        "humidity": reading.humidity,
+        "pressure_hpa": reading.pressure_hpa,
+        "extra_metadata": reading.metadata,
+        "created_at": now,
+    }
+
+
+def _stored_fields(reading: SensorReading) -> dict[str, Any]:
+    """Extract the fields tracked by the hot tier and summaries from a reading."""
+    row = {name: getattr(reading, name) for name in MEASUREMENTS}
+    row.update(
+        sensor_type=reading.sensor_type,
+        device_id=reading.device_id,
+        timestamp=reading.timestamp,
+        extra_metadata=reading.extra_metadata,
+        series_id=reading.series_id,
+    )
+    return row
+
+
+async def _record_summaries(db: AsyncSession, rows: list[dict[str, Any]]) -> None:
+    """
+    Update device state and rollups, and score anomalies.
+
+    Runs in the transaction that stores the rows, so the summaries commit or
+    roll back with them. The series index is updated before the rows are
+    inserted, as each row is stored with its series id.
+    """
+    await record_readings(db, rows)
+    await record_rollups(db, rows)
+    await record_anomalies(db, rows)
+
+
+async def _store_reading(db: AsyncSession, db_reading: SensorReading) -> None:
+    """Insert one reading with its series id, then stage and summarize it."""
+    row = _stored_fields(db_reading)
+    await record_series(db, [row])
+    db_reading.series_id = row["series_id"]
+    db.add(db_reading)
+    await db.flush()
+    await db.refresh(db_reading)
+    stored = [_stored_fields(db_reading)]
+    hot_tier.stage(db, stored)
+    await _record_summaries(db, stored)
+
+
+async def _store_rows(db: AsyncSession, rows: list[dict[str, Any]]) -> None:
+    """Bulk insert rows with their series ids, then stage and summarize them."""
+    await record_series(db, rows)
+    await db.execute(insert(SensorReading), rows)
+    hot_tier.stage(db, rows)
+    await _record_summaries(db, rows)
 
 
 async def create_sensor_reading(
@@ -15,6 +106,9 @@ async def create_sensor_reading(
     """
     Create a new sensor reading in the database.
 
+    When sharded storage is enabled the reading and its summaries are written
+    to its device's shard and committed there immediately.
+
     Args:
         db: Database session
         reading: Validated BME280 reading data
@@ -26,20 +120,254 @@ async def create_sensor_reading(
     db_reading = SensorReading(
         sensor_type=sensor_type,
         device_id=reading.device_id,
-        timestamp=reading.timestamp or datetime.utcnow(),
+        timestamp=naive_utc(reading.timestamp) if reading.timestamp else datetime.utcnow(),
         temperature_c=reading.temperature_c,
         humidity=reading.humidity,
         pressure_hpa=reading.pressure_hpa,
         extra_metadata=reading.metadata,
     )
 
-    db.add(db_reading)
-    await db.flush()
-    await db.refresh(db_reading)
+    if shards is not None:
+        async with shards.writer(shards.index_for(reading.device_id)) as shard_db:
+            await _store_reading(shard_db, db_reading)
+    else:
+        await _store_reading(db, db_reading)
 
+    INGEST_ROWS.inc(1, ("http",))
     return db_reading
 
 
+async def insert_readings(
+    db: AsyncSession, rows: list[dict[str, Any]], source: str = "batch"
+) -> int:
+    """
+    Bulk insert pre-validated reading rows.
+
+    This is the shared write path for batch ingest. Rows are written with a
+    single executemany per database; with sharded storage they are grouped by
+    shard and each shard is written concurrently. Device state, rollups, the
+    series index and anomaly events are updated in the same transaction as
+    the rows: the caller's, or each shard's own.
+
+    Args:
+        db: Database session
+        rows: Rows as produced by reading_to_row
+        source: Ingest path, for metrics (batch, csv, line_protocol)
+
+    Returns:
+        Number of rows inserted
+    """
+    if not rows:
+        return 0
+
+    if shards is None:
+        await _store_rows(db, rows)
+        INGEST_ROWS.inc(len(rows), (source,))
+        return len(rows)
+
+    by_shard: dict[int, list[dict[str, Any]]] = defaultdict(list)
+    for row in rows:
+        by_shard[shards.index_for(row["device_id"])].append(row)
+
+    async def write(index: int, part: list[dict[str, Any]]) -> None:
+        async with shards.writer(index) as shard_db:
+            await _store_rows(shard_db, part)
+
+    await asyncio.gather(*(write(index, part) for index, part in by_shard.items()))
+    INGEST_ROWS.inc(len(rows), (source,))
+    return len(rows)
+
+
+async def create_sensor_readings(
+    db: AsyncSession, readings: list[BME280Reading], sensor_type: str = "bme280"
+) -> int:
+    """
+    Create many sensor readings in one bulk insert.
+
+    Args:
+        db: Database session
+        readings: Validated BME280 readings
+        sensor_type: Type of sensor (default: bme280)
+
+    Returns:
+        Number of readings stored
+    """
+    return await insert_readings(db, [reading_to_row(r, sensor_type) for r in readings])
+
+
+async def _scatter(
+    db: AsyncSession, query: Select, device_ids: list[str] | None
+) -> list[list[Any]]:
+    """Execute an ORM query on the main database or on the shards holding the devices."""
+
+    async def fetch(session: AsyncSession) -> list[Any]:
+        result = await session.execute(query)
+        with phase("orm_hydration"):
+            return list(result.all())
+
+    if shards is None:
+        return [await fetch(db)]
+    indexes = None
+    if device_ids is not None:
+        indexes = sorted({shards.index_for(device_id) for device_id in device_ids})
+    return await shards.gather(fetch, indexes)
+
+
+async def _resolve_tags(
+    db: AsyncSession,
+    tags: dict[str, str] | None,
+    sensor_type: str | None,
+    device_id: str | None,
+) -> list[SeriesSpan] | None:
+    """Resolve tag filters into series spans (None when no tags are given)."""
+    if not tags:
+        return None
+    spans = await resolve_series(db, tags, sensor_type)
+    if device_id:
+        spans = [span for span in spans if span.device_id == device_id]
+    return spans
+
+
+def _scope(device_id: str | None, spans: list[SeriesSpan] | None) -> list[str] | None:
+    """Devices a query is limited to (None for all devices)."""
+    if spans is not None:
+        return sorted({span.device_id for span in spans})
+    return [device_id] if device_id else None
+
+
+# Columns of SensorReadingResponse, selected as plain rows for the fast response path
+RAW_RESPONSE_COLUMNS = (
+    SensorReading.id,
+    SensorReading.sensor_type,
+    SensorReading.device_id,
+    SensorReading.timestamp,
+    SensorReading.temperature_c,
+    SensorReading.humidity,
+    SensorReading.pressure_hpa,
+    SensorReading.extra_metadata.label("metadata"),
+    SensorReading.created_at,
+)
+
+
+def _raw_filters(
+    query: Select,
+    sensor_type: str | None,
+    device_id: str | None,
+    start_time: datetime | None,
+    end_time: datetime | None,
+) -> Select:
+    """Apply the raw-data filters to a query."""
+    if sensor_type:
+        query = query.where(SensorReading.sensor_type == sensor_type)
+    if device_id:
+        query = query.where(SensorReading.device_id == device_id)
+    if start_time:
+        query = query.where(SensorReading.timestamp >= start_time)
+    if end_time:
+        query = query.where(SensorReading.timestamp <= end_time)
+    return query
+
+
+def _raw_query(
+    query: Select,
+    sensor_type: str | None,
+    device_id: str | None,
+    start_time: datetime | None,
+    end_time: datetime | None,
+    limit: int,
+) -> Select:
+    """Apply the raw-data filters, newest-first ordering and limit to a query."""
+    query = _raw_filters(query, sensor_type, device_id, start_time, end_time)
+    return query.order_by(SensorReading.timestamp.desc()).limit(limit)
+
+
+def _series_query(
+    columns: tuple[Any, ...],
+    arms: list[tuple[SeriesSpan, datetime, datetime]],
+    limit: int,
+) -> Any:
+    """
+    Build one query for the newest `limit` rows of several series.
+
+    Each arm of the UNION ALL is a range of ``idx_series_time``, already in
+    timestamp order, so the outer ORDER BY merges the arms instead of sorting
+    their union.
+    """
+    selects = [
+        _raw_filters(
+            select(*columns).where(SensorReading.series_id == span.series_id),
+            span.sensor_type,
+            span.device_id,
+            start,
+            end,
+        )
+        for span, start, end in arms
+    ]
+    union = union_all(*selects).order_by(literal_column("timestamp").desc()).limit(limit)
+    return select(*columns).from_statement(union)
+
+
+async def _raw_parts(
+    db: AsyncSession,
+    columns: tuple[Any, ...],
+    sensor_type: str | None,
+    device_id: str | None,
+    start_time: datetime | None,
+    end_time: datetime | None,
+    limit: int,
+    spans: list[SeriesSpan] | None,
+) -> list[list[Any]]:
+    """
+    Fetch the newest `limit` matching rows of each shard, or of each group of tagged series.
+
+    A tag filter queries the series of each shard together, in chunks of
+    SERIES_PER_QUERY; the shards are queried concurrently.
+    """
+    start_time = naive_utc(start_time) if start_time else None
+    end_time = naive_utc(end_time) if end_time else None
+    if spans is None:
+        query = _raw_query(select(*columns), sensor_type, device_id, start_time, end_time, limit)
+        return await _scatter(db, query, _scope(device_id, None))
+
+    by_shard: dict[int, list[tuple[SeriesSpan, datetime, datetime]]] = defaultdict(list)
+    for span in spans:
+        start = max(start_time, span.first_timestamp) if start_time else span.first_timestamp
+        end = min(end_time, span.last_timestamp) if end_time else span.last_timestamp
+        if start > end:
+            continue
+        index = shards.index_for(span.device_id) if shards is not None else 0
+        by_shard[index].append((span, start, end))
+
+    def fetch(
+        arms: list[tuple[SeriesSpan, datetime, datetime]],
+    ) -> Callable[[AsyncSession], Awaitable[list[list[Any]]]]:
+        async def run(session: AsyncSession) -> list[list[Any]]:
+            parts = []
+            for offset in range(0, len(arms), SERIES_PER_QUERY):
+                query = _series_query(columns, arms[offset : offset + SERIES_PER_QUERY], limit)
+                result = await session.execute(query)
+                with phase("orm_hydration"):
+                    parts.append(list(result.all()))
+            return parts
+
+        return run
+
+    if shards is None:
+        return await fetch(by_shard[0])(db) if by_shard else []
+    results = await asyncio.gather(
+        *(shards.gather(fetch(arms), [index]) for index, arms in by_shard.items())
+    )
+    return [part for result in results for parts in result for part in parts]
+
+
+def _newest(parts: list[list[Any]], key: Callable[[Any], datetime], limit: int) -> list[Any]:
+    """Merge per-shard or per-series newest-first results, keeping the newest `limit` rows."""
+    if len(parts) == 1:
+        return parts[0]
+    # Each part holds its newest `limit` rows; merge them newest first
+    return list(islice(heapq.merge(*parts, key=key, reverse=True), limit))
+
+
 async def query_raw_data(
     db: AsyncSession,
     sensor_type: str | None = None,
@@ -47,6 +375,7 @@ async def query_raw_data(
     start_time: datetime | None = None,
     end_time: datetime | None = None,
     limit: int = 100,
+    tags: dict[str, str] | None = None,
 ) -> list[SensorReading]:
     """
     Query raw sensor readings with filters.
@@ -58,22 +387,114 @@ async def query_raw_data(
         start_time: Filter readings after this time
         end_time: Filter readings before this time
         limit: Maximum number of results
+        tags: Filter by indexed metadata tags (key -> value)
 
     Returns:
-        List of SensorReading objects
+        List of SensorReading objects, newest first
+
+    Raises:
+        ValueError: If a tag key is not indexed
     """
-    query = select(SensorReading)
+    spans = await _resolve_tags(db, tags, sensor_type, device_id)
+    if spans == []:
+        return []
+    parts = await _raw_parts(
+        db, (SensorReading,), sensor_type, device_id, start_time, end_time, limit, spans
+    )
+    return [row[0] for row in _newest(parts, lambda row: row[0].timestamp, limit)]
+
+
+async def query_raw_rows(
+    db: AsyncSession,
+    sensor_type: str | None = None,
+    device_id: str | None = None,
+    start_time: datetime | None = None,
+    end_time: datetime | None = None,
+    limit: int = 100,
+    tags: dict[str, str] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Query raw sensor readings as plain dictionaries.
+
+    Same filters and ordering as query_raw_data, but selects columns through
+    Core instead of loading ORM objects. Keys match SensorReadingResponse.
+
+    Returns:
+        List of reading dictionaries, newest first
+
+    Raises:
+        ValueError: If a tag key is not indexed
+    """
+    spans = await _resolve_tags(db, tags, sensor_type, device_id)
+    if spans == []:
+        return []
+    parts = await _raw_parts(
+        db, RAW_RESPONSE_COLUMNS, sensor_type, device_id, start_time, end_time, limit, spans
+    )
+    with phase("orm_hydration"):
+        return [row._asdict() for row in _newest(parts, lambda row: row.timestamp, limit)]
+
+
+async def fetch_readings(
+    db: AsyncSession,
+    sensor_type: str,
+    start_time: datetime,
+    end_time: datetime,
+    device_id: str | None = None,
+    tags: dict[str, str] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Load all readings in a time range as plain dictionaries.
+
+    Used by the processing service. Served from the hot tier when it covers
+    the range; otherwise results from all shards are merged in timestamp order.
+
+    Args:
+        db: Database session
+        sensor_type: Type of sensor
+        start_time: Start of time range (inclusive)
+        end_time: End of time range (inclusive)
+        device_id: Optional specific device ID
+        tags: Optional indexed metadata tags (key -> value)
+
+    Returns:
+        Readings with device_id, timestamp, temperature_c, humidity and
+        pressure_hpa keys, oldest first
+
+    Raises:
+        ValueError: If a tag key is not indexed
+    """
+    start_time, end_time = naive_utc(start_time), naive_utc(end_time)
+    spans = await _resolve_tags(db, tags, sensor_type, device_id)
+    if spans == []:
+        return []
+
+    devices = _scope(device_id, spans)
+    series = series_by_device(spans) if spans is not None else None
+    cached = hot_tier.fetch(sensor_type, start_time, end_time, device_id, devices, series)
+    if cached is not None:
+        return cached
+
+    query = select(
+        SensorReading.device_id,
+        SensorReading.timestamp,
+        SensorReading.temperature_c,
+        SensorReading.humidity,
+        SensorReading.pressure_hpa,
+    ).where(
+        SensorReading.sensor_type == sensor_type,
+        SensorReading.timestamp >= start_time,
+        SensorReading.timestamp <= end_time,
+    )
 
-    if sensor_type:
-        query = query.where(SensorReading.sensor_type == sensor_type)
     if device_id:
         query = query.where(SensorReading.device_id == device_id)
-    if start_time:
-        query = query.where(SensorReading.timestamp >= start_time)
-    if end_time:
-        query = query.where(SensorReading.timestamp <= end_time)
+    if spans is not None:
+        query = query.where(span_filter(spans))
 
-    query = query.order_by(SensorReading.timestamp.desc()).limit(limit)
+    query = query.order_by(SensorReading.timestamp)
 
-    result = await db.execute(query)
-    return list(result.scalars().all())
+    parts = await _scatter(db, query, devices)
+    rows = parts[0] if len(parts) == 1 else heapq.merge(*parts, key=lambda row: row[1])
+    with phase("orm_hydration"):
+        return [row._asdict() for row in rows]
@@ -1,12 +1,97 @@
 """Data processing service."""
 
+import logging
+import math
+import time
+from collections.abc import Iterable
 from datetime import datetime
+from graphlib import CycleError, TopologicalSorter
+from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import Select, func, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..models import ProcessedData, SensorReading
-from ..processors import PROCESSORS
+from ..database import AsyncSessionLocal
+from ..metrics import PROCESSING_JOB_DURATION, PROCESSING_ROWS_SCANNED
+from ..models import ProcessedData, ProcessedMetric
+from ..processors import PROCESSORS, TransformProcessor
+from ..processors.percentile import DEFAULT_QUANTILES, MEASUREMENTS, PercentileProcessor, summarize
+from ..processors.tdigest import TDigest
+from ..profiling import phase
+from ..schemas.processing import PipelineStep
+from ..timestamps import naive_utc
+from .data_ingestion import fetch_readings
+
+logger = logging.getLogger(__name__)
+
+# Input name of pipeline steps that read the scanned raw readings
+RAW_INPUT = "raw"
+
+REBUILD_PARTITION_SIZE = 1_000
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def metric_fields(result: dict[str, Any]) -> dict[str, float]:
+    """
+    Numeric fields of a processing result, keyed as in ``processed_metrics``.
+
+    Top-level numbers keep their key; numbers one level down are keyed
+    "<outer>.<inner>" (e.g. "temperature_c.p95"). Lists, strings and deeper
+    structures such as digests and series arrays are not metrics.
+    """
+    fields = {}
+    for key, value in result.items():
+        if isinstance(value, dict):
+            for inner, item in value.items():
+                if _is_number(item):
+                    fields[f"{key}.{inner}"] = float(item)
+        elif _is_number(value):
+            fields[key] = float(value)
+    return fields
+
+
+def _metric_rows(processed: ProcessedData) -> list[dict[str, Any]]:
+    """
+    ``processed_metrics`` rows of a stored result.
+
+    Only results over the processor's plain scope (raw readings, default
+    parameters, no tag filter) are recorded, so a series never mixes windows
+    computed differently.
+    """
+    result = processed.result
+    if "tags" in result or "params" in result or result.get("input", RAW_INPUT) != RAW_INPUT:
+        return []
+    return [
+        {
+            "processed_id": processed.id,
+            "field": field,
+            "processor_name": processed.processor_name,
+            "sensor_type": processed.sensor_type,
+            "device_id": processed.device_id,
+            "start_time": processed.start_time,
+            "end_time": processed.end_time,
+            "value": value,
+        }
+        for field, value in metric_fields(result).items()
+    ]
+
+
+async def record_metrics(db: AsyncSession, processed: Iterable[ProcessedData]) -> None:
+    """
+    Store the numeric result fields of flushed ProcessedData rows.
+
+    Runs in the caller's transaction, so the metrics commit with the results.
+
+    Args:
+        db: Database session
+        processed: Flushed ProcessedData objects (with IDs)
+    """
+    rows = [row for item in processed for row in _metric_rows(item)]
+    if rows:
+        await db.execute(insert(ProcessedMetric), rows)
 
 
 async def process_sensor_data(
@@ -16,6 +101,8 @@ async def process_sensor_data(
     end_time: datetime,
     sensor_type: str = "bme280",
     device_id: str | None = None,
+    tags: dict[str, str] | None = None,
+    params: dict[str, Any] | None = None,
 ) -> ProcessedData:
     """
     Process sensor data using specified processor.
@@ -27,49 +114,38 @@ async def process_sensor_data(
         end_time: End of time range
         sensor_type: Type of sensor
         device_id: Optional specific device ID
+        tags: Optional indexed metadata tags (e.g. a site or well); recorded
+            in the result
+        params: Optional processor parameters; recorded in the result
 
     Returns:
         ProcessedData object with results
 
     Raises:
-        ValueError: If processor not found
+        ValueError: If processor not found, its parameters are invalid or a
+            tag key is not indexed
     """
     if processor_name not in PROCESSORS:
         raise ValueError(f"Unknown processor: {processor_name}")
 
+    started = time.perf_counter()
+
     # Get processor instance
     processor_class = PROCESSORS[processor_name]
-    processor = processor_class()
-
-    # Query raw data
-    query = select(SensorReading).where(
-        SensorReading.sensor_type == sensor_type,
-        SensorReading.timestamp >= start_time,
-        SensorReading.timestamp <= end_time,
-    )
-
-    if device_id:
-        query = query.where(SensorReading.device_id == device_id)
+    processor = processor_class(**(params or {}))
 
-    result = await db.execute(query)
-    readings = result.scalars().all()
-
-    # Convert to dictionaries for processing
-    readings_dict = [
-        {
-            "device_id": r.device_id,
-            "timestamp": r.timestamp,
-            "temperature_c": r.temperature_c,
-            "humidity": r.humidity,
-            "pressure_hpa": r.pressure_hpa,
-        }
-        for r in readings
-    ]
+    # Query raw data (merged across shards when sharding is enabled)
+    readings_dict = await fetch_readings(db, sensor_type, start_time, end_time, device_id, tags)
 
     # Process data
-    result_data = await processor.process(
-        readings_dict, start_time, end_time, sensor_type, device_id
-    )
+    with phase("processor_compute"):
+        result_data = await processor.process(
+            readings_dict, start_time, end_time, sensor_type, device_id
+        )
+    if tags:
+        result_data = {**result_data, "tags": tags}
+    if params:
+        result_data = {**result_data, "params": params}
 
     # Save processed data
     processed = ProcessedData(
@@ -80,16 +156,285 @@ async def process_sensor_data(
         sensor_type=sensor_type,
         device_id=device_id,
         result=result_data,
-        raw_count=len(readings),
+        raw_count=len(readings_dict),
     )
 
     db.add(processed)
     await db.flush()
     await db.refresh(processed)
+    await record_metrics(db, [processed])
 
+    PROCESSING_ROWS_SCANNED.inc(len(readings_dict), (processor.name,))
+    PROCESSING_JOB_DURATION.observe(time.perf_counter() - started, (processor.name,))
     return processed
 
 
+def _pipeline_order(steps: list[PipelineStep]) -> list[PipelineStep]:
+    """
+    Validate a pipeline and sort its steps so every step follows its input.
+
+    Raises:
+        ValueError: If step IDs repeat, a processor or input is unknown, an
+            input does not produce readings, or the steps form a cycle
+    """
+    by_id: dict[str, PipelineStep] = {}
+    for step in steps:
+        if step.id == RAW_INPUT or step.id in by_id:
+            raise ValueError(f"Duplicate or reserved step id: {step.id}")
+        if step.processor not in PROCESSORS:
+            raise ValueError(f"Unknown processor in step {step.id}: {step.processor}")
+        by_id[step.id] = step
+
+    graph: dict[str, set[str]] = {}
+    for step in steps:
+        if step.input == RAW_INPUT:
+            graph[step.id] = set()
+            continue
+        source = by_id.get(step.input)
+        if source is None:
+            raise ValueError(f"Step {step.id} reads unknown input: {step.input}")
+        if not issubclass(PROCESSORS[source.processor], TransformProcessor):
+            raise ValueError(
+                f"Step {step.id} reads {step.input}, but processor {source.processor} "
+                "does not produce readings"
+            )
+        graph[step.id] = {step.input}
+
+    try:
+        return [by_id[step_id] for step_id in TopologicalSorter(graph).static_order()]
+    except CycleError as e:
+        raise ValueError(f"Pipeline steps form a cycle: {' -> '.join(e.args[1])}") from e
+
+
+async def run_pipeline(
+    db: AsyncSession,
+    steps: list[PipelineStep],
+    start_time: datetime,
+    end_time: datetime,
+    sensor_type: str = "bme280",
+    device_id: str | None = None,
+    tags: dict[str, str] | None = None,
+) -> tuple[int, list[tuple[PipelineStep, ProcessedData]]]:
+    """
+    Run several processors as a DAG over one scan of the raw readings.
+
+    Steps read either the raw readings or the readings derived by an earlier
+    transform step (e.g. downsample -> threshold). Each derived series is
+    computed once and shared by all steps reading it. One ProcessedData row
+    is stored per step; they are flushed together, so the caller's commit
+    stores all of them or none.
+
+    Args:
+        db: Database session
+        steps: Pipeline steps, in any order
+        start_time: Start of time range
+        end_time: End of time range
+        sensor_type: Type of sensor
+        device_id: Optional specific device ID
+        tags: Optional indexed metadata tags; recorded in every result
+
+    Returns:
+        Number of raw readings scanned, and each step with its stored result
+        in execution order
+
+    Raises:
+        ValueError: If the pipeline is invalid, a step's parameters are
+            invalid or a tag key is not indexed
+    """
+    ordered = _pipeline_order(steps)
+    # Instantiated up front so invalid parameters fail before the scan
+    processors = {step.id: PROCESSORS[step.processor](**step.params) for step in ordered}
+
+    readings = await fetch_readings(db, sensor_type, start_time, end_time, device_id, tags)
+    PROCESSING_ROWS_SCANNED.inc(len(readings), ("pipeline",))
+
+    outputs: dict[str, list[dict[str, Any]]] = {RAW_INPUT: readings}
+    results = []
+    for step in ordered:
+        started = time.perf_counter()
+        processor = processors[step.id]
+        source = outputs[step.input]
+        with phase("processor_compute"):
+            if isinstance(processor, TransformProcessor):
+                derived = await processor.transform(
+                    source, start_time, end_time, sensor_type, device_id
+                )
+                outputs[step.id] = derived
+                result_data = processor.summarize(source, derived)
+            else:
+                result_data = await processor.process(
+                    source, start_time, end_time, sensor_type, device_id
+                )
+
+        result_data = {**result_data, "pipeline_step": step.id, "input": step.input}
+        if step.params:
+            result_data["params"] = step.params
+        if tags:
+            result_data["tags"] = tags
+        processed = ProcessedData(
+            processor_name=processor.name,
+            processor_version=processor.version,
+            start_time=start_time,
+            end_time=end_time,
+            sensor_type=sensor_type,
+            device_id=device_id,
+            result=result_data,
+            raw_count=len(source),
+        )
+        db.add(processed)
+        results.append((step, processed))
+        PROCESSING_JOB_DURATION.observe(time.perf_counter() - started, (processor.name,))
+
+    await db.flush()
+    for _, processed in results:
+        await db.refresh(processed)
+    await record_metrics(db, (processed for _, processed in results))
+    return len(readings), results
+
+
+async def query_processed_series(
+    db: AsyncSession,
+    processor_name: str,
+    fields: list[str],
+    sensor_type: str = "bme280",
+    device_id: str | None = None,
+    start_time: datetime | None = None,
+    end_time: datetime | None = None,
+    limit: int = 10_000,
+) -> dict[str, Any]:
+    """
+    Read result fields of one processor over time as aligned arrays.
+
+    Served from ``processed_metrics`` with one index range scan per field;
+    the JSON results are not read. Points are aligned on the window end time.
+    When a window was processed more than once, the newest result wins.
+
+    Args:
+        db: Database session
+        processor_name: Processor whose results are read
+        fields: Result fields (see ``metric_fields``), e.g. "avg_temperature_c"
+        sensor_type: Type of sensor
+        device_id: Optional specific device ID (None: results over all devices)
+        start_time: Only windows ending at or after this time
+        end_time: Only windows ending at or before this time
+        limit: Maximum number of windows read per field, oldest first
+
+    Returns:
+        Dictionary with the window end ``timestamps`` and one array per field
+        in ``series`` (null where a window lacks the field)
+
+    Raises:
+        ValueError: If no field is requested
+    """
+    if not fields:
+        raise ValueError("At least one field is required")
+    fields = list(dict.fromkeys(fields))
+
+    # (window start, window end) -> field -> (processed ID, value)
+    windows: dict[tuple[datetime, datetime], dict[str, tuple[int, float]]] = {}
+    for field in fields:
+        query = select(
+            ProcessedMetric.start_time,
+            ProcessedMetric.end_time,
+            ProcessedMetric.processed_id,
+            ProcessedMetric.value,
+        ).where(
+            ProcessedMetric.processor_name == processor_name,
+            ProcessedMetric.sensor_type == sensor_type,
+            ProcessedMetric.field == field,
+            ProcessedMetric.device_id == device_id
+            if device_id
+            else ProcessedMetric.device_id.is_(None),
+        )
+        if start_time:
+            query = query.where(ProcessedMetric.end_time >= start_time)
+        if end_time:
+            query = query.where(ProcessedMetric.end_time <= end_time)
+        query = query.order_by(ProcessedMetric.end_time).limit(limit)
+
+        for window_start, window_end, processed_id, value in await db.execute(query):
+            values = windows.setdefault((window_start, window_end), {})
+            if field not in values or values[field][0] < processed_id:
+                values[field] = (processed_id, value)
+
+    ordered = sorted(windows, key=lambda window: (window[1], window[0]))[:limit]
+    series = {
+        field: [
+            windows[window][field][1] if field in windows[window] else None
+            for window in ordered
+        ]
+        for field in fields
+    }
+    return {
+        "processor": processor_name,
+        "sensor_type": sensor_type,
+        "device_id": device_id,
+        "count": len(ordered),
+        "timestamps": [window_end for _, window_end in ordered],
+        "series": series,
+    }
+
+
+async def rebuild_processed_metrics() -> int:
+    """
+    Populate ``processed_metrics`` from stored results if it is empty.
+
+    Returns:
+        Number of metric rows written
+    """
+    async with AsyncSessionLocal() as db:
+        if await db.scalar(select(func.count()).select_from(ProcessedMetric)):
+            return 0
+
+        written = 0
+        result = await db.stream(select(ProcessedData).order_by(ProcessedData.id))
+        async for partition in result.scalars().partitions(REBUILD_PARTITION_SIZE):
+            rows = [row for processed in partition for row in _metric_rows(processed)]
+            if rows:
+                await db.execute(insert(ProcessedMetric), rows)
+                written += len(rows)
+        if written:
+            await db.commit()
+            logger.info(f"Rebuilt processed metrics with {written} rows")
+        return written
+
+
+# Columns of ProcessedDataResponse, selected as plain rows for the fast response path
+PROCESSED_RESPONSE_COLUMNS = (
+    ProcessedData.id,
+    ProcessedData.processor_name,
+    ProcessedData.processor_version,
+    ProcessedData.start_time,
+    ProcessedData.end_time,
+    ProcessedData.sensor_type,
+    ProcessedData.device_id,
+    ProcessedData.result,
+    ProcessedData.raw_count,
+    ProcessedData.created_at,
+)
+
+
+def _processed_query(
+    query: Select,
+    processor_name: str | None,
+    sensor_type: str | None,
+    start_time: datetime | None,
+    end_time: datetime | None,
+    limit: int,
+) -> Select:
+    """Apply the processed-data filters, newest-first ordering and limit to a query."""
+    if processor_name:
+        query = query.where(ProcessedData.processor_name == processor_name)
+    if sensor_type:
+        query = query.where(ProcessedData.sensor_type == sensor_type)
+    if start_time:
+        query = query.where(ProcessedData.start_time >= start_time)
+    if end_time:
+        query = query.where(ProcessedData.end_time <= end_time)
+
+    return query.order_by(ProcessedData.created_at.desc()).limit(limit)
+
+
 async def query_processed_data(
     db: AsyncSession,
     processor_name: str | None = None,
@@ -112,18 +457,146 @@ async def query_processed_data(
     Returns:
         List of ProcessedData objects
     """
-    query = select(ProcessedData)
+    query = _processed_query(
+        select(ProcessedData), processor_name, sensor_type, start_time, end_time, limit
+    )
 
-    if processor_name:
-        query = query.where(ProcessedData.processor_name == processor_name)
-    if sensor_type:
-        query = query.where(ProcessedData.sensor_type == sensor_type)
-    if start_time:
-        query = query.where(ProcessedData.start_time >= start_time)
-    if end_time:
-        query = query.where(ProcessedData.end_time <= end_time)
+    result = await db.execute(query)
+    with phase("orm_hydration"):
+        return list(result.scalars().all())
+
+
+async def query_processed_rows(
+    db: AsyncSession,
+    processor_name: str | None = None,
+    sensor_type: str | None = None,
+    start_time: datetime | None = None,
+    end_time: datetime | None = None,
+    limit: int = 100,
+) -> list[dict[str, Any]]:
+    """
+    Query processed data as plain dictionaries.
+
+    Same filters and ordering as query_processed_data, but selects columns
+    through Core instead of loading ORM objects. Keys match ProcessedDataResponse.
 
-    query = query.order_by(ProcessedData.created_at.desc()).limit(limit)
+    Returns:
+        List of result dictionaries, newest first
+    """
+    query = _processed_query(
+        select(*PROCESSED_RESPONSE_COLUMNS),
+        processor_name,
+        sensor_type,
+        start_time,
+        end_time,
+        limit,
+    )
 
     result = await db.execute(query)
-    return list(result.scalars().all())
+    with phase("orm_hydration"):
+        return [row._asdict() for row in result]
+
+
+async def merge_percentiles(
+    db: AsyncSession,
+    start_time: datetime,
+    end_time: datetime,
+    sensor_type: str = "bme280",
+    device_id: str | None = None,
+    quantiles: tuple[float, ...] = DEFAULT_QUANTILES,
+) -> dict[str, Any]:
+    """
+    Estimate percentiles over a period by merging stored percentile windows.
+
+    Stored ``percentile`` results inside the period (same sensor type and
+    device scope, no tag filter, computed from raw readings) are merged, and
+    only the readings in gaps between them are scanned. A reading stamped
+    exactly on the shared boundary of two adjacent windows is counted in both.
+
+    Args:
+        db: Database session
+        start_time: Start of time range (inclusive)
+        end_time: End of time range (inclusive)
+        sensor_type: Type of sensor
+        device_id: Optional specific device ID (None: windows over all devices)
+        quantiles: Quantiles to estimate (0-1)
+
+    Returns:
+        Dictionary with per-measurement count, min, max and percentiles, plus
+        the number of windows merged and raw readings scanned
+
+    Raises:
+        ValueError: If the range or a quantile is invalid
+    """
+    # Stored window bounds are naive UTC and are compared with these in Python
+    start_time, end_time = naive_utc(start_time), naive_utc(end_time)
+    if end_time < start_time:
+        raise ValueError("end must not be before start")
+    if any(not 0 <= q <= 1 for q in quantiles):
+        raise ValueError("Quantiles must be between 0 and 1")
+
+    query = select(ProcessedData.start_time, ProcessedData.end_time, ProcessedData.result).where(
+        ProcessedData.processor_name == PercentileProcessor.name,
+        ProcessedData.sensor_type == sensor_type,
+        ProcessedData.device_id == device_id
+        if device_id
+        else ProcessedData.device_id.is_(None),
+        ProcessedData.start_time >= start_time,
+        ProcessedData.end_time <= end_time,
+    )
+    # Longest window first among those starting together, newest run first on ties
+    query = query.order_by(
+        ProcessedData.start_time, ProcessedData.end_time.desc(), ProcessedData.created_at.desc()
+    )
+    windows = (await db.execute(query)).all()
+
+    digests = {name: TDigest() for name in MEASUREMENTS}
+    # Gaps between chosen windows: (start, end, start inclusive, end inclusive)
+    gaps: list[tuple[datetime, datetime, bool, bool]] = []
+    covered, covered_inclusive = start_time, True
+    merged = 0
+    for window_start, window_end, result in windows:
+        if (
+            window_start < covered
+            or "tags" in result
+            or "digests" not in result
+            # Pipeline steps downstream of another step summarize derived readings
+            or result.get("input", RAW_INPUT) != RAW_INPUT
+        ):
+            continue
+        if window_start > covered:
+            gaps.append((covered, window_start, covered_inclusive, False))
+        with phase("sketch_merge"):
+            for name in MEASUREMENTS:
+                digests[name].merge(TDigest.from_dict(result["digests"][name]))
+        covered, covered_inclusive = window_end, False
+        merged += 1
+    if covered < end_time or covered_inclusive:
+        gaps.append((covered, end_time, covered_inclusive, True))
+
+    scanned = 0
+    for gap_start, gap_end, start_inclusive, end_inclusive in gaps:
+        readings = await fetch_readings(db, sensor_type, gap_start, gap_end, device_id)
+        readings = [
+            r
+            for r in readings
+            if (start_inclusive or r["timestamp"] > gap_start)
+            and (end_inclusive or r["timestamp"] < gap_end)
+        ]
+        scanned += len(readings)
+        for name in MEASUREMENTS:
+            digests[name].update(r[name] for r in readings if r.get(name) is not None)
+
+    summary: dict[str, Any] = {
+        "start_time": start_time,
+        "end_time": end_time,
+        "sensor_type": sensor_type,
+        "device_id": device_id,
+        "quantiles": list(quantiles),
+        "windows_merged": merged,
+        "raw_count": scanned,
+    }
+    with phase("processor_compute"):
+        for name in MEASUREMENTS:
+            summary[name] = summarize(digests[name], quantiles)
+    return summary
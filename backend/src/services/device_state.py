@@ -0,0 +1,281 @@
+"""Device state service.
+
+Maintains one ``device_state`` row per (sensor type, device) as readings are
+ingested: the latest reading, first/last timestamps, reading count and a
+smoothed reporting interval. Every ingest path upserts the devices in its
+batch, so listing devices, showing "current value" tiles and detecting
+missed heartbeats read O(devices) rows instead of scanning readings. With
+sharded storage each device's state lives in its shard, next to its readings.
+
+The reporting interval is advanced inside the upsert from the stored last
+timestamp, so every writer (another worker, or this one after a restart)
+smooths against the committed state rather than a copy of it.
+"""
+
+import logging
+import math
+from collections import defaultdict
+from collections.abc import Mapping, Sequence
+from datetime import datetime
+from heapq import merge
+from typing import Any
+
+from sqlalchemy import Float, and_, bindparam, case, cast, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..database import AsyncSessionLocal, dialect_insert
+from ..models import DeviceState, SensorReading
+from ..sharding import shards
+
+logger = logging.getLogger(__name__)
+
+# Weight of each new gap in the smoothed reporting interval
+INTERVAL_SMOOTHING = 0.2
+
+DeviceKey = tuple[str, str]
+
+
+def _seconds_between(dialect: str, later: Any, earlier: Any) -> Any:
+    """Seconds from one timestamp column to another, per dialect."""
+    if dialect == "postgresql":
+        return cast(func.extract("epoch", later - earlier), Float)
+    return (func.julianday(later) - func.julianday(earlier)) * 86400.0
+
+
+def _upsert(db: AsyncSession) -> Any:
+    """
+    Build the dialect-specific upsert merging a batch summary into device_state.
+
+    Smoothing is affine in the starting interval, so a batch passes the factor
+    its own gaps scale the stored interval by (``interval_decay``) and what
+    they add (``interval_offset``); the upsert applies them after the gap from
+    the stored last timestamp to the batch's first reading.
+    """
+    stmt = dialect_insert(db)(DeviceState)
+    table = DeviceState.__table__.c
+    new = stmt.excluded
+    newer = new.last_timestamp >= table.last_timestamp
+
+    def latest(column: str) -> Any:
+        return case((newer, new[column]), else_=table[column])
+
+    gap = _seconds_between(db.get_bind().dialect.name, new.first_timestamp, table.last_timestamp)
+    resumed = case(
+        (table.interval_seconds.is_(None), gap),
+        else_=table.interval_seconds + INTERVAL_SMOOTHING * (gap - table.interval_seconds),
+    )
+
+    return stmt.on_conflict_do_update(
+        index_elements=[table.sensor_type, table.device_id],
+        set_={
+            "first_timestamp": case(
+                (new.first_timestamp < table.first_timestamp, new.first_timestamp),
+                else_=table.first_timestamp,
+            ),
+            "last_timestamp": latest("last_timestamp"),
+            "last_temperature_c": latest("last_temperature_c"),
+            "last_humidity": latest("last_humidity"),
+            "last_pressure_hpa": latest("last_pressure_hpa"),
+            "last_seen_at": new.last_seen_at,
+            "reading_count": table.reading_count + new.reading_count,
+            # Batches reaching back to or before the latest reading keep the cadence
+            "interval_seconds": case(
+                (
+                    new.first_timestamp > table.last_timestamp,
+                    bindparam("interval_decay", type_=Float) * resumed
+                    + bindparam("interval_offset", type_=Float),
+                ),
+                else_=table.interval_seconds,
+            ),
+        },
+    )
+
+
+def _smooth(interval: float | None, gaps: list[float]) -> float | None:
+    """Fold gaps into a smoothed interval; the first gap of a new device sets it."""
+    for gap in gaps:
+        interval = gap if interval is None else interval + INTERVAL_SMOOTHING * (gap - interval)
+    return interval
+
+
+async def record_readings(db: AsyncSession, rows: Sequence[Mapping[str, Any]]) -> None:
+    """
+    Update device state for a batch of stored readings.
+
+    Runs in the caller's transaction with one upsert for all devices in the
+    batch. A device's cadence only advances when the whole batch is newer
+    than its latest stored reading; late readings count towards its total
+    but not its cadence.
+
+    Args:
+        db: Session the readings are written with (main database or their shard)
+        rows: Stored rows with sensor_type, device_id, timestamp and measurement keys
+    """
+    if not rows:
+        return
+
+    groups: dict[DeviceKey, list[Mapping[str, Any]]] = defaultdict(list)
+    for row in rows:
+        groups[(row["sensor_type"], row["device_id"])].append(row)
+
+    now = datetime.utcnow()
+    summaries = []
+    for key, group in groups.items():
+        # Timestamps are stored without timezone; compare them the same way
+        stamps = [row["timestamp"].replace(tzinfo=None) for row in group]
+        distinct = sorted(set(stamps))
+        gaps = [(b - a).total_seconds() for a, b in zip(distinct, distinct[1:])]
+
+        newest = max(range(len(group)), key=stamps.__getitem__)
+        latest = group[newest]
+        summaries.append(
+            {
+                "sensor_type": key[0],
+                "device_id": key[1],
+                "first_timestamp": distinct[0],
+                "last_timestamp": stamps[newest],
+                "last_temperature_c": latest.get("temperature_c"),
+                "last_humidity": latest.get("humidity"),
+                "last_pressure_hpa": latest.get("pressure_hpa"),
+                "last_seen_at": now,
+                "reading_count": len(group),
+                # Interval of a device seen for the first time
+                "interval_seconds": _smooth(None, gaps),
+                "interval_decay": (1 - INTERVAL_SMOOTHING) ** len(gaps),
+                "interval_offset": _smooth(0.0, gaps),
+            }
+        )
+
+    await db.execute(_upsert(db), summaries)
+
+
+def device_health(state: DeviceState, now: datetime | None = None) -> tuple[str, int]:
+    """
+    Classify a device as online or offline from its reporting cadence.
+
+    A heartbeat is missed for every full interval elapsed since the last
+    reading. Devices with a single reading use ``device_default_interval_seconds``.
+
+    Args:
+        state: Device state row
+        now: Reference time (default: now, naive UTC)
+
+    Returns:
+        Tuple of (status, missed heartbeats)
+    """
+    now = now or datetime.utcnow()
+    interval = state.interval_seconds or settings.device_default_interval_seconds
+    age = (now - state.last_timestamp).total_seconds()
+    missed = max(0, math.floor(age / interval)) if interval > 0 else 0
+    status = "offline" if missed >= settings.device_heartbeat_miss_threshold else "online"
+    return status, missed
+
+
+async def list_device_states(
+    db: AsyncSession, sensor_type: str | None = None
+) -> list[DeviceState]:
+    """
+    List the state of every known device.
+
+    Args:
+        db: Database session
+        sensor_type: Filter by sensor type
+
+    Returns:
+        DeviceState rows ordered by sensor type and device ID
+    """
+    query = select(DeviceState)
+    if sensor_type:
+        query = query.where(DeviceState.sensor_type == sensor_type)
+    query = query.order_by(DeviceState.sensor_type, DeviceState.device_id)
+
+    async def fetch(session: AsyncSession) -> list[DeviceState]:
+        result = await session.execute(query)
+        return list(result.scalars().all())
+
+    if shards is None:
+        return await fetch(db)
+    parts = await shards.gather(fetch)
+    return list(merge(*parts, key=lambda state: (state.sensor_type, state.device_id)))
+
+
+async def _summarize(session: AsyncSession) -> list[dict[str, Any]]:
+    """Summarize each device's readings in one database (full scan)."""
+    bounds = (
+        select(
+            SensorReading.sensor_type,
+            SensorReading.device_id,
+            func.min(SensorReading.timestamp).label("first_timestamp"),
+            func.max(SensorReading.timestamp).label("last_timestamp"),
+            func.count().label("reading_count"),
+        )
+        .group_by(SensorReading.sensor_type, SensorReading.device_id)
+        .subquery()
+    )
+    query = select(
+        bounds,
+        SensorReading.temperature_c,
+        SensorReading.humidity,
+        SensorReading.pressure_hpa,
+    ).join(
+        SensorReading,
+        and_(
+            SensorReading.sensor_type == bounds.c.sensor_type,
+            SensorReading.device_id == bounds.c.device_id,
+            SensorReading.timestamp == bounds.c.last_timestamp,
+        ),
+    )
+
+    now = datetime.utcnow()
+    states: dict[DeviceKey, dict[str, Any]] = {}
+    for row in await session.execute(query):
+        count = row.reading_count
+        span = (row.last_timestamp - row.first_timestamp).total_seconds()
+        # Readings sharing the latest timestamp produce duplicates; keep the first
+        states.setdefault(
+            (row.sensor_type, row.device_id),
+            {
+                "sensor_type": row.sensor_type,
+                "device_id": row.device_id,
+                "first_timestamp": row.first_timestamp,
+                "last_timestamp": row.last_timestamp,
+                "last_temperature_c": row.temperature_c,
+                "last_humidity": row.humidity,
+                "last_pressure_hpa": row.pressure_hpa,
+                "last_seen_at": now,
+                "reading_count": count,
+                "interval_seconds": span / (count - 1) if count > 1 and span > 0 else None,
+            },
+        )
+    return list(states.values())
+
+
+async def _rebuild(db: AsyncSession) -> int:
+    """Summarize one database's readings into its empty device_state table."""
+    if await db.scalar(select(func.count()).select_from(DeviceState)):
+        return 0
+
+    states = await _summarize(db)
+    if states:
+        await db.execute(insert(DeviceState), states)
+        logger.info(f"Rebuilt device state for {len(states)} devices")
+    return len(states)
+
+
+async def rebuild_device_state() -> int:
+    """
+    Populate device_state from existing readings if it is empty.
+
+    With sharded storage each shard's table is rebuilt from its own readings.
+
+    Returns:
+        Number of devices summarized
+    """
+    if shards is not None:
+        return sum(await shards.write_each(_rebuild))
+
+    async with AsyncSessionLocal() as db:
+        rebuilt = await _rebuild(db)
+        await db.commit()
+        return rebuilt
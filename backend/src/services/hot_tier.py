@@ -0,0 +1,463 @@
+"""In-memory hot tier of recent sensor readings.
+
+Keeps the last ``hot_tier_retention_hours`` of readings per (sensor type,
+device) in compact typed arrays: microsecond timestamps and series ids in
+``array('q')`` and one ``array('d')`` per measurement, about 40 bytes per
+reading. Expired
+readings are dropped by advancing a head offset, and the arrays are compacted
+once the dead prefix dominates, so each series behaves as a ring buffer with a
+hard cap of ``hot_tier_max_points_per_device`` readings.
+
+Committed writes from every ingest path are staged on their session and
+applied after commit, so rolled-back rows never appear. On startup the tier is
+rebuilt from the database. Time-range reads are served from memory when the
+requested range is fully covered and fall back to the database otherwise.
+
+The tier is per process: enable it only when one process writes readings.
+"""
+
+import logging
+import math
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Collection, Iterable, Mapping
+from datetime import datetime, timedelta
+from heapq import merge
+from operator import itemgetter
+from typing import Any, cast
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import AsyncSessionLocal
+from ..metrics import CallbackMetric, Counter, registry
+from ..models import SensorReading
+from ..sharding import shards
+from ..timestamps import naive_utc
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+MEASUREMENTS = ("temperature_c", "humidity", "pressure_hpa")
+PENDING_KEY = "hot_tier_pending"
+NO_SERIES = -1
+PRUNE_INTERVAL_SECONDS = 60.0
+WARM_PARTITION_SIZE = 10_000
+
+HOT_TIER_QUERIES: Counter = registry.register(
+    Counter("hot_tier_queries_total", "Time-range reads by hot-tier outcome", ("outcome",))
+)
+
+
+def to_micros(value: datetime) -> int:
+    """
+    Convert a datetime to microseconds since the epoch.
+
+    Aware values are converted to UTC first; naive ones are taken as UTC,
+    as the timestamp column stores them.
+    """
+    delta = naive_utc(value) - EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def from_micros(value: int) -> datetime:
+    """Convert microseconds since the epoch to a naive datetime."""
+    return EPOCH + timedelta(microseconds=value)
+
+
+class SeriesBuffer:
+    """Timestamp-ordered readings of one device, stored in typed arrays."""
+
+    __slots__ = ("timestamps", "series_ids", "values", "head", "evicted_through")
+
+    def __init__(self) -> None:
+        self.timestamps = array("q")
+        # Series (tag set) of each reading, NO_SERIES when unknown
+        self.series_ids = array("q")
+        self.values = tuple(array("d") for _ in MEASUREMENTS)
+        # Index of the oldest live reading; everything before it is expired
+        self.head = 0
+        # Newest timestamp dropped by the capacity cap (the series is incomplete up to here)
+        self.evicted_through: int | None = None
+
+    def __len__(self) -> int:
+        return len(self.timestamps) - self.head
+
+    def append(
+        self, timestamp: int, values: Iterable[float | None], series_id: int = NO_SERIES
+    ) -> None:
+        """Add a reading, keeping timestamp order (late readings are inserted)."""
+        timestamps = self.timestamps
+        floats = [math.nan if value is None else value for value in values]
+        if not timestamps or timestamp >= timestamps[-1]:
+            timestamps.append(timestamp)
+            self.series_ids.append(series_id)
+            for column, value in zip(self.values, floats):
+                column.append(value)
+            return
+        index = bisect_right(timestamps, timestamp, self.head)
+        timestamps.insert(index, timestamp)
+        self.series_ids.insert(index, series_id)
+        for column, value in zip(self.values, floats):
+            column.insert(index, value)
+
+    def expire(self, cutoff: int) -> None:
+        """Drop readings older than cutoff."""
+        self.head = bisect_left(self.timestamps, cutoff, self.head)
+        self._compact()
+
+    def cap(self, capacity: int) -> None:
+        """Drop the oldest readings beyond capacity."""
+        excess = len(self) - capacity
+        if excess > 0:
+            self.head += excess
+            self.evicted_through = self.timestamps[self.head - 1]
+            self._compact()
+
+    def _compact(self) -> None:
+        """Reclaim the expired prefix once it is at least half the arrays."""
+        if self.head and self.head * 2 >= len(self.timestamps):
+            del self.timestamps[: self.head]
+            del self.series_ids[: self.head]
+            for column in self.values:
+                del column[: self.head]
+            self.head = 0
+
+    def slice(self, start: int, end: int) -> range:
+        """Indexes of readings with start <= timestamp <= end."""
+        lo = bisect_left(self.timestamps, start, self.head)
+        hi = bisect_right(self.timestamps, end, lo)
+        return range(lo, hi)
+
+    def nbytes(self) -> int:
+        """Bytes allocated by the arrays."""
+        columns: list[array[Any]] = [self.timestamps, self.series_ids, *self.values]
+        return sum(column.buffer_info()[1] * column.itemsize for column in columns)
+
+
+class HotTier:
+    """Recent readings of every device, served from memory."""
+
+    def __init__(
+        self,
+        retention: timedelta,
+        max_points_per_device: int,
+        enabled: bool = True,
+    ) -> None:
+        """
+        Create an empty hot tier.
+
+        Args:
+            retention: How far back from now readings are kept
+            max_points_per_device: Cap on readings kept per series
+            enabled: When False nothing is staged and every read falls back to the DB
+        """
+        self.retention_us = int(retention.total_seconds() * 1_000_000)
+        self.max_points = max_points_per_device
+        self.enabled = enabled
+        self.series: dict[tuple[str, str], SeriesBuffer] = {}
+        # Reads are only served once the tier has been rebuilt from the database
+        self.ready = False
+        self._last_prune = 0.0
+
+    def horizon(self) -> int:
+        """Oldest timestamp (microseconds) the tier is guaranteed to hold."""
+        return to_micros(datetime.utcnow()) - self.retention_us
+
+    def stage(self, db: AsyncSession, rows: Iterable[Mapping[str, Any]]) -> None:
+        """
+        Queue written rows to be added once the session commits.
+
+        Args:
+            db: Session (main or shard) the rows were written with
+            rows: Rows with sensor_type, device_id, timestamp and measurement keys
+        """
+        if self.enabled:
+            db.info.setdefault(PENDING_KEY, []).extend(rows)
+
+    def add_rows(self, rows: Iterable[Mapping[str, Any]]) -> None:
+        """Add committed rows, skipping any older than the retention horizon."""
+        horizon = self.horizon()
+        touched: set[tuple[str, str]] = set()
+        for row in rows:
+            timestamp = to_micros(row["timestamp"])
+            if timestamp < horizon:
+                continue
+            key = (row["sensor_type"], row["device_id"])
+            buffer = self.series.get(key)
+            if buffer is None:
+                buffer = self.series[key] = SeriesBuffer()
+            series_id = row.get("series_id")
+            buffer.append(
+                timestamp,
+                (row.get(name) for name in MEASUREMENTS),
+                NO_SERIES if series_id is None else series_id,
+            )
+            touched.add(key)
+
+        for key in touched:
+            buffer = self.series[key]
+            buffer.expire(horizon)
+            buffer.cap(self.max_points)
+
+        now = time.monotonic()
+        if now - self._last_prune >= PRUNE_INTERVAL_SECONDS:
+            self._last_prune = now
+            self.prune(horizon)
+
+    def prune(self, horizon: int) -> None:
+        """Expire old readings in every series and forget empty ones."""
+        for key, buffer in list(self.series.items()):
+            buffer.expire(horizon)
+            if not len(buffer):
+                del self.series[key]
+
+    def _covered(
+        self, sensor_type: str, start_time: datetime, device_ids: Iterable[str] | None
+    ) -> list[tuple[str, SeriesBuffer]] | None:
+        """
+        Find the series needed for a read starting at start_time.
+
+        Returns:
+            (device_id, buffer) pairs for devices with readings in memory, or None
+            when the tier does not hold everything from start_time onwards
+        """
+        if not (self.enabled and self.ready):
+            return None
+
+        start = to_micros(start_time)
+        if device_ids is not None:
+            keys = [(sensor_type, device_id) for device_id in device_ids]
+        else:
+            keys = [key for key in self.series if key[0] == sensor_type]
+        buffers = [(key[1], self.series[key]) for key in keys if key in self.series]
+
+        covered = start >= self.horizon() and all(
+            buffer.evicted_through is None or buffer.evicted_through < start
+            for _, buffer in buffers
+        )
+        HOT_TIER_QUERIES.inc(1, ("hit" if covered else "miss",))
+        return buffers if covered else None
+
+    def fetch(
+        self,
+        sensor_type: str,
+        start_time: datetime,
+        end_time: datetime,
+        device_id: str | None = None,
+        device_ids: Collection[str] | None = None,
+        series: Mapping[str, Collection[int]] | None = None,
+    ) -> list[dict[str, Any]] | None:
+        """
+        Read a time range from memory if the tier fully covers it.
+
+        Args:
+            sensor_type: Type of sensor
+            start_time: Start of time range (inclusive)
+            end_time: End of time range (inclusive)
+            device_id: Optional specific device ID
+            device_ids: Optional set of devices (used when device_id is not given)
+            series: Optional series ids per device; readings of other series are skipped
+
+        Returns:
+            Readings shaped like fetch_readings output (oldest first), or None
+            when the range must be read from the database
+        """
+        buffers = self._covered(sensor_type, start_time, [device_id] if device_id else device_ids)
+        if buffers is None:
+            return None
+
+        start = to_micros(start_time)
+        end = to_micros(end_time)
+        parts = [
+            self._readings(
+                device, buffer, start, end, None if series is None else series.get(device, ())
+            )
+            for device, buffer in buffers
+        ]
+        if len(parts) == 1:
+            return parts[0]
+        return list(merge(*parts, key=itemgetter("timestamp")))
+
+    def bucket_means(
+        self,
+        sensor_type: str,
+        device_ids: list[str],
+        start_time: datetime,
+        end_time: datetime,
+        bucket_seconds: int,
+    ) -> dict[str, dict[int, tuple[int, float | None, float | None, float | None]]] | None:
+        """
+        Average readings into fixed buckets if the tier fully covers the range.
+
+        Buckets are aligned like the SQL comparison query: timestamps are
+        truncated to whole seconds and bucket i starts at
+        ``floor(start_time) + i * bucket_seconds``.
+
+        Returns:
+            device_id -> bucket index -> (count, mean temperature, mean humidity,
+            mean pressure) for non-empty buckets, or None when the range must be
+            read from the database
+        """
+        buffers = self._covered(sensor_type, start_time, device_ids)
+        if buffers is None:
+            return None
+
+        start = to_micros(start_time)
+        end = to_micros(end_time)
+        origin = start // 1_000_000
+        result: dict[str, dict[int, tuple[int, float | None, float | None, float | None]]] = {}
+        for device_id, buffer in buffers:
+            # bucket index -> [count, then (sum, non-null count) per measurement]
+            sums: dict[int, list[float]] = {}
+            for i in buffer.slice(start, end):
+                index = (buffer.timestamps[i] // 1_000_000 - origin) // bucket_seconds
+                acc = sums.get(index)
+                if acc is None:
+                    acc = sums[index] = [0, 0.0, 0, 0.0, 0, 0.0, 0]
+                acc[0] += 1
+                for slot, column in enumerate(buffer.values):
+                    value = column[i]
+                    if not math.isnan(value):
+                        acc[1 + 2 * slot] += value
+                        acc[2 + 2 * slot] += 1
+            result[device_id] = {
+                index: (
+                    int(acc[0]),
+                    acc[1] / acc[2] if acc[2] else None,
+                    acc[3] / acc[4] if acc[4] else None,
+                    acc[5] / acc[6] if acc[6] else None,
+                )
+                for index, acc in sums.items()
+            }
+        return result
+
+    @staticmethod
+    def _readings(
+        device_id: str,
+        buffer: SeriesBuffer,
+        start: int,
+        end: int,
+        series_ids: Collection[int] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Materialize one device's readings in a range as dictionaries."""
+        indexes: Iterable[int] = buffer.slice(start, end)
+        if series_ids is not None:
+            kept = buffer.series_ids
+            indexes = [i for i in indexes if kept[i] in series_ids]
+        timestamps = buffer.timestamps
+        temperature, humidity, pressure = buffer.values
+        return [
+            {
+                "device_id": device_id,
+                "timestamp": from_micros(timestamps[i]),
+                "temperature_c": None if math.isnan(temperature[i]) else temperature[i],
+                "humidity": None if math.isnan(humidity[i]) else humidity[i],
+                "pressure_hpa": None if math.isnan(pressure[i]) else pressure[i],
+            }
+            for i in indexes
+        ]
+
+    def clear(self) -> None:
+        """Drop all readings and mark the tier as not ready."""
+        self.series.clear()
+        self.ready = False
+
+    def status(self) -> dict[str, Any]:
+        """Return configuration and memory usage."""
+        return {
+            "enabled": self.enabled,
+            "ready": self.ready,
+            "retention_hours": self.retention_us / 3_600_000_000,
+            "max_points_per_device": self.max_points,
+            "series": len(self.series),
+            "points": sum(len(buffer) for buffer in self.series.values()),
+            "bytes": sum(buffer.nbytes() for buffer in self.series.values()),
+        }
+
+
+# Global hot tier
+hot_tier = HotTier(
+    retention=timedelta(hours=settings.hot_tier_retention_hours),
+    max_points_per_device=settings.hot_tier_max_points_per_device,
+    enabled=settings.hot_tier_enabled,
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed(session: Session) -> None:
+    """Add rows staged on a session once its transaction has committed."""
+    rows = session.info.pop(PENDING_KEY, None)
+    if rows:
+        hot_tier.add_rows(rows)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    """Forget rows staged on a session whose transaction rolled back."""
+    session.info.pop(PENDING_KEY, None)
+
+
+async def warm_hot_tier() -> int:
+    """
+    Rebuild the hot tier from readings within the retention horizon.
+
+    Must run before ingest starts (rows committed while warming could be
+    added twice).
+
+    Returns:
+        Number of readings loaded
+    """
+    if not hot_tier.enabled:
+        return 0
+
+    hot_tier.clear()
+    cutoff = from_micros(hot_tier.horizon())
+    query = (
+        select(
+            SensorReading.sensor_type,
+            SensorReading.device_id,
+            SensorReading.timestamp,
+            SensorReading.temperature_c,
+            SensorReading.humidity,
+            SensorReading.pressure_hpa,
+            SensorReading.series_id,
+        )
+        .where(SensorReading.timestamp >= cutoff)
+        .order_by(SensorReading.timestamp)
+    )
+
+    async def load(session: AsyncSession) -> int:
+        loaded = 0
+        result = await session.stream(query)
+        async for partition in result.mappings().partitions(WARM_PARTITION_SIZE):
+            hot_tier.add_rows(cast(list[Mapping[str, Any]], partition))
+            loaded += len(partition)
+        return loaded
+
+    if shards is None:
+        async with AsyncSessionLocal() as session:
+            loaded = await load(session)
+    else:
+        loaded = sum(await shards.gather(load))
+
+    hot_tier.ready = True
+    logger.info(f"Hot tier warmed with {loaded} readings in {len(hot_tier.series)} series")
+    return loaded
+
+
+def get_hot_tier_status() -> dict[str, Any]:
+    """Get hot tier configuration and memory usage."""
+    return hot_tier.status()
+
+
+registry.register(
+    CallbackMetric(
+        "hot_tier_points",
+        "Readings held in the in-memory hot tier",
+        lambda: {(): sum(len(buffer) for buffer in hot_tier.series.values())},
+    )
+)
@@ -0,0 +1,205 @@
+"""Database-backed leader election.
+
+When the API runs as several workers or replicas, each process starts the
+scheduler, but scheduled jobs must run in exactly one of them. Processes
+compete for a row in ``scheduler_leases``: the holder renews it every few
+seconds, and once it stops (crash, shutdown, lost database connection) the
+lease expires and the next process to retry takes it over.
+
+Every change of holder increments the lease's fencing token. A leader that
+stalled past its lease (long GC pause, network partition) may still believe
+it leads, so job writes call ``fence`` in their own transaction: it only
+succeeds while the lease is still held with the same token, and the write is
+rolled back otherwise. The lease row is locked by that update until commit,
+so a takeover cannot interleave with a fenced write.
+
+Expiry is compared against each process's UTC clock, so hosts need
+synchronized clocks (NTP); skew shortens or lengthens the takeover delay by
+the same amount. The same lease table works for SQLite and PostgreSQL.
+"""
+
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, cast
+
+from sqlalchemy import CursorResult, Table, case, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..database import AsyncSessionLocal, dialect_insert
+from ..models import SchedulerLease
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+
+# The lease table for Core statements (models declare __table__ as a FromClause)
+LEASES = cast(Table, SchedulerLease.__table__)
+
+
+class LeaseLost(Exception):
+    """Raised when a write is fenced off because the lease changed hands."""
+
+
+class LeaderLease:
+    """One process's view of a named lease."""
+
+    def __init__(
+        self,
+        name: str,
+        lease_seconds: float,
+        sessionmaker: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    ) -> None:
+        """
+        Create a lease participant (not yet holding the lease).
+
+        Args:
+            name: Lease name shared by all competing processes
+            lease_seconds: How long leadership lasts without a renewal
+            sessionmaker: Session factory of the main database
+        """
+        self.name = name
+        self.lease_seconds = lease_seconds
+        self.sessionmaker = sessionmaker
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.token: int | None = None
+        # Monotonic time until which this process may act as leader
+        self._valid_until = 0.0
+
+    @property
+    def is_leader(self) -> bool:
+        """Whether this process holds an unexpired lease."""
+        return self.token is not None and time.monotonic() < self._valid_until
+
+    def _insert(self, db: AsyncSession) -> Any:
+        """Dialect-specific insert of the lease row that ignores an existing row."""
+        insert = dialect_insert(db)
+        return insert(LEASES).on_conflict_do_nothing(index_elements=["name"])
+
+    async def heartbeat(self) -> bool:
+        """
+        Renew the lease if held, or take it over if it is free or expired.
+
+        Database errors are logged and leave the current state in place, so a
+        leader steps down on its own once its lease runs out locally.
+
+        Returns:
+            Whether this process is the leader afterwards
+        """
+        # Measured before the round trip, so the local view never outlives the row
+        started = time.monotonic()
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.lease_seconds)
+        table = LEASES.c
+        was_leader = self.is_leader
+
+        try:
+            async with self.sessionmaker() as db:
+                renewed = await db.execute(
+                    update(LEASES)
+                    .where(
+                        table.name == self.name,
+                        or_(table.holder == self.holder, table.expires_at < now),
+                    )
+                    .values(
+                        holder=self.holder,
+                        token=case(
+                            (table.holder == self.holder, table.token), else_=table.token + 1
+                        ),
+                        expires_at=expires_at,
+                        renewed_at=now,
+                    )
+                )
+                result = cast(CursorResult[Any], renewed)
+                if result.rowcount == 0:
+                    inserted = await db.execute(
+                        self._insert(db),
+                        {
+                            "name": self.name,
+                            "holder": self.holder,
+                            "token": 1,
+                            "expires_at": expires_at,
+                            "renewed_at": now,
+                        },
+                    )
+                    result = cast(CursorResult[Any], inserted)
+                acquired = result.rowcount == 1
+                token = None
+                if acquired:
+                    token = await db.scalar(
+                        select(SchedulerLease.token).where(SchedulerLease.name == self.name)
+                    )
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"Lease {self.name!r} heartbeat failed: {e}")
+            return self.is_leader
+
+        if acquired:
+            self.token = token
+            self._valid_until = started + self.lease_seconds
+            if not was_leader:
+                logger.info(f"Acquired lease {self.name!r} as {self.holder} (token {token})")
+        else:
+            if was_leader:
+                logger.warning(f"Lost lease {self.name!r}; another process took over")
+            self.token = None
+        return acquired
+
+    async def fence(self, db: AsyncSession) -> None:
+        """
+        Confirm in the caller's transaction that this process still leads.
+
+        Call right before committing a job's writes; the lease row stays
+        locked until the transaction ends.
+
+        Raises:
+            LeaseLost: If the lease expired or changed hands
+        """
+        table = LEASES.c
+        result = None
+        if self.token is not None:
+            fenced = await db.execute(
+                update(LEASES)
+                .where(
+                    table.name == self.name,
+                    table.holder == self.holder,
+                    table.token == self.token,
+                    table.expires_at > datetime.utcnow(),
+                )
+                .values(renewed_at=datetime.utcnow())
+            )
+            result = cast(CursorResult[Any], fenced)
+        if result is None or result.rowcount != 1:
+            self.token = None
+            raise LeaseLost(f"Lease {self.name!r} is no longer held by {self.holder}")
+
+    async def release(self) -> None:
+        """Give up the lease so another process can take over immediately."""
+        if self.token is None:
+            return
+        table = LEASES.c
+        try:
+            async with self.sessionmaker() as db:
+                await db.execute(
+                    update(LEASES)
+                    .where(table.name == self.name, table.holder == self.holder)
+                    .values(expires_at=EPOCH)
+                )
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"Releasing lease {self.name!r} failed: {e}")
+        self.token = None
+        logger.info(f"Released lease {self.name!r}")
+
+    def status(self) -> dict[str, Any]:
+        """Return this process's view of the lease."""
+        return {
+            "name": self.name,
+            "holder": self.holder,
+            "is_leader": self.is_leader,
+            "token": self.token if self.is_leader else None,
+            "lease_seconds": self.lease_seconds,
+        }
@@ -0,0 +1,444 @@
+"""Line-protocol ingest listener for high-rate devices.
+
+Accepts Influx-style line protocol over TCP and UDP, bypassing the HTTP, JSON
+and Pydantic layers:
+
+    bme280,device=bme280_001 t=23.4,h=45.6,p=1013.2 1731580200000000000
+
+Fields may use short (``t``, ``h``, ``p``) or full (``temperature_c``,
+``humidity``, ``pressure_hpa``) names; the optional timestamp is in
+nanoseconds since the Unix epoch. The ``device`` (or ``device_id``) tag is
+required; any other tags are stored as reading metadata. Escaped spaces and
+commas are not supported.
+
+Parsed rows are queued as batches and written by a single writer task through
+the same bulk insert path as ``POST /api/v1/sensors/bme280/batch``. When the
+queue is full, TCP connections stop being read (so kernel buffers and TCP flow
+control push back on the sender) and UDP datagrams are dropped and counted.
+"""
+
+import asyncio
+import logging
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..config import settings
+from ..database import AsyncSessionLocal
+from ..metrics import CallbackMetric, registry
+from ..schemas.sensor import BME280_RANGES, DEVICE_ID_MAX_LENGTH
+from .data_ingestion import insert_readings
+
+logger = logging.getLogger(__name__)
+
+SENSOR_TYPE = "bme280"
+MAX_LINE_BYTES = 64 * 1024
+
+_EPOCH = datetime(1970, 1, 1)
+_FIELD_NAMES = {
+    "t": "temperature_c",
+    "temperature_c": "temperature_c",
+    "h": "humidity",
+    "humidity": "humidity",
+    "p": "pressure_hpa",
+    "pressure_hpa": "pressure_hpa",
+}
+_DEVICE_TAGS = ("device", "device_id")
+
+
+class LineProtocolError(ValueError):
+    """Raised when a line cannot be parsed or fails validation."""
+
+
+def parse_line(line: str, received_at: datetime) -> dict[str, Any]:
+    """
+    Parse and validate a single line-protocol reading.
+
+    Args:
+        line: One line without its trailing newline
+        received_at: Timestamp used when the line has none (naive UTC)
+
+    Returns:
+        Row dictionary suitable for insert_readings
+
+    Raises:
+        LineProtocolError: If the line is malformed or a value is out of range
+    """
+    parts = line.split(" ")
+    if len(parts) == 2:
+        series, fields = parts
+        raw_timestamp = None
+    elif len(parts) == 3:
+        series, fields, raw_timestamp = parts
+    else:
+        raise LineProtocolError("expected '<measurement>[,tags] <fields> [timestamp]'")
+
+    measurement, *tags = series.split(",")
+    if measurement != SENSOR_TYPE:
+        raise LineProtocolError(f"unsupported measurement {measurement!r}")
+
+    device_id = None
+    metadata: dict[str, str] | None = None
+    for tag in tags:
+        key, sep, value = tag.partition("=")
+        if not sep or not key or not value:
+            raise LineProtocolError(f"malformed tag {tag!r}")
+        if key in _DEVICE_TAGS:
+            device_id = value
+        else:
+            if metadata is None:
+                metadata = {}
+            metadata[key] = value
+    if not device_id:
+        raise LineProtocolError("missing device tag")
+    if len(device_id) > DEVICE_ID_MAX_LENGTH:
+        raise LineProtocolError("device id too long")
+
+    values: dict[str, float] = {}
+    for item in fields.split(","):
+        key, sep, raw = item.partition("=")
+        name = _FIELD_NAMES.get(key)
+        if name is None or not sep:
+            raise LineProtocolError(f"unknown field {item!r}")
+        if raw.endswith("i"):
+            raw = raw[:-1]
+        try:
+            number = float(raw)
+        except ValueError:
+            raise LineProtocolError(f"invalid value for {name}: {raw!r}") from None
+        low, high = BME280_RANGES[name]
+        if not low <= number <= high:
+            raise LineProtocolError(f"{name}={raw} outside [{low}, {high}]")
+        values[name] = number
+    if len(values) != len(BME280_RANGES):
+        missing = sorted(set(BME280_RANGES) - set(values))
+        raise LineProtocolError(f"missing field(s): {', '.join(missing)}")
+
+    if raw_timestamp is None:
+        timestamp = received_at
+    else:
+        try:
+            timestamp = _EPOCH + timedelta(microseconds=int(raw_timestamp) // 1000)
+        except (ValueError, OverflowError):
+            raise LineProtocolError(f"invalid timestamp {raw_timestamp!r}") from None
+
+    return {
+        "sensor_type": SENSOR_TYPE,
+        "device_id": device_id,
+        "timestamp": timestamp,
+        "temperature_c": values["temperature_c"],
+        "humidity": values["humidity"],
+        "pressure_hpa": values["pressure_hpa"],
+        "extra_metadata": metadata,
+        "created_at": received_at,
+    }
+
+
+@dataclass
+class SourceStats:
+    """Counters for one TCP connection or for the UDP socket."""
+
+    peer: str
+    lines: int = 0
+    accepted: int = 0
+    errors: int = 0
+    dropped: int = 0
+    last_error: str | None = None
+
+    def parse(self, data: str) -> list[dict[str, Any]]:
+        """Parse a block of complete lines, counting accepted and rejected lines."""
+        received_at = datetime.utcnow()
+        rows = []
+        for line in data.splitlines():
+            if not line or line[0] == "#":
+                continue
+            self.lines += 1
+            try:
+                rows.append(parse_line(line, received_at))
+            except LineProtocolError as e:
+                self.errors += 1
+                self.last_error = str(e)
+        self.accepted += len(rows)
+        return rows
+
+
+@dataclass
+class WriterStats:
+    """Counters for the batch writer."""
+
+    batches_written: int = 0
+    rows_written: int = 0
+    write_errors: int = 0
+    rows_failed: int = 0
+    connections_total: int = 0
+    closed_lines_rejected: int = 0
+    closed: list[SourceStats] = field(default_factory=list)
+
+
+class _UDPProtocol(asyncio.DatagramProtocol):
+    """Datagram handler that parses each packet and enqueues it without blocking."""
+
+    def __init__(self, listener: "LineProtocolListener") -> None:
+        self.listener = listener
+        self.stats = SourceStats(peer="udp")
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        """Parse a datagram; drop it when the write queue is full."""
+        rows = self.stats.parse(data.decode("utf-8", errors="replace"))
+        if not rows:
+            return
+        try:
+            self.listener.queue.put_nowait(rows)
+        except asyncio.QueueFull:
+            self.stats.dropped += len(rows)
+
+
+class LineProtocolListener:
+    """TCP/UDP line-protocol listener feeding the bulk write path."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        batch_size: int = 5000,
+        flush_interval: float = 0.2,
+        max_pending_batches: int = 64,
+    ) -> None:
+        """
+        Create a listener; call start() to open sockets.
+
+        Args:
+            session_factory: Factory for write sessions
+            batch_size: Maximum rows per bulk insert
+            flush_interval: Seconds a partial batch may wait before being written
+            max_pending_batches: Parsed batches buffered before backpressure applies
+        """
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: asyncio.Queue[list[dict[str, Any]]] = asyncio.Queue(max_pending_batches)
+        self.stats = WriterStats()
+        self.connections: dict[int, SourceStats] = {}
+        # Handler task -> writer of each open TCP connection
+        self._clients: dict[asyncio.Task[Any], asyncio.StreamWriter] = {}
+        self.tcp_server: asyncio.Server | None = None
+        self.udp_transport: asyncio.DatagramTransport | None = None
+        self.udp_protocol: _UDPProtocol | None = None
+        self._writer_task: asyncio.Task[None] | None = None
+
+    async def start(self, host: str, tcp_port: int | None, udp_port: int | None) -> None:
+        """
+        Start the writer task and socket listeners.
+
+        Args:
+            host: Address to bind
+            tcp_port: TCP port (None to disable, 0 for an ephemeral port)
+            udp_port: UDP port (None to disable, 0 for an ephemeral port)
+        """
+        self._writer_task = asyncio.create_task(self._write_loop())
+        if tcp_port is not None:
+            self.tcp_server = await asyncio.start_server(
+                self._handle_connection, host, tcp_port, limit=MAX_LINE_BYTES
+            )
+        if udp_port is not None:
+            loop = asyncio.get_running_loop()
+            self.udp_transport, self.udp_protocol = await loop.create_datagram_endpoint(
+                lambda: _UDPProtocol(self), local_addr=(host, udp_port)
+            )
+
+    async def stop(self) -> None:
+        """Close listeners and client connections, then flush everything still queued."""
+        if self.tcp_server is not None:
+            self.tcp_server.close()
+            # From Python 3.12 wait_closed also waits for every client to disconnect,
+            # so close them and let their handlers queue what they already read
+            handlers = list(self._clients)
+            for writer in self._clients.values():
+                writer.close()
+            await asyncio.gather(*handlers, return_exceptions=True)
+            await self.tcp_server.wait_closed()
+        if self.udp_transport is not None:
+            self.udp_transport.close()
+        if self._writer_task is not None:
+            await self.queue.join()
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Read newline-terminated lines from one TCP connection."""
+        peer = writer.get_extra_info("peername")
+        stats = SourceStats(peer=f"{peer[0]}:{peer[1]}" if peer else "unknown")
+        self.connections[id(stats)] = stats
+        self.stats.connections_total += 1
+        task = asyncio.current_task()
+        if task is not None:
+            self._clients[task] = writer
+        pending = b""
+        try:
+            while chunk := await reader.read(MAX_LINE_BYTES):
+                data = pending + chunk
+                end = data.rfind(b"\n")
+                if end < 0:
+                    if len(data) > MAX_LINE_BYTES:
+                        stats.errors += 1
+                        stats.last_error = "line too long"
+                        break
+                    pending = data
+                    continue
+                pending = data[end + 1 :]
+                rows = stats.parse(data[:end].decode("utf-8", errors="replace"))
+                if rows:
+                    # Blocks while the writer is behind: this connection stops
+                    # being read and TCP flow control slows the sender down.
+                    await self.queue.put(rows)
+            if pending.strip():
+                rows = stats.parse(pending.decode("utf-8", errors="replace"))
+                if rows:
+                    await self.queue.put(rows)
+        except ConnectionError as e:
+            stats.last_error = str(e)
+        finally:
+            writer.close()
+            if task is not None:
+                self._clients.pop(task, None)
+            del self.connections[id(stats)]
+            self.stats.closed_lines_rejected += stats.errors
+            self.stats.closed = (self.stats.closed + [stats])[-20:]
+
+    async def _write_loop(self) -> None:
+        """Coalesce queued rows into bulk inserts."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self.queue.get()
+            taken = 1
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.extend(self.queue.get_nowait())
+                    taken += 1
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.extend(await asyncio.wait_for(self.queue.get(), timeout))
+                    taken += 1
+                except TimeoutError:
+                    break
+            try:
+                await self._write(batch)
+            finally:
+                for _ in range(taken):
+                    self.queue.task_done()
+
+    async def _write(self, batch: list[dict[str, Any]]) -> None:
+        """Write one batch, counting rather than propagating failures."""
+        try:
+            async with self.session_factory() as db:
+                await insert_readings(db, batch, source="line_protocol")
+                await db.commit()
+            self.stats.batches_written += 1
+            self.stats.rows_written += len(batch)
+        except Exception as e:
+            self.stats.write_errors += 1
+            self.stats.rows_failed += len(batch)
+            logger.error(f"Line-protocol batch write failed: {e}", exc_info=True)
+
+    def lines_rejected(self) -> int:
+        """Total lines rejected by the parser since start."""
+        sources = list(self.connections.values())
+        if self.udp_protocol is not None:
+            sources.append(self.udp_protocol.stats)
+        return self.stats.closed_lines_rejected + sum(s.errors for s in sources)
+
+    def status(self) -> dict[str, Any]:
+        """Return listener, writer and per-connection counters."""
+        return {
+            "running": True,
+            "tcp": self.tcp_server is not None,
+            "udp": self.udp_transport is not None,
+            "pending_batches": self.queue.qsize(),
+            "lines_rejected": self.lines_rejected(),
+            "writer": {k: v for k, v in asdict(self.stats).items() if k != "closed"},
+            "udp_stats": asdict(self.udp_protocol.stats) if self.udp_protocol else None,
+            "connections": [asdict(s) for s in self.connections.values()],
+            "recently_closed": [asdict(s) for s in self.stats.closed],
+        }
+
+
+# Global listener instance
+listener: LineProtocolListener | None = None
+
+
+async def start_line_protocol_listener() -> None:
+    """Start the line-protocol listener if enabled in configuration."""
+    global listener
+
+    if listener is not None or not settings.line_protocol_enabled:
+        return
+
+    listener = LineProtocolListener(
+        batch_size=settings.line_protocol_batch_size,
+        flush_interval=settings.line_protocol_flush_interval_ms / 1000,
+        max_pending_batches=settings.line_protocol_max_pending_batches,
+    )
+    await listener.start(
+        settings.line_protocol_host,
+        settings.line_protocol_tcp_port or None,
+        settings.line_protocol_udp_port or None,
+    )
+    logger.info(
+        f"Line-protocol listener started on {settings.line_protocol_host} "
+        f"(tcp={settings.line_protocol_tcp_port}, udp={settings.line_protocol_udp_port})"
+    )
+
+
+async def stop_line_protocol_listener() -> None:
+    """Stop the listener, flushing queued readings."""
+    global listener
+
+    if listener is None:
+        return
+
+    await listener.stop()
+    listener = None
+    logger.info("Line-protocol listener stopped")
+
+
+def _line_protocol_counts() -> dict[tuple[str, ...], float]:
+    """Line-protocol counters for the metrics endpoint."""
+    if listener is None:
+        return {}
+    udp_dropped = listener.udp_protocol.stats.dropped if listener.udp_protocol else 0
+    return {
+        ("written",): listener.stats.rows_written,
+        ("write_failed",): listener.stats.rows_failed,
+        ("rejected",): listener.lines_rejected(),
+        ("dropped",): udp_dropped,
+    }
+
+
+registry.register(
+    CallbackMetric(
+        "line_protocol_readings_total",
+        "Line-protocol readings by outcome",
+        _line_protocol_counts,
+        ("outcome",),
+        type_name="counter",
+    )
+)
+
+
+def get_line_protocol_status() -> dict[str, Any]:
+    """Get listener status and error counters."""
+    if listener is None:
+        return {"running": False}
+    return listener.status()
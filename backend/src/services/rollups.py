@@ -0,0 +1,415 @@
+"""Prefix-sum rollup service.
+
+Keeps running totals per (sensor type, device) at hourly bucket boundaries in
+``reading_rollups``. Each row holds the reading count and, per measurement,
+the number of non-null values and their sum over every reading up to the end
+of its hour. The totals over any span of whole hours are then the difference
+of two rows, so a period tile costs two index lookups plus a scan of the
+partial hours at its edges, however long the period is.
+
+Every ingest path folds its readings in within the transaction that stores
+them (in the device's shard when storage is sharded). An in-order reading
+only touches its device's newest bucket; a late reading also adds its values
+to every later bucket of that device.
+"""
+
+import logging
+from collections import defaultdict
+from collections.abc import Mapping, Sequence
+from datetime import datetime, timedelta
+from typing import Any, cast
+
+from sqlalchemy import DateTime, Table, bindparam, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import AsyncSessionLocal, dialect_insert
+from ..models import ReadingRollup, SensorReading
+from ..sharding import shards
+from ..timestamps import naive_utc
+from .hot_tier import MEASUREMENTS
+
+logger = logging.getLogger(__name__)
+
+BUCKET = timedelta(hours=1)
+
+# Totals tracked per bucket, in the order used by the totals lists below
+TOTAL_COLUMNS = ("reading_count",) + tuple(
+    f"{name}_{part}" for name in MEASUREMENTS for part in ("count", "sum")
+)
+
+Totals = list[float]
+DeviceKey = tuple[str, str]
+
+
+def _zero() -> Totals:
+    return [0] * len(TOTAL_COLUMNS)
+
+
+def _add(totals: Totals, other: Totals) -> Totals:
+    return [a + b for a, b in zip(totals, other)]
+
+
+def _sub(totals: Totals, other: Totals) -> Totals:
+    return [a - b for a, b in zip(totals, other)]
+
+
+def _accumulate(totals: Totals, row: Mapping[str, Any]) -> None:
+    """Add one reading to a totals list in place."""
+    totals[0] += 1
+    for slot, name in enumerate(MEASUREMENTS):
+        value = row.get(name)
+        if value is not None:
+            totals[1 + 2 * slot] += 1
+            totals[2 + 2 * slot] += value
+
+
+def bucket_floor(timestamp: datetime) -> datetime:
+    """Start of the hourly bucket holding a (naive UTC) timestamp."""
+    return timestamp.replace(tzinfo=None, minute=0, second=0, microsecond=0)
+
+
+def bucket_ceil(timestamp: datetime) -> datetime:
+    """First bucket boundary at or after a timestamp."""
+    floor = bucket_floor(timestamp)
+    return floor if floor == timestamp.replace(tzinfo=None) else floor + BUCKET
+
+
+def _key_filter(table: Any) -> list[Any]:
+    return [
+        table.sensor_type == bindparam("key_sensor_type"),
+        table.device_id == bindparam("key_device_id"),
+    ]
+
+
+def _upsert(db: AsyncSession) -> Any:
+    """
+    Build the upsert adding a delta to one bucket's running totals.
+
+    A new bucket starts from the totals of the device's previous bucket.
+    """
+    table = ReadingRollup.__table__.c
+    bucket_start = bindparam("key_bucket_start", type_=DateTime)
+
+    def carried(column: str) -> Any:
+        previous = (
+            select(table[column])
+            .where(*_key_filter(table), table.bucket_start < bucket_start)
+            .order_by(table.bucket_start.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        return func.coalesce(previous, 0) + bindparam(f"delta_{column}")
+
+    stmt = dialect_insert(db)(ReadingRollup.__table__).values(
+        sensor_type=bindparam("key_sensor_type"),
+        device_id=bindparam("key_device_id"),
+        bucket_start=bucket_start,
+        **{column: carried(column) for column in TOTAL_COLUMNS},
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[table.sensor_type, table.device_id, table.bucket_start],
+        set_={column: table[column] + bindparam(f"delta_{column}") for column in TOTAL_COLUMNS},
+    )
+
+
+def _carry_forward() -> Any:
+    """Build the update adding a late delta to every later bucket of the device."""
+    table = ReadingRollup.__table__.c
+    return (
+        update(cast(Table, ReadingRollup.__table__))
+        .where(*_key_filter(table), table.bucket_start > bindparam("key_bucket_start"))
+        .values({column: table[column] + bindparam(f"delta_{column}") for column in TOTAL_COLUMNS})
+    )
+
+
+async def record_rollups(db: AsyncSession, rows: Sequence[Mapping[str, Any]]) -> None:
+    """
+    Fold a batch of stored readings into the running totals.
+
+    Runs in the caller's transaction as two statements for the whole batch:
+    one adding each bucket's delta to all later buckets of the device (a
+    no-op for in-order readings), then one upsert per bucket in time order.
+
+    Args:
+        db: Session the readings are written with (main database or their shard)
+        rows: Stored rows with sensor_type, device_id, timestamp and measurement keys
+    """
+    if not rows:
+        return
+
+    deltas: dict[tuple[str, str, datetime], Totals] = defaultdict(_zero)
+    for row in rows:
+        bucket = bucket_floor(row["timestamp"])
+        _accumulate(deltas[(row["sensor_type"], row["device_id"], bucket)], row)
+
+    # Sorted so a new bucket is inserted after any earlier new bucket it carries from
+    params = [
+        {
+            "key_sensor_type": sensor_type,
+            "key_device_id": device_id,
+            "key_bucket_start": bucket,
+            **{f"delta_{column}": value for column, value in zip(TOTAL_COLUMNS, delta)},
+        }
+        for (sensor_type, device_id, bucket), delta in sorted(deltas.items())
+    ]
+    await db.execute(_carry_forward(), params)
+    await db.execute(_upsert(db), params)
+
+
+async def _totals_before(
+    db: AsyncSession, sensor_type: str, device_id: str, boundary: datetime
+) -> Totals:
+    """Running totals of every reading before an hourly boundary."""
+    result = await db.execute(
+        select(*(getattr(ReadingRollup, column) for column in TOTAL_COLUMNS))
+        .where(
+            ReadingRollup.sensor_type == sensor_type,
+            ReadingRollup.device_id == device_id,
+            ReadingRollup.bucket_start < boundary,
+        )
+        .order_by(ReadingRollup.bucket_start.desc())
+        .limit(1)
+    )
+    row = result.first()
+    return list(row) if row else _zero()
+
+
+def _aggregates() -> list[Any]:
+    """Aggregates over raw readings matching ``TOTAL_COLUMNS``."""
+    aggregates: list[Any] = [func.count()]
+    for name in MEASUREMENTS:
+        column = getattr(SensorReading, name)
+        aggregates += [func.count(column), func.coalesce(func.sum(column), 0.0)]
+    return aggregates
+
+
+async def _raw_totals(
+    db: AsyncSession,
+    sensor_type: str,
+    device_id: str,
+    ranges: list[tuple[datetime, datetime, bool]],
+) -> list[Totals]:
+    """
+    Aggregate raw readings over short ranges (the partial hours at period edges).
+
+    Args:
+        db: Session of the database holding the device's readings
+        sensor_type: Type of sensor
+        device_id: Device identifier
+        ranges: (start, end, end inclusive) ranges, start always inclusive
+
+    Returns:
+        Totals per range, in order
+    """
+    aggregates = _aggregates()
+    totals = []
+    for start, end, inclusive in ranges:
+        upper = SensorReading.timestamp <= end if inclusive else SensorReading.timestamp < end
+        result = await db.execute(
+            select(*aggregates).where(
+                SensorReading.sensor_type == sensor_type,
+                SensorReading.device_id == device_id,
+                SensorReading.timestamp >= start,
+                upper,
+            )
+        )
+        totals.append(list(result.one()))
+    return totals
+
+
+async def period_totals(
+    db: AsyncSession,
+    sensor_type: str,
+    device_id: str,
+    periods: list[tuple[datetime, datetime]],
+) -> list[Totals]:
+    """
+    Compute a device's totals over several periods.
+
+    Whole hours come from the rollup table; only the partial hours at each
+    period's edges are read from raw readings. Both are read from the
+    device's shard when storage is sharded.
+
+    Args:
+        db: Main database session
+        sensor_type: Type of sensor
+        device_id: Device identifier
+        periods: (start, end) ranges, both inclusive (aware values are converted to UTC)
+
+    Returns:
+        Totals per period in ``TOTAL_COLUMNS`` order
+    """
+    lookups: dict[datetime, Totals] = {}
+    # (start, end, end inclusive) -> position in the raw edge query list
+    edges: dict[tuple[datetime, datetime, bool], int] = {}
+    # Whole-bucket (first, last) boundaries, or None, and the edge parts of each period
+    plans: list[tuple[tuple[datetime, datetime] | None, list[int]]] = []
+    for start, end in periods:
+        start, end = naive_utc(start), naive_utc(end)
+        first, last = bucket_ceil(start), bucket_floor(end)
+        if first >= last:
+            # Shorter than a whole bucket: aggregate it directly
+            plans.append((None, [edges.setdefault((start, end, True), len(edges))]))
+            continue
+        parts = [edges.setdefault((last, end, True), len(edges))]
+        if start < first:
+            parts.append(edges.setdefault((start, first, False), len(edges)))
+        lookups[first] = lookups[last] = _zero()
+        plans.append(((first, last), parts))
+
+    async def fetch(session: AsyncSession) -> list[Totals]:
+        for boundary in lookups:
+            lookups[boundary] = await _totals_before(session, sensor_type, device_id, boundary)
+        return await _raw_totals(session, sensor_type, device_id, list(edges))
+
+    if shards is None:
+        edge_totals = await fetch(db)
+    else:
+        edge_totals = (await shards.gather(fetch, [shards.index_for(device_id)]))[0]
+
+    results = []
+    for bounds, parts in plans:
+        totals = _sub(lookups[bounds[1]], lookups[bounds[0]]) if bounds else _zero()
+        for part in parts:
+            totals = _add(totals, edge_totals[part])
+        results.append(totals)
+    return results
+
+
+def _hour_of(dialect: str) -> Any:
+    """Start of the hour of the reading timestamp, per dialect."""
+    if dialect == "postgresql":
+        return func.date_trunc("hour", SensorReading.timestamp)
+    return func.strftime("%Y-%m-%d %H:00:00", SensorReading.timestamp)
+
+
+async def _hourly(session: AsyncSession) -> list[tuple[str, str, datetime, Totals]]:
+    """Aggregate one database's readings per device and hour (full scan)."""
+    hour = _hour_of(session.get_bind().dialect.name).label("hour")
+    result = await session.execute(
+        select(SensorReading.sensor_type, SensorReading.device_id, hour, *_aggregates()).group_by(
+            SensorReading.sensor_type, SensorReading.device_id, hour
+        )
+    )
+    return [
+        (
+            sensor_type,
+            device_id,
+            bucket if isinstance(bucket, datetime) else datetime.fromisoformat(bucket),
+            list(totals),
+        )
+        for sensor_type, device_id, bucket, *totals in result
+    ]
+
+
+async def _rebuild(db: AsyncSession) -> int:
+    """Accumulate one database's readings into its empty reading_rollups table."""
+    if await db.scalar(select(func.count()).select_from(ReadingRollup)):
+        return 0
+
+    running: dict[DeviceKey, Totals] = {}
+    rows = []
+    for sensor_type, device_id, bucket, totals in sorted(await _hourly(db), key=lambda b: b[:3]):
+        key = (sensor_type, device_id)
+        running[key] = _add(running.get(key, _zero()), totals)
+        rows.append(
+            {
+                "sensor_type": sensor_type,
+                "device_id": device_id,
+                "bucket_start": bucket,
+                **dict(zip(TOTAL_COLUMNS, running[key])),
+            }
+        )
+
+    if rows:
+        await db.execute(insert(ReadingRollup), rows)
+        logger.info(f"Rebuilt {len(rows)} rollup buckets for {len(running)} devices")
+    return len(rows)
+
+
+async def rebuild_rollups() -> int:
+    """
+    Populate reading_rollups from existing readings if it is empty.
+
+    Running totals are accumulated in bucket order per device, so the whole
+    table is written in one pass. With sharded storage each shard's table is
+    rebuilt from its own readings.
+
+    Returns:
+        Number of buckets written
+    """
+    if shards is not None:
+        return sum(await shards.write_each(_rebuild))
+
+    async with AsyncSessionLocal() as db:
+        rebuilt = await _rebuild(db)
+        await db.commit()
+        return rebuilt
+
+
+# Rolling periods ending at the summary's end time
+SUMMARY_PERIODS = {
+    "day": timedelta(days=1),
+    "week": timedelta(days=7),
+    "month": timedelta(days=30),
+    "six_months": timedelta(days=182),
+    "year": timedelta(days=365),
+}
+
+
+async def device_summary(
+    db: AsyncSession,
+    sensor_type: str,
+    device_id: str,
+    end_time: datetime,
+    custom_start: datetime | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Compute a device's period tiles (day to year, year-to-date, custom).
+
+    Args:
+        db: Database session
+        sensor_type: Type of sensor
+        device_id: Device identifier
+        end_time: End of every period (aware values are converted to UTC)
+        custom_start: Start of an extra "custom" period, if requested
+
+    Returns:
+        One dictionary per period with its range, reading count and, per
+        measurement, the count, sum and mean of non-null values
+
+    Raises:
+        ValueError: If custom_start is after end_time
+    """
+    end_time = naive_utc(end_time)
+    periods = {name: end_time - span for name, span in SUMMARY_PERIODS.items()}
+    periods["ytd"] = datetime(end_time.year, 1, 1)
+    if custom_start is not None:
+        custom_start = naive_utc(custom_start)
+        if custom_start > end_time:
+            raise ValueError("start must not be after end")
+        periods["custom"] = custom_start
+
+    totals = await period_totals(
+        db, sensor_type, device_id, [(start, end_time) for start in periods.values()]
+    )
+
+    tiles = []
+    for (name, start), values in zip(periods.items(), totals):
+        tile: dict[str, Any] = {
+            "period": name,
+            "start": start,
+            "end": end_time,
+            "reading_count": int(values[0]),
+        }
+        for slot, measurement in enumerate(MEASUREMENTS):
+            count = int(values[1 + 2 * slot])
+            # Differences of running sums can leave rounding noise on empty periods
+            total = values[2 + 2 * slot] if count else 0.0
+            tile[measurement] = {
+                "count": count,
+                "sum": total,
+                "mean": total / count if count else None,
+            }
+        tiles.append(tile)
+    return tiles
@@ -3,32 +3,74 @@
 import logging
 from datetime import datetime, timedelta, timezone
 
+from apscheduler.events import (
+    EVENT_JOB_ERROR,
+    EVENT_JOB_EXECUTED,
+    EVENT_JOB_SUBMITTED,
+    JobExecutionEvent,
+    JobSubmissionEvent,
+)
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..config import settings
 from ..database import AsyncSessionLocal
+from ..metrics import SCHEDULER_JOB_DURATION, SCHEDULER_JOB_LAG, CallbackMetric, registry
 from .data_processing import process_sensor_data
+from .leader import LeaderLease, LeaseLost
 
 logger = logging.getLogger(__name__)
 
 # Global scheduler instance
 scheduler: AsyncIOScheduler | None = None
 
+# Lease deciding which process runs scheduled jobs (None when leader election is off)
+scheduler_lease: LeaderLease | None = None
 
-async def calculate_rolling_average_task():
+# Submission time of each running job, for duration metrics
+_job_started: dict[str, datetime] = {}
+
+
+def _record_job_submitted(event: JobSubmissionEvent) -> None:
+    """Record how late a job started relative to its scheduled time."""
+    now = datetime.now(timezone.utc)
+    _job_started[event.job_id] = now
+    lag = (now - max(event.scheduled_run_times)).total_seconds()
+    SCHEDULER_JOB_LAG.observe(max(lag, 0.0), (event.job_id,))
+
+
+def _record_job_finished(event: JobExecutionEvent) -> None:
+    """Record how long a job ran."""
+    started = _job_started.pop(event.job_id, None)
+    if started is not None:
+        duration = (datetime.now(timezone.utc) - started).total_seconds()
+        SCHEDULER_JOB_DURATION.observe(duration, (event.job_id,))
+
+
+async def calculate_rolling_average_task(end_time: datetime | None = None):
     """
     Background task to calculate rolling average based on configuration.
 
+    Args:
+        end_time: End of the window (default: now); set by the benchmarks to
+            replay a tick over seeded data
+
     This task:
     1. Calculates the time window based on rolling_average_window_hours config
     2. Processes data using the rolling_average processor
     3. Stores results in the processed_data table
+
+    With leader election enabled it only runs in the lease holder, and the
+    result is committed only if the lease is still held (fencing).
     """
+    if scheduler_lease is not None and not scheduler_lease.is_leader:
+        logger.debug("Skipping rolling average: not the scheduler leader")
+        return
+
     try:
         # Calculate time window from configuration
-        end_time = datetime.now(timezone.utc)
+        end_time = end_time or datetime.now(timezone.utc)
         start_time = end_time - timedelta(hours=settings.rolling_average_window_hours)
 
         logger.info(
@@ -46,6 +88,9 @@ async def calculate_rolling_average_task():
                 sensor_type=settings.rolling_average_sensor_type,
                 device_id=None,  # Process all devices
             )
+            if scheduler_lease is not None:
+                await scheduler_lease.fence(db)
+            await db.commit()
 
             logger.info(
                 f"Rolling average calculation completed. "
@@ -53,13 +98,26 @@ async def calculate_rolling_average_task():
                 f"Result ID: {result.id}"
             )
 
+    except LeaseLost as e:
+        logger.warning(f"Discarded rolling average result: {e}")
     except Exception as e:
         logger.error(f"Error calculating rolling average: {e}", exc_info=True)
 
 
+async def renew_scheduler_lease() -> None:
+    """Renew the scheduler lease, or try to take it over from a dead leader."""
+    if scheduler_lease is not None:
+        await scheduler_lease.heartbeat()
+
+
 def start_scheduler():
-    """Initialize and start the background scheduler."""
-    global scheduler
+    """
+    Initialize and start the background scheduler.
+
+    With leader election enabled every process runs the scheduler and
+    competes for the lease, but jobs only do work in the lease holder.
+    """
+    global scheduler, scheduler_lease
 
     if scheduler is not None:
         logger.warning("Scheduler already running")
@@ -73,6 +131,21 @@ def start_scheduler():
 
     # Create scheduler with asyncio event loop
     scheduler = AsyncIOScheduler()
+    scheduler.add_listener(_record_job_submitted, EVENT_JOB_SUBMITTED)
+    scheduler.add_listener(_record_job_finished, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR)
+
+    # Lease heartbeat: runs immediately, then renews (or retries a takeover)
+    if settings.scheduler_leader_election:
+        scheduler_lease = LeaderLease("scheduler", settings.scheduler_lease_seconds)
+        scheduler.add_job(
+            renew_scheduler_lease,
+            trigger=IntervalTrigger(seconds=settings.scheduler_lease_renew_seconds),
+            id="scheduler_lease",
+            name="Renew scheduler leader lease",
+            replace_existing=True,
+            max_instances=1,
+            next_run_time=datetime.now(timezone.utc),
+        )
 
     # Add rolling average task - runs based on configuration
     scheduler.add_job(
@@ -110,6 +183,15 @@ def stop_scheduler():
     logger.info("Background scheduler stopped")
 
 
+async def release_scheduler_lease() -> None:
+    """Hand leadership over on shutdown instead of waiting for the lease to expire."""
+    global scheduler_lease
+
+    if scheduler_lease is not None:
+        await scheduler_lease.release()
+        scheduler_lease = None
+
+
 def get_scheduler_status() -> dict:
     """Get current scheduler status and job information."""
     global scheduler
@@ -117,6 +199,7 @@ def get_scheduler_status() -> dict:
     if scheduler is None:
         return {
             "running": False,
+            "leader": None,
             "jobs": [],
         }
 
@@ -132,5 +215,21 @@ def get_scheduler_status() -> dict:
 
     return {
         "running": True,
+        # None when leader election is disabled (jobs run in every process)
+        "leader": scheduler_lease.status() if scheduler_lease is not None else None,
         "jobs": jobs,
     }
+
+
+registry.register(
+    CallbackMetric(
+        "scheduler_is_leader",
+        "1 if this process holds the scheduler lease (or leader election is off)",
+        lambda: {
+            (): float(
+                scheduler is not None
+                and (scheduler_lease is None or scheduler_lease.is_leader)
+            )
+        },
+    )
+)
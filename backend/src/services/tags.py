@@ -0,0 +1,377 @@
+"""Metadata tag index service.
+
+Extracts the configured metadata keys (``TAG_KEYS``) from every ingested
+reading and records one ``series`` row per (sensor type, device, tag set),
+with the tags themselves in ``series_tags`` keyed by (key, value). Each
+reading is stored with the id of its series. Tag filters such as
+``location=office`` are resolved through this index into the matching series
+before any reading is read, so filtering by site or well never inspects
+``extra_metadata`` row by row, and a device whose tags change back and forth
+only matches the readings that carried the tags. With sharded storage each
+shard indexes the series of its own devices, so series ids are only unique
+within a shard.
+"""
+
+import json
+import logging
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from datetime import datetime
+from heapq import merge
+from typing import Any, cast
+
+from sqlalchemy import Table, and_, bindparam, case, or_, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from ..config import settings
+from ..database import AsyncSessionLocal, dialect_insert, reset_on_rollback
+from ..models import SensorReading, Series, SeriesTag
+from ..sharding import shards
+
+logger = logging.getLogger(__name__)
+
+DIRTY_KEY = "series_index_dirty"
+LOAD_CHUNK_SIZE = 500
+REBUILD_PARTITION_SIZE = 10_000
+
+SeriesKey = tuple[str, str, str]
+
+# Ids of series whose tags are already indexed; cleared when a writing transaction rolls back
+_indexed: dict[SeriesKey, int] = {}
+reset_on_rollback(DIRTY_KEY, _indexed.clear)
+
+
+@dataclass(frozen=True, slots=True)
+class SeriesSpan:
+    """One series and the time span of its readings."""
+
+    series_id: int
+    sensor_type: str
+    device_id: str
+    first_timestamp: datetime
+    last_timestamp: datetime
+
+
+def extract_tags(metadata: Mapping[str, Any] | None) -> dict[str, str]:
+    """
+    Pick the indexed tag keys out of a reading's metadata.
+
+    Only scalar values are indexed; they are compared as strings.
+    """
+    if not metadata:
+        return {}
+    return {
+        key: str(metadata[key])
+        for key in settings.tag_keys_list
+        if isinstance(metadata.get(key), (str, int, float, bool))
+    }
+
+
+def tags_key(tags: Mapping[str, str]) -> str:
+    """Canonical form of a tag set."""
+    return json.dumps(tags, sort_keys=True, separators=(",", ":"))
+
+
+def validate_tags(tags: Mapping[str, str]) -> None:
+    """
+    Check that every tag filter uses an indexed key.
+
+    Raises:
+        ValueError: If a key is not in TAG_KEYS
+    """
+    for key in tags:
+        if key not in settings.tag_keys_list:
+            indexed = ", ".join(settings.tag_keys_list) or "none"
+            raise ValueError(f"Tag key {key!r} is not indexed (indexed keys: {indexed})")
+
+
+def parse_tag_filters(values: list[str] | None) -> dict[str, str]:
+    """
+    Parse ``key=value`` tag filters from query parameters.
+
+    Raises:
+        ValueError: If a filter is malformed or its key is not indexed
+    """
+    tags: dict[str, str] = {}
+    for value in values or []:
+        key, sep, tag_value = value.partition("=")
+        if not sep or not key.strip():
+            raise ValueError(f"Tag filter must be key=value: {value!r}")
+        tags[key.strip()] = tag_value
+    validate_tags(tags)
+    return tags
+
+
+def _upsert(db: AsyncSession) -> Any:
+    """Build the dialect-specific upsert widening a series' time span."""
+    stmt = dialect_insert(db)(Series)
+    table = Series.__table__.c
+    new = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=[table.sensor_type, table.device_id, table.tags_key],
+        set_={
+            "first_timestamp": case(
+                (new.first_timestamp < table.first_timestamp, new.first_timestamp),
+                else_=table.first_timestamp,
+            ),
+            "last_timestamp": case(
+                (new.last_timestamp > table.last_timestamp, new.last_timestamp),
+                else_=table.last_timestamp,
+            ),
+        },
+    )
+
+
+def _group(
+    rows: Iterable[Mapping[str, Any]], groups: dict[SeriesKey, list[Any]]
+) -> list[SeriesKey]:
+    """
+    Fold rows into series key -> [tags, first timestamp, last timestamp].
+
+    Returns:
+        Series key of each row, in order
+    """
+    keys = []
+    for row in rows:
+        tags = extract_tags(row.get("extra_metadata"))
+        # Timestamps are stored without timezone; compare them the same way
+        timestamp = row["timestamp"].replace(tzinfo=None)
+        key = (row["sensor_type"], row["device_id"], tags_key(tags))
+        group = groups.get(key)
+        if group is None:
+            groups[key] = [tags, timestamp, timestamp]
+        else:
+            group[1] = min(group[1], timestamp)
+            group[2] = max(group[2], timestamp)
+        keys.append(key)
+    return keys
+
+
+async def _write(db: AsyncSession, groups: dict[SeriesKey, list[Any]]) -> dict[SeriesKey, int]:
+    """
+    Upsert grouped series and index the tags of series new since startup.
+
+    Returns:
+        Series id of every grouped key
+    """
+    db.info[DIRTY_KEY] = True
+    await db.execute(
+        _upsert(db),
+        [
+            {
+                "sensor_type": key[0],
+                "device_id": key[1],
+                "tags_key": key[2],
+                "tags": tags,
+                "first_timestamp": first,
+                "last_timestamp": last,
+            }
+            for key, (tags, first, last) in groups.items()
+        ],
+    )
+
+    ids = {key: _indexed[key] for key in groups if key in _indexed}
+    new = [key for key in groups if key not in ids]
+    insert = dialect_insert(db)
+    for offset in range(0, len(new), LOAD_CHUNK_SIZE):
+        result = await db.execute(
+            select(Series.id, Series.sensor_type, Series.device_id, Series.tags_key).where(
+                tuple_(Series.sensor_type, Series.device_id, Series.tags_key).in_(
+                    new[offset : offset + LOAD_CHUNK_SIZE]
+                )
+            )
+        )
+        loaded = {(sensor_type, device_id, key): id_ for id_, sensor_type, device_id, key in result}
+        tag_rows = [
+            {"key": key, "value": value, "series_id": series_id}
+            for series_key, series_id in loaded.items()
+            for key, value in groups[series_key][0].items()
+        ]
+        if tag_rows:
+            await db.execute(insert(SeriesTag).on_conflict_do_nothing(), tag_rows)
+        ids.update(loaded)
+    _indexed.update(ids)
+    return ids
+
+
+async def record_series(db: AsyncSession, rows: list[dict[str, Any]]) -> None:
+    """
+    Index the series of a batch of readings and set each row's ``series_id``.
+
+    Runs in the caller's transaction before the readings are inserted: one
+    upsert for every series in the batch, plus one lookup and one insert of
+    tags for series not indexed since startup.
+
+    Args:
+        db: Session the readings are written with (main database or their shard)
+        rows: Rows with sensor_type, device_id, timestamp and extra_metadata keys
+    """
+    if not rows:
+        return
+
+    groups: dict[SeriesKey, list[Any]] = {}
+    keys = _group(rows, groups)
+    ids = await _write(db, groups)
+    for row, key in zip(rows, keys):
+        row["series_id"] = ids[key]
+
+
+def _series_query(query: Any, sensor_type: str | None, tags: Mapping[str, str]) -> Any:
+    """Restrict a series query to a sensor type and every given tag."""
+    if sensor_type:
+        query = query.where(Series.sensor_type == sensor_type)
+    for key, value in tags.items():
+        query = query.where(
+            Series.id.in_(
+                select(SeriesTag.series_id).where(SeriesTag.key == key, SeriesTag.value == value)
+            )
+        )
+    return query
+
+
+async def resolve_series(
+    db: AsyncSession, tags: Mapping[str, str], sensor_type: str | None = None
+) -> list[SeriesSpan]:
+    """
+    Find the series whose readings carry all given tags.
+
+    Args:
+        db: Main database session
+        tags: Tag filters (key -> value)
+        sensor_type: Optional sensor type
+
+    Returns:
+        Matching series spans (empty when nothing matches)
+
+    Raises:
+        ValueError: If a tag key is not indexed
+    """
+    validate_tags(tags)
+    query = _series_query(
+        select(
+            Series.id,
+            Series.sensor_type,
+            Series.device_id,
+            Series.first_timestamp,
+            Series.last_timestamp,
+        ),
+        sensor_type,
+        tags,
+    )
+
+    async def fetch(session: AsyncSession) -> list[SeriesSpan]:
+        result = await session.execute(query)
+        return [SeriesSpan(*row) for row in result]
+
+    if shards is None:
+        return await fetch(db)
+    return [span for part in await shards.gather(fetch) for span in part]
+
+
+def span_filter(spans: list[SeriesSpan]) -> ColumnElement[bool]:
+    """
+    SQL condition selecting the readings of any of the series.
+
+    Each series id is paired with its device, as ids are only unique within a shard.
+    """
+    return or_(
+        *(
+            and_(
+                SensorReading.device_id == span.device_id,
+                SensorReading.series_id == span.series_id,
+            )
+            for span in spans
+        )
+    )
+
+
+def series_by_device(spans: list[SeriesSpan]) -> dict[str, set[int]]:
+    """Group the ids of series by device, as the hot tier filters them."""
+    by_device: dict[str, set[int]] = {}
+    for span in spans:
+        by_device.setdefault(span.device_id, set()).add(span.series_id)
+    return by_device
+
+
+async def list_series(
+    db: AsyncSession, sensor_type: str | None = None, tags: Mapping[str, str] | None = None
+) -> list[Series]:
+    """
+    List indexed series, optionally filtered by sensor type and tags.
+
+    Args:
+        db: Database session
+        sensor_type: Filter by sensor type
+        tags: Tag filters (key -> value)
+
+    Returns:
+        Series rows ordered by sensor type, device ID and first timestamp
+    """
+    query = _series_query(select(Series), sensor_type, tags or {}).order_by(
+        Series.sensor_type, Series.device_id, Series.first_timestamp
+    )
+
+    async def fetch(session: AsyncSession) -> list[Series]:
+        result = await session.execute(query)
+        return list(result.scalars().all())
+
+    if shards is None:
+        return await fetch(db)
+    parts = await shards.gather(fetch)
+    return list(
+        merge(*parts, key=lambda item: (item.sensor_type, item.device_id, item.first_timestamp))
+    )
+
+
+async def _rebuild(db: AsyncSession) -> int:
+    """Assign series to one database's readings stored without one."""
+    query = (
+        select(
+            SensorReading.id,
+            SensorReading.sensor_type,
+            SensorReading.device_id,
+            SensorReading.timestamp,
+            SensorReading.extra_metadata,
+        )
+        .where(SensorReading.series_id.is_(None))
+        .limit(REBUILD_PARTITION_SIZE)
+    )
+    assign = (
+        update(cast(Table, SensorReading.__table__))
+        .where(SensorReading.__table__.c.id == bindparam("reading_id"))
+        .values(series_id=bindparam("assigned_series_id"))
+    )
+
+    assigned = 0
+    while rows := [dict(row) for row in (await db.execute(query)).mappings()]:
+        await record_series(db, rows)
+        await db.execute(
+            assign,
+            [{"reading_id": row["id"], "assigned_series_id": row["series_id"]} for row in rows],
+        )
+        assigned += len(rows)
+    if assigned:
+        logger.info(f"Indexed the series of {assigned} readings")
+    return assigned
+
+
+async def rebuild_series_index() -> int:
+    """
+    Index the series of readings stored without one.
+
+    On the first start after upgrading this covers every existing reading.
+    Readings are assigned in partitions, so memory grows with the partition
+    size rather than the table. With sharded storage each shard indexes its
+    own readings.
+
+    Returns:
+        Number of readings assigned to a series
+    """
+    if shards is not None:
+        return sum(await shards.write_each(_rebuild))
+
+    async with AsyncSessionLocal() as db:
+        rebuilt = await _rebuild(db)
+        await db.commit()
+        return rebuilt
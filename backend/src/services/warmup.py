@@ -0,0 +1,153 @@
+"""Startup warm-up.
+
+Right after a deploy, the first requests would otherwise pay for opening
+database connections (and loading the driver), compiling each hot statement
+(SQLAlchemy caches compiled SQL per statement shape, per process), reading
+cold index pages from disk, and for the anomaly detectors to relearn every
+device's running mean. These steps do that work during startup, before
+``/api/v1/health/ready`` lets traffic in. Each step logs and skips failures
+so a warm-up problem never prevents the service from starting.
+"""
+
+import logging
+from collections.abc import Mapping
+from contextlib import AsyncExitStack
+from datetime import datetime, timedelta
+from typing import Any, cast
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from ..config import settings
+from ..database import AsyncSessionLocal, engine
+from ..models import SensorReading
+from ..sharding import shards
+from .anomaly import anomaly_engine, query_anomalies
+from .data_ingestion import fetch_readings, query_raw_rows
+from .data_processing import query_processed_rows, query_processed_series
+from .device_state import list_device_states
+
+logger = logging.getLogger(__name__)
+
+PRIME_PARTITION_SIZE = 10_000
+
+# Device ID used by the cache-warming queries; matches no readings
+WARMUP_DEVICE_ID = "__warmup__"
+
+
+async def _open_connections(target: AsyncEngine, count: int) -> int:
+    """Hold ``count`` connections of an engine's pool open at once, then return them."""
+    pool = target.sync_engine.pool
+    # Pools without a fixed size (e.g. the single connection of in-memory SQLite)
+    count = min(count, pool.size()) if hasattr(pool, "size") else 1
+    async with AsyncExitStack() as stack:
+        for _ in range(count):
+            connection = await stack.enter_async_context(target.connect())
+            await connection.execute(text("SELECT 1"))
+    return count
+
+
+async def warm_connection_pool() -> int:
+    """
+    Open the database connection pools ahead of the first requests.
+
+    Returns:
+        Number of connections opened across the main database and shards
+    """
+    engines = [engine, *(shards.engines if shards is not None else [])]
+    opened = 0
+    for target in engines:
+        try:
+            opened += await _open_connections(target, settings.warmup_pool_connections)
+        except Exception as e:
+            logger.warning(f"Connection pool warm-up failed: {e}")
+    return opened
+
+
+async def warm_statement_cache() -> int:
+    """
+    Run the hot read queries once so their compiled SQL is cached.
+
+    Uses the service functions behind the dashboard endpoints with cheap
+    filters, which also pulls the top of their indexes into the page cache.
+    Device list queries read the whole ``device_state`` table, the source of
+    the latest-reading tiles.
+
+    Returns:
+        Number of queries that ran
+    """
+    now = datetime.utcnow()
+    hour_ago = now - timedelta(hours=1)
+    sensor_type = settings.rolling_average_sensor_type
+    queries = [
+        lambda db: list_device_states(db),
+        lambda db: list_device_states(db, sensor_type),
+        lambda db: query_raw_rows(db, limit=1),
+        lambda db: query_raw_rows(db, sensor_type, WARMUP_DEVICE_ID, hour_ago, now, limit=1),
+        lambda db: fetch_readings(db, sensor_type, hour_ago, now, WARMUP_DEVICE_ID),
+        lambda db: query_processed_rows(db, limit=1),
+        lambda db: query_processed_series(
+            db, "rolling_average", ["avg_temperature_c"], sensor_type, limit=1
+        ),
+        lambda db: query_anomalies(db, limit=1),
+    ]
+
+    ran = 0
+    async with AsyncSessionLocal() as db:
+        for query in queries:
+            try:
+                await query(db)
+                ran += 1
+            except Exception as e:
+                logger.warning(f"Statement cache warm-up query failed: {e}")
+                await db.rollback()
+    return ran
+
+
+async def prime_anomaly_engine() -> int:
+    """
+    Replay recent readings into the anomaly detectors.
+
+    Restores each device's running mean and variance, last value and flat-line
+    run, so spikes are scored from the first reading after a restart instead
+    of after ``ANOMALY_WARMUP_READINGS`` new ones. Replayed readings raise no
+    events.
+
+    Returns:
+        Number of readings replayed
+    """
+    minutes = settings.warmup_anomaly_minutes
+    if not anomaly_engine.enabled or minutes <= 0:
+        return 0
+
+    cutoff = datetime.utcnow() - timedelta(minutes=minutes)
+    query = (
+        select(
+            SensorReading.sensor_type,
+            SensorReading.device_id,
+            SensorReading.timestamp,
+            SensorReading.temperature_c,
+            SensorReading.humidity,
+            SensorReading.pressure_hpa,
+        )
+        .where(SensorReading.timestamp >= cutoff)
+        .order_by(SensorReading.timestamp)
+    )
+
+    # Shards hold disjoint devices, so their partitions may interleave
+    async def replay(session: AsyncSession) -> int:
+        replayed = 0
+        result = await session.stream(query)
+        async for partition in result.mappings().partitions(PRIME_PARTITION_SIZE):
+            anomaly_engine.score(cast(list[Mapping[str, Any]], partition))
+            replayed += len(partition)
+        return replayed
+
+    try:
+        if shards is None:
+            async with AsyncSessionLocal() as session:
+                return await replay(session)
+        return sum(await shards.gather(replay))
+    except Exception as e:
+        logger.warning(f"Anomaly engine warm-up failed: {e}")
+        return 0
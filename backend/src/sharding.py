@@ -0,0 +1,185 @@
+"""Hash-sharded SQLite storage for sensor readings.
+
+When ``sqlite_shard_count`` is greater than one, the ``sensor_readings`` table is
+partitioned by a hash of ``device_id`` across N SQLite files stored next to the
+main database. Each shard has its own async engine and writer lock, so writes for
+devices on different shards no longer queue behind a single SQLite writer.
+
+The per-device summaries maintained on ingest (device state, rollups, the
+series index and anomaly events) live in the shard of their device and are
+written in the same transaction as its readings, so a batch never takes the
+main database's writer lock and its summaries commit or roll back with it.
+All other tables stay in the main database.
+"""
+
+import asyncio
+import zlib
+from collections.abc import AsyncGenerator, Awaitable, Callable, Iterable
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import TypeVar
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from . import profiling
+from .config import settings
+from .database import Base, sync_columns, sync_indexes
+from .metrics import instrument_engine
+
+T = TypeVar("T")
+
+# Readings and the summaries derived from them
+SHARDED_TABLES = (
+    "sensor_readings",
+    "device_state",
+    "reading_rollups",
+    "series",
+    "series_tags",
+    "anomaly_events",
+)
+
+
+def shard_url(database_url: str, index: int) -> str:
+    """
+    Derive the URL of a shard file from the main SQLite database URL.
+
+    ``sqlite+aiosqlite:///./sensor_data.db`` becomes
+    ``sqlite+aiosqlite:///sensor_data.shard0.db`` for shard 0.
+    """
+    url = make_url(database_url)
+    if not url.drivername.startswith("sqlite"):
+        raise ValueError("Sharded storage is only supported for SQLite databases")
+    database = url.database or ""
+    if database in ("", ":memory:"):
+        raise ValueError("Sharded storage requires a file-backed SQLite database")
+
+    path = Path(database)
+    shard_path = path.with_name(f"{path.stem}.shard{index}{path.suffix or '.db'}")
+    return url.set(database=str(shard_path)).render_as_string(hide_password=False)
+
+
+class ShardSet:
+    """A fixed set of SQLite shard databases holding readings and their summaries."""
+
+    def __init__(self, database_url: str, count: int) -> None:
+        """
+        Create one engine and session factory per shard.
+
+        Args:
+            database_url: URL of the main SQLite database
+            count: Number of shards (must be at least 1)
+        """
+        if count < 1:
+            raise ValueError("Shard count must be at least 1")
+
+        self.count = count
+        self.engines: list[AsyncEngine] = [
+            create_async_engine(
+                shard_url(database_url, index),
+                connect_args={"check_same_thread": False},
+            )
+            for index in range(count)
+        ]
+        for index, engine in enumerate(self.engines):
+            instrument_engine(engine, f"shard{index}")
+            profiling.instrument_engine(engine, f"shard{index}")
+        self.sessionmakers = [
+            async_sessionmaker(
+                engine,
+                class_=AsyncSession,
+                expire_on_commit=False,
+                autoflush=False,
+            )
+            for engine in self.engines
+        ]
+        # One writer per shard: SQLite allows a single writer per file, so
+        # serialising in-process avoids busy-waiting on the file lock.
+        self._write_locks = [asyncio.Lock() for _ in range(count)]
+
+    def index_for(self, device_id: str) -> int:
+        """Return the shard index a device's readings are stored in."""
+        return zlib.crc32(device_id.encode("utf-8")) % self.count
+
+    @asynccontextmanager
+    async def writer(self, index: int) -> AsyncGenerator[AsyncSession, None]:
+        """
+        Open a write session on a shard.
+
+        Holds the shard's writer lock and commits on successful exit.
+        """
+        async with self._write_locks[index]:
+            async with self.sessionmakers[index]() as session:
+                try:
+                    yield session
+                    await session.commit()
+                except Exception:
+                    await session.rollback()
+                    raise
+
+    async def gather(
+        self,
+        fn: Callable[[AsyncSession], Awaitable[T]],
+        indexes: Iterable[int] | None = None,
+    ) -> list[T]:
+        """
+        Run a read function against several shards concurrently.
+
+        Args:
+            fn: Coroutine function receiving a shard session
+            indexes: Shards to query (default: all shards)
+
+        Returns:
+            Results in shard order
+        """
+
+        async def run(index: int) -> T:
+            async with self.sessionmakers[index]() as session:
+                return await fn(session)
+
+        targets = range(self.count) if indexes is None else indexes
+        return list(await asyncio.gather(*(run(index) for index in targets)))
+
+    async def write_each(self, fn: Callable[[AsyncSession], Awaitable[T]]) -> list[T]:
+        """
+        Run a write function against every shard in turn.
+
+        Each call runs in the shard's writer session and commits on success.
+
+        Returns:
+            Results in shard order
+        """
+        results = []
+        for index in range(self.count):
+            async with self.writer(index) as session:
+                results.append(await fn(session))
+        return results
+
+    async def init(self) -> None:
+        """Create the sharded tables in every shard and enable WAL mode."""
+        tables = [Base.metadata.tables[name] for name in SHARDED_TABLES]
+        for engine in self.engines:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all, tables=tables)
+                await conn.run_sync(sync_columns, tables)
+                await conn.run_sync(sync_indexes, tables)
+                await conn.execute(text("PRAGMA journal_mode=WAL"))
+
+    async def dispose(self) -> None:
+        """Close all shard connection pools."""
+        for engine in self.engines:
+            await engine.dispose()
+
+
+# Global shard set, None when sharding is disabled
+shards: ShardSet | None = (
+    ShardSet(settings.database_url, settings.sqlite_shard_count)
+    if settings.sqlite_shard_count > 1
+    else None
+)
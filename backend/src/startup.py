@@ -0,0 +1,104 @@
+"""Startup progress and readiness.
+
+The application lifespan runs each startup step (schema setup, summary
+rebuilds, warm-up, background services) as a named phase. The phase timings
+are logged, exported as metrics and reported by ``/api/v1/health/ready``,
+which only succeeds once every phase has finished and until shutdown begins,
+so load balancers do not route traffic to a cold or draining instance.
+"""
+
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from .metrics import CallbackMetric, registry
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTracker:
+    """Timings of the startup phases and the resulting readiness state."""
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """Start tracking a new startup (the lifespan may run more than once, e.g. in tests)."""
+        self.started = time.perf_counter()
+        # (phase, seconds) of finished phases, in order
+        self.phases: list[tuple[str, float]] = []
+        self.current: str | None = None
+        self.failed: str | None = None
+        self.ready = False
+        self.draining = False
+        self.total_seconds: float | None = None
+
+    @asynccontextmanager
+    async def phase(self, name: str) -> AsyncIterator[None]:
+        """
+        Time one startup step.
+
+        Args:
+            name: Phase name reported in timings and metrics
+        """
+        self.current = name
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.failed = name
+            raise
+        finally:
+            self.current = None
+        elapsed = time.perf_counter() - started
+        self.phases.append((name, elapsed))
+        logger.debug(f"Startup phase {name} took {elapsed * 1000:.0f} ms")
+
+    def mark_ready(self) -> None:
+        """Record that startup finished and the instance can take traffic."""
+        self.total_seconds = time.perf_counter() - self.started
+        self.ready = True
+        timings = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.phases)
+        logger.info(f"Startup complete in {self.total_seconds:.2f} s ({timings})")
+
+    def mark_draining(self) -> None:
+        """Record that shutdown began; readiness fails from now on."""
+        self.draining = True
+        self.ready = False
+
+    def status(self) -> dict[str, Any]:
+        """Return readiness and the phase timings in milliseconds."""
+        return {
+            "ready": self.ready,
+            "draining": self.draining,
+            "current_phase": self.current,
+            "failed_phase": self.failed,
+            "total_ms": round(self.total_seconds * 1000, 1)
+            if self.total_seconds is not None
+            else None,
+            "phases": [
+                {"phase": name, "ms": round(seconds * 1000, 1)} for name, seconds in self.phases
+            ],
+        }
+
+
+# Global tracker
+startup = StartupTracker()
+
+registry.register(
+    CallbackMetric(
+        "startup_phase_seconds",
+        "Duration of each startup phase of this process",
+        lambda: {(name,): seconds for name, seconds in startup.phases},
+        ("phase",),
+    )
+)
+registry.register(
+    CallbackMetric(
+        "app_ready",
+        "Whether this process finished starting up and is not shutting down",
+        lambda: {(): float(startup.ready)},
+    )
+)
@@ -0,0 +1,17 @@
+"""Timestamp normalization.
+
+Readings and results are stored as naive UTC datetimes, while API query
+parameters and the scheduler may pass timezone-aware ones. Anything compared
+or subtracted in Python against stored timestamps is normalized first, and
+every ingest path (HTTP JSON, CSV upload, line protocol) stores an aware
+reading timestamp converted to UTC rather than its wall-clock time.
+"""
+
+from datetime import datetime, timezone
+
+
+def naive_utc(value: datetime) -> datetime:
+    """Convert an aware datetime to naive UTC; naive datetimes are taken as UTC already."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
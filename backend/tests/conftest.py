@@ -1,5 +1,8 @@
 """Pytest configuration and fixtures."""
 
+from datetime import datetime
+from typing import Any
+
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
@@ -25,3 +28,25 @@ async def db_session(db_engine) -> AsyncSession:
     )
     async with async_session() as session:
         yield session
+
+
+def make_row(
+    device_id: str = "d1",
+    timestamp: datetime | None = None,
+    temperature_c: float | None = 20.0,
+    humidity: float | None = 40.0,
+    pressure_hpa: float | None = 1000.0,
+    metadata: dict[str, Any] | None = None,
+    sensor_type: str = "bme280",
+) -> dict[str, Any]:
+    """Build a sensor reading row as ``insert_readings`` and the hot tier take it."""
+    return {
+        "sensor_type": sensor_type,
+        "device_id": device_id,
+        "timestamp": timestamp or datetime(2024, 1, 1),
+        "temperature_c": temperature_c,
+        "humidity": humidity,
+        "pressure_hpa": pressure_hpa,
+        "extra_metadata": metadata,
+        "created_at": datetime.utcnow(),
+    }
@@ -0,0 +1,80 @@
+"""Tests for ingest admission control."""
+
+import pytest
+
+from src.services.admission import AdmissionController, AdmissionRejected
+
+
+class _Clock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_token_bucket_throttles_flooding_device_only():
+    """Test a device over its rate is throttled while others are admitted."""
+    clock = _Clock()
+    controller = AdmissionController(rate=2, burst=5, max_in_flight=10, clock=clock)
+
+    for _ in range(5):
+        controller.check({"noisy": 1})
+    with pytest.raises(AdmissionRejected) as exc_info:
+        controller.check({"noisy": 1})
+    assert exc_info.value.reason == "throttled"
+    assert exc_info.value.retry_after == 1
+
+    controller.check({"quiet": 1})
+
+    clock.now += 1.0
+    controller.check({"noisy": 1})
+    controller.check({"noisy": 1})
+    assert controller.throttled == 1
+
+
+def test_large_batch_goes_into_debt():
+    """Test a batch larger than the burst is admitted once and then repaid."""
+    clock = _Clock()
+    controller = AdmissionController(rate=10, burst=50, max_in_flight=10, clock=clock)
+
+    controller.check({"dev": 80})
+    with pytest.raises(AdmissionRejected) as exc_info:
+        controller.check({"dev": 1})
+    assert exc_info.value.retry_after == 4
+
+    clock.now += 4
+    controller.check({"dev": 1})
+
+
+def test_batch_debt_is_capped_at_the_burst():
+    """Test a backfill far beyond the burst locks its device out for only burst / rate."""
+    clock = _Clock()
+    controller = AdmissionController(rate=5, burst=100, max_in_flight=10, clock=clock)
+
+    controller.check({"dev": 10_000})
+    with pytest.raises(AdmissionRejected) as exc_info:
+        controller.check({"dev": 1})
+    assert exc_info.value.retry_after == 21
+
+    clock.now += 21
+    controller.check({"dev": 1})
+
+
+@pytest.mark.asyncio
+async def test_in_flight_limit_sheds_load():
+    """Test requests beyond the in-flight limit are shed."""
+    controller = AdmissionController(rate=100, burst=100, max_in_flight=1)
+
+    async with controller.admit({"a": 1}):
+        with pytest.raises(AdmissionRejected) as exc_info:
+            async with controller.admit({"b": 1}):
+                pass
+        assert exc_info.value.reason == "shed"
+
+    async with controller.admit({"b": 1}):
+        pass
+    assert controller.status()["shed"] == 1
+    assert controller.status()["admitted"] == 2
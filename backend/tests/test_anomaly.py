@@ -0,0 +1,147 @@
+"""Tests for the streaming anomaly engine."""
+
+import math
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from src.models import AnomalyEvent
+from src.services.anomaly import AnomalyEngine, anomaly_broker, anomaly_engine
+from src.services.data_ingestion import insert_readings
+
+from .conftest import make_row
+
+ORIGIN = datetime(2024, 1, 1)
+
+
+def _engine(**overrides) -> AnomalyEngine:
+    options = {
+        "alpha": 0.1,
+        "warmup": 20,
+        "z_threshold": 4.0,
+        "rate_limits": {"temperature_c": 2.0},
+        "flatline_readings": 30,
+    }
+    options.update(overrides)
+    return AnomalyEngine(**options)
+
+
+def _row(minute: int, temperature: float, device_id: str = "d1") -> dict:
+    # Temperature only, so humidity and pressure never warm up or flat-line
+    return make_row(
+        device_id,
+        ORIGIN + timedelta(minutes=minute),
+        temperature,
+        humidity=None,
+        pressure_hpa=None,
+    )
+
+
+def _noisy(minute: int) -> float:
+    return 20.0 + 0.5 * math.sin(minute)
+
+
+def test_spike_flagged_after_warmup():
+    """Test a large deviation is a spike once the slot has warmed up."""
+    engine = _engine(rate_limits={})
+    assert engine.score([_row(0, 20.0), _row(1, 40.0)]) == []
+
+    normal = engine.score([_row(minute, _noisy(minute)) for minute in range(2, 60)])
+    assert normal == []
+
+    events = engine.score([_row(60, 35.0)])
+    assert [(e["kind"], e["measurement"], e["value"]) for e in events] == [
+        ("spike", "temperature_c", 35.0)
+    ]
+    assert events[0]["score"] > 4.0
+
+
+def test_rate_of_change_uses_elapsed_time():
+    """Test the rate limit is per minute of elapsed time, not per reading."""
+    engine = _engine()
+    assert engine.score([_row(0, 20.0), _row(10, 30.0)]) == []
+
+    events = engine.score([_row(11, 33.0)])
+    assert [e["kind"] for e in events] == ["rate_of_change"]
+    assert events[0]["score"] == 3.0
+
+
+def test_flat_line_reported_once_per_run():
+    """Test a stuck value is flagged once when the run reaches the threshold."""
+    engine = _engine(flatline_readings=5)
+    events = engine.score([_row(minute, 21.0) for minute in range(12)])
+    assert [(e["kind"], e["timestamp"], e["score"]) for e in events] == [
+        ("flat_line", ORIGIN + timedelta(minutes=4), 5.0)
+    ]
+
+    # A change ends the run; a new run is reported again
+    events = engine.score([_row(12 + minute, 21.5) for minute in range(5)])
+    assert [e["kind"] for e in events] == ["flat_line"]
+
+
+def test_late_readings_are_not_scored():
+    """Test readings older than a slot's latest one leave the state untouched."""
+    engine = _engine()
+    engine.score([_row(10, 20.0)])
+    assert engine.score([_row(5, 90.0), _row(10, 90.0)]) == []
+
+    slot = engine.slots[("bme280", "d1", "temperature_c")]
+    assert slot.count == 1
+    assert slot.last_value == 20.0
+
+
+async def test_ingest_persists_and_publishes_on_commit(db_session):
+    """Test flagged readings are stored with the batch and streamed after commit."""
+    anomaly_engine.clear()
+    queue = anomaly_broker.subscribe()
+    try:
+        rows = [_row(minute, 20.0 + minute * 0.01, "anomaly-1") for minute in range(5)]
+        rows.append(_row(5, 30.0, "anomaly-1"))
+        await insert_readings(db_session, rows)
+        assert queue.empty()
+
+        await db_session.commit()
+        item = queue.get_nowait()
+        assert (item["device_id"], item["kind"]) == ("anomaly-1", "rate_of_change")
+
+        result = await db_session.execute(select(AnomalyEvent))
+        stored = result.scalars().all()
+        assert [(e.device_id, e.kind, e.value) for e in stored] == [
+            ("anomaly-1", "rate_of_change", 30.0)
+        ]
+    finally:
+        anomaly_broker.unsubscribe(queue)
+        anomaly_engine.clear()
+
+
+async def test_rolled_back_events_are_not_published(db_session):
+    """Test events of a rolled-back batch never reach subscribers."""
+    anomaly_engine.clear()
+    queue = anomaly_broker.subscribe()
+    try:
+        await insert_readings(db_session, [_row(0, 20.0, "anomaly-2"), _row(1, 40.0, "anomaly-2")])
+        await db_session.rollback()
+        await db_session.commit()
+        assert queue.empty()
+    finally:
+        anomaly_broker.unsubscribe(queue)
+        anomaly_engine.clear()
+
+
+async def test_retried_batch_is_scored_after_rollback(db_session):
+    """Test a rolled-back batch leaves the slots untouched, so its retry is scored."""
+    anomaly_engine.clear()
+    rows = [_row(minute, 20.0 + minute * 0.01, "anomaly-3") for minute in range(5)]
+    rows.append(_row(5, 30.0, "anomaly-3"))
+    try:
+        await insert_readings(db_session, rows)
+        await db_session.rollback()
+        assert anomaly_engine.slots == {}
+
+        await insert_readings(db_session, rows)
+        await db_session.commit()
+        result = await db_session.execute(select(AnomalyEvent.kind))
+        assert result.scalars().all() == ["rate_of_change"]
+        assert anomaly_engine.slots[("bme280", "anomaly-3", "temperature_c")].count == 6
+    finally:
+        anomaly_engine.clear()
@@ -0,0 +1,40 @@
+"""Tests for the benchmark report comparison."""
+
+from benchmarks.report import Result, build_report, compare_reports, percentile
+
+
+def _report(*results: Result) -> dict:
+    return build_report(list(results), {"size": "10k"})
+
+
+def test_percentile_nearest_rank():
+    """Test percentiles pick a measured value by nearest rank."""
+    values = [float(v) for v in range(100, 0, -1)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([3.0], 99) == 3.0
+
+
+def test_compare_flags_worse_results_by_direction():
+    """Test slower latencies and lower throughput count as regressions."""
+    baseline = _report(
+        Result("query.raw", "p99_ms", 10.0, "ms", "lower"),
+        Result("ingest.batch", "readings_per_second", 1000.0, "1/s", "higher"),
+        Result("processing", "seconds", 2.0, "s", "lower"),
+        Result("removed", "seconds", 1.0, "s", "lower"),
+    )
+    current = _report(
+        Result("query.raw", "p99_ms", 12.0, "ms", "lower"),
+        Result("ingest.batch", "readings_per_second", 800.0, "1/s", "higher"),
+        Result("processing", "seconds", 1.0, "s", "lower"),
+        Result("new", "seconds", 1.0, "s", "lower"),
+    )
+
+    changes, missing = compare_reports(baseline, current)
+
+    by_key = {change.key: change for change in changes}
+    assert by_key["query.raw:p99_ms"].regression == 0.2
+    assert by_key["ingest.batch:readings_per_second"].regression == 0.2
+    assert by_key["processing:seconds"].regression == -0.5
+    assert changes[-1].key == "processing:seconds"
+    assert missing == ["removed:seconds"]
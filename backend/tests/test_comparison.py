@@ -0,0 +1,97 @@
+"""Tests for the multi-device comparison query."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.services import comparison
+from src.services.data_ingestion import insert_readings
+from src.services.hot_tier import HotTier
+
+from .conftest import make_row
+
+
+def _rows(now: datetime) -> list[dict]:
+    # d1 reports every 20s for a minute (fractional seconds on the bucket edge),
+    # d2 only in the first bucket and without humidity
+    rows = [
+        make_row(
+            "d1",
+            now + timedelta(seconds=20 * i, microseconds=999_999 * (i == 2)),
+            20.0 + i,
+        )
+        for i in range(3)
+    ]
+    rows.append(make_row("d2", now + timedelta(seconds=5), 10.0, humidity=None, pressure_hpa=990.0))
+    return rows
+
+
+async def test_compare_aligns_devices_from_db_and_hot_tier(db_session, monkeypatch):
+    """Test both read paths return the same grid with gaps as nulls."""
+    now = datetime.utcnow().replace(microsecond=0) - timedelta(minutes=10)
+    rows = _rows(now)
+    await insert_readings(db_session, rows)
+    await db_session.commit()
+
+    kwargs = {
+        "device_ids": ["d1", "d2", "d3"],
+        "start_time": now,
+        "end_time": now + timedelta(seconds=89),
+        "bucket_seconds": 30,
+    }
+    monkeypatch.setattr(comparison, "hot_tier", HotTier(timedelta(hours=1), 100, enabled=False))
+    from_db = await comparison.compare_devices(db_session, **kwargs)
+
+    tier = HotTier(timedelta(hours=1), 100)
+    tier.ready = True
+    tier.add_rows(rows)
+    monkeypatch.setattr(comparison, "hot_tier", tier)
+    from_memory = await comparison.compare_devices(db_session, **kwargs)
+
+    assert from_db == from_memory
+    assert from_db["timestamps"] == [now + timedelta(seconds=30 * i) for i in range(3)]
+    d1, d2, d3 = from_db["series"]
+    assert d1["count"] == [2, 1, 0]
+    assert d1["temperature_c"] == [20.5, 22.0, None]
+    assert d2["humidity"] == [None, None, None]
+    assert d2["pressure_hpa"] == [990.0, None, None]
+    assert d3["count"] == [0, 0, 0]
+
+
+async def test_compare_converts_aware_bounds(db_session, monkeypatch):
+    """Test aware bounds give the grid of the equivalent naive UTC bounds on both paths."""
+    now = datetime.utcnow().replace(microsecond=0) - timedelta(minutes=10)
+    rows = _rows(now)
+    await insert_readings(db_session, rows)
+    await db_session.commit()
+
+    offset = timezone(timedelta(hours=2))
+    start = now.replace(tzinfo=timezone.utc).astimezone(offset)
+    kwargs = {"device_ids": ["d1", "d2"], "bucket_seconds": 30}
+    monkeypatch.setattr(comparison, "hot_tier", HotTier(timedelta(hours=1), 100, enabled=False))
+    expected = await comparison.compare_devices(
+        db_session, start_time=now, end_time=now + timedelta(seconds=89), **kwargs
+    )
+    from_db = await comparison.compare_devices(
+        db_session, start_time=start, end_time=start + timedelta(seconds=89), **kwargs
+    )
+
+    tier = HotTier(timedelta(hours=1), 100)
+    tier.ready = True
+    tier.add_rows(rows)
+    monkeypatch.setattr(comparison, "hot_tier", tier)
+    from_memory = await comparison.compare_devices(
+        db_session, start_time=start, end_time=start + timedelta(seconds=89), **kwargs
+    )
+
+    assert from_db == from_memory == expected
+    assert expected["series"][0]["count"] == [2, 1, 0]
+
+
+async def test_compare_rejects_oversized_grid(db_session):
+    """Test ranges needing too many buckets are refused."""
+    start = datetime(2024, 1, 1)
+    with pytest.raises(ValueError, match="buckets"):
+        await comparison.compare_devices(
+            db_session, ["d1"], start, start + timedelta(days=365), bucket_seconds=60
+        )
@@ -0,0 +1,83 @@
+"""Tests for columnar responses and HTTP compression."""
+
+import gzip
+
+import orjson
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from src.compression import GzipRoute, negotiate_encoding
+from src.config import settings
+from src.serialization import json_response, to_columnar
+
+
+def test_to_columnar_hoists_constant_fields():
+    """Test only constant hoistable fields move to constants."""
+    rows = [
+        {"device_id": "d1", "sensor_type": "bme280", "timestamp": "t1", "humidity": 40.0},
+        {"device_id": "d1", "sensor_type": "bme280", "timestamp": "t2", "humidity": 40.0},
+        {"device_id": "d2", "sensor_type": "bme280", "timestamp": "t3", "humidity": 41.0},
+    ]
+
+    payload = to_columnar(rows, hoist=("device_id", "sensor_type"))
+
+    assert payload["count"] == 3
+    assert payload["constants"] == {"sensor_type": "bme280"}
+    assert payload["data"] == {
+        "device_id": ["d1", "d1", "d2"],
+        "timestamp": ["t1", "t2", "t3"],
+        "humidity": [40.0, 40.0, 41.0],
+    }
+    assert to_columnar([])["data"] == {}
+
+
+def test_negotiate_encoding_respects_quality():
+    """Test gzip is chosen when accepted and refused when q=0."""
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0, identity") is None
+    assert negotiate_encoding("") is None
+
+
+def test_json_response_compresses_large_bodies(monkeypatch):
+    """Test large bodies are gzip encoded for clients that accept it."""
+    monkeypatch.setattr(settings, "response_compression_min_bytes", 100)
+    content = {"data": [{"humidity": 40.0}] * 200}
+
+    class _Request:
+        headers = {"accept-encoding": "gzip"}
+
+    response = json_response(content, _Request())
+    assert response.headers["content-encoding"] == "gzip"
+    assert orjson.loads(gzip.decompress(response.body)) == content
+
+    small = json_response({"count": 0}, _Request())
+    assert "content-encoding" not in small.headers
+
+
+def test_gzip_route_accepts_compressed_json():
+    """Test a gzip request body is decompressed before validation."""
+    router = APIRouter(route_class=GzipRoute)
+
+    @router.post("/echo")
+    async def echo(payload: dict) -> dict:
+        return payload
+
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+
+    body = gzip.compress(orjson.dumps({"device_id": "d1"}))
+    response = client.post(
+        "/echo",
+        content=body,
+        headers={"Content-Encoding": "gzip", "Content-Type": "application/json"},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"device_id": "d1"}
+
+    response = client.post(
+        "/echo",
+        content=b"not gzip",
+        headers={"Content-Encoding": "gzip", "Content-Type": "application/json"},
+    )
+    assert response.status_code == 400
@@ -0,0 +1,93 @@
+"""Tests for streaming CSV measurement upload."""
+
+import io
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from src.models import SensorReading
+from src.schemas.sensor import BME280Reading
+from src.services.csv_upload import CSVFormatError, import_csv
+from src.services.data_ingestion import create_sensor_readings
+
+
+class _Upload:
+    """In-memory stand-in for UploadFile."""
+
+    def __init__(self, data: bytes) -> None:
+        self._buffer = io.BytesIO(data)
+
+    async def read(self, size: int = -1) -> bytes:
+        return self._buffer.read(size)
+
+
+@pytest.mark.asyncio
+async def test_import_csv_streams_chunks_and_reports_errors(db_session, monkeypatch):
+    """Test rows spanning many chunks are imported and bad rows reported by line."""
+    monkeypatch.setattr("src.services.csv_upload.settings.csv_upload_chunk_bytes", 256)
+    lines = ["Device_ID,Timestamp,Temperature_C,Humidity,Pressure_hPa,well"]
+    lines += [f"d{i % 3},2025-01-01T00:00:{i % 60:02d}Z,21.5,40,1000,INJ-1" for i in range(200)]
+    lines += ["d1,2025-01-01T01:00:00,21.5,140,1000,", "", "d1,1735693200,21.5,40,1000,"]
+    upload = _Upload("\r\n".join(lines).encode())
+
+    status = await import_csv(db_session, upload, filename="export.csv")
+
+    assert status.status == "completed"
+    assert status.rows_inserted == 201
+    assert status.rows_rejected == 1
+    assert status.errors[0].row == 202
+    assert "humidity" in status.errors[0].error
+
+    count = await db_session.scalar(select(func.count()).select_from(SensorReading))
+    assert count == 201
+    latest = await db_session.scalar(
+        select(SensorReading).order_by(SensorReading.timestamp.desc()).limit(1)
+    )
+    assert latest.timestamp == datetime(2025, 1, 1, 1, 0, 0)
+    assert latest.extra_metadata is None
+
+
+async def test_import_csv_rejects_out_of_range_epoch_per_row(db_session):
+    """Test an epoch beyond the platform's range is a row error, not a failed upload."""
+    upload = _Upload(
+        b"device_id,timestamp,temperature_c,humidity,pressure_hpa\n"
+        b"d1,100000000000000000000,21.5,40,1000\n"
+        b"d1,1735693200,21.5,40,1000\n"
+    )
+
+    status = await import_csv(db_session, upload)
+
+    assert status.status == "completed"
+    assert status.rows_inserted == 1
+    assert [error.row for error in status.errors] == [2]
+
+
+async def test_aware_timestamps_are_stored_as_utc_on_every_path(db_session):
+    """Test CSV and HTTP ingest store the same instant for an offset timestamp."""
+    upload = _Upload(
+        b"device_id,timestamp,temperature_c,humidity,pressure_hpa\n"
+        b"csv,2025-01-01T02:00:00+02:00,21.5,40,1000\n"
+    )
+    await import_csv(db_session, upload)
+    reading = BME280Reading.model_validate(
+        {
+            "device_id": "http",
+            "timestamp": "2025-01-01T02:00:00+02:00",
+            "temperature_c": 21.5,
+            "humidity": 40,
+            "pressure_hpa": 1000,
+        }
+    )
+    await create_sensor_readings(db_session, [reading])
+    await db_session.commit()
+
+    stored = (await db_session.execute(select(SensorReading.timestamp))).scalars().all()
+    assert stored == [datetime(2025, 1, 1), datetime(2025, 1, 1)]
+
+
+@pytest.mark.asyncio
+async def test_import_csv_rejects_missing_columns(db_session):
+    """Test a header without required columns fails the whole upload."""
+    with pytest.raises(CSVFormatError):
+        await import_csv(db_session, _Upload(b"device_id,temperature_c\nd1,20\n"))
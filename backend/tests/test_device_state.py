@@ -0,0 +1,62 @@
+"""Tests for the maintained device state."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.models import DeviceState
+from src.services import device_state
+from src.services.data_ingestion import insert_readings
+
+from .conftest import make_row
+
+
+async def test_state_tracks_latest_reading_and_cadence(db_session):
+    """Test batches update count, latest values and smoothed interval."""
+    start = datetime(2024, 1, 1)
+    await insert_readings(
+        db_session, [make_row("d1", start + timedelta(seconds=60 * i), 20.0 + i) for i in range(3)]
+    )
+    # A late reading counts but does not move the latest value or cadence
+    await insert_readings(
+        db_session,
+        [make_row("d1", start + timedelta(seconds=30), 99.0), make_row("d2", start, 10.0)],
+    )
+    await db_session.commit()
+
+    states = {s.device_id: s for s in await device_state.list_device_states(db_session)}
+
+    d1 = states["d1"]
+    assert d1.reading_count == 4
+    assert d1.last_timestamp == start + timedelta(seconds=120)
+    assert d1.last_temperature_c == 22.0
+    assert d1.first_timestamp == start
+    assert d1.interval_seconds == pytest.approx(60.0)
+    assert states["d2"].interval_seconds is None
+
+
+async def test_cadence_resumes_from_stored_state(db_session):
+    """Test each batch smooths its gaps onto the interval stored by earlier batches."""
+    start = datetime(2024, 1, 1)
+    await insert_readings(
+        db_session, [make_row("d1", start), make_row("d1", start + timedelta(seconds=60))]
+    )
+    await db_session.commit()
+    # Another writer's batch: a 120 s gap to the stored reading, then a 60 s one
+    await insert_readings(
+        db_session, [make_row("d1", start + timedelta(seconds=s)) for s in (180, 240)]
+    )
+    await db_session.commit()
+
+    (state,) = await device_state.list_device_states(db_session)
+    assert state.interval_seconds == pytest.approx(72.0 + 0.2 * (60.0 - 72.0))
+    assert state.reading_count == 4
+
+
+def test_device_health_counts_missed_heartbeats():
+    """Test devices go offline after the configured number of missed intervals."""
+    last = datetime(2024, 1, 1, 12, 0, 0)
+    state = DeviceState(last_timestamp=last, interval_seconds=60.0)
+
+    assert device_state.device_health(state, last + timedelta(seconds=90)) == ("online", 1)
+    assert device_state.device_health(state, last + timedelta(minutes=3)) == ("offline", 3)
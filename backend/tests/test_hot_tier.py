@@ -0,0 +1,113 @@
+"""Tests for the in-memory hot tier."""
+
+from datetime import datetime, timedelta, timezone
+
+from src.schemas.sensor import BME280Reading
+from src.services import data_ingestion
+from src.services.hot_tier import HotTier, SeriesBuffer, to_micros
+
+from .conftest import make_row
+
+
+def test_series_buffer_orders_late_readings_and_caps():
+    """Test late readings are inserted in order and the cap records eviction."""
+    buffer = SeriesBuffer()
+    for timestamp in (10, 30, 20, 40):
+        buffer.append(timestamp, (float(timestamp), None, None))
+
+    assert list(buffer.timestamps) == [10, 20, 30, 40]
+
+    buffer.cap(2)
+    assert len(buffer) == 2
+    assert buffer.evicted_through == 20
+    assert [buffer.timestamps[i] for i in buffer.slice(0, 100)] == [30, 40]
+
+
+def test_fetch_serves_covered_ranges_only():
+    """Test reads inside the retention window hit memory and older ones miss."""
+    tier = HotTier(retention=timedelta(hours=1), max_points_per_device=100)
+    tier.ready = True
+    now = datetime.utcnow().replace(microsecond=0)
+    tier.add_rows(
+        [
+            make_row("d2", now - timedelta(minutes=5), 21.0),
+            make_row("d1", now - timedelta(minutes=10), 20.0, pressure_hpa=None),
+            make_row("d1", now - timedelta(hours=2), 19.0),  # beyond retention, skipped
+        ]
+    )
+
+    readings = tier.fetch("bme280", now - timedelta(minutes=30), now)
+    assert [(r["device_id"], r["temperature_c"]) for r in readings] == [("d1", 20.0), ("d2", 21.0)]
+    assert readings[0]["timestamp"] == now - timedelta(minutes=10)
+    assert readings[0]["pressure_hpa"] is None
+
+    assert tier.fetch("bme280", now - timedelta(hours=3), now) is None
+    assert tier.fetch("bme280", now - timedelta(minutes=30), now, device_id="d3") == []
+
+
+async def test_committed_writes_reach_the_hot_tier(db_session, monkeypatch):
+    """Test rows enter the tier on commit and match the database read."""
+    tier = HotTier(retention=timedelta(hours=1), max_points_per_device=100)
+    tier.ready = True
+    monkeypatch.setattr(data_ingestion, "hot_tier", tier)
+    monkeypatch.setattr("src.services.hot_tier.hot_tier", tier)
+
+    now = datetime.utcnow().replace(microsecond=0)
+    readings = [
+        BME280Reading(
+            device_id="dev_1",
+            timestamp=now - timedelta(minutes=i),
+            temperature_c=20.0 + i,
+            humidity=40.0,
+            pressure_hpa=1000.0,
+        )
+        for i in range(5)
+    ]
+    await data_ingestion.create_sensor_readings(db_session, readings)
+    await db_session.rollback()
+    assert not tier.series
+
+    await data_ingestion.create_sensor_readings(db_session, readings)
+    await db_session.commit()
+
+    start, end = now - timedelta(minutes=30), now
+    cached = await data_ingestion.fetch_readings(db_session, "bme280", start, end)
+    tier.enabled = False
+    from_db = await data_ingestion.fetch_readings(db_session, "bme280", start, end)
+
+    assert cached == from_db
+    assert len(cached) == 5
+    assert to_micros(cached[0]["timestamp"]) < to_micros(cached[-1]["timestamp"])
+
+
+async def test_aware_window_matches_the_database(db_session, monkeypatch):
+    """Test an aware window selects the same readings from the tier and the database."""
+    tier = HotTier(retention=timedelta(hours=6), max_points_per_device=100)
+    tier.ready = True
+    monkeypatch.setattr(data_ingestion, "hot_tier", tier)
+    monkeypatch.setattr("src.services.hot_tier.hot_tier", tier)
+
+    now = datetime.utcnow().replace(microsecond=0)
+    readings = [
+        BME280Reading(
+            device_id="dev_1",
+            timestamp=now - timedelta(minutes=10 * i),
+            temperature_c=20.0 + i,
+            humidity=40.0,
+            pressure_hpa=1000.0,
+        )
+        for i in range(24)
+    ]
+    await data_ingestion.create_sensor_readings(db_session, readings)
+    await db_session.commit()
+
+    # The last 90 minutes, expressed at UTC+02:00
+    offset = timezone(timedelta(hours=2))
+    start = (now - timedelta(minutes=90)).replace(tzinfo=timezone.utc).astimezone(offset)
+    end = now.replace(tzinfo=timezone.utc).astimezone(offset)
+    cached = await data_ingestion.fetch_readings(db_session, "bme280", start, end)
+    tier.enabled = False
+    from_db = await data_ingestion.fetch_readings(db_session, "bme280", start, end)
+
+    assert cached == from_db
+    assert len(cached) == 10
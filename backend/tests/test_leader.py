@@ -0,0 +1,77 @@
+"""Tests for database-backed scheduler leader election."""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.models import ProcessedData
+from src.services.leader import LeaderLease, LeaseLost
+
+
+@pytest.fixture
+def sessionmaker(db_engine):
+    return async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def test_single_leader_and_takeover_after_expiry(sessionmaker):
+    """Test only one process leads, and another takes over with a newer token."""
+    first = LeaderLease("scheduler", 0.3, sessionmaker)
+    second = LeaderLease("scheduler", 0.3, sessionmaker)
+
+    assert await first.heartbeat()
+    assert not await second.heartbeat()
+    assert first.is_leader and not second.is_leader
+
+    # Renewals keep the lease and its token
+    assert await first.heartbeat()
+    assert first.token == 1
+
+    # The leader stops renewing; once its lease expires the other process wins
+    await asyncio.sleep(0.35)
+    assert not first.is_leader
+    assert await second.heartbeat()
+    assert second.token == 2
+    assert not await first.heartbeat()
+
+
+async def test_fence_rejects_writes_of_a_deposed_leader(sessionmaker):
+    """Test a stalled leader's write is refused once the lease changed hands."""
+    stalled = LeaderLease("scheduler", 0.2, sessionmaker)
+    successor = LeaderLease("scheduler", 5.0, sessionmaker)
+    assert await stalled.heartbeat()
+    await asyncio.sleep(0.25)
+    assert await successor.heartbeat()
+
+    async with sessionmaker() as db:
+        db.add(
+            ProcessedData(
+                processor_name="rolling_average",
+                processor_version="1.0.0",
+                start_time=datetime(2024, 1, 1),
+                end_time=datetime(2024, 1, 1),
+                sensor_type="bme280",
+                result={},
+                raw_count=0,
+            )
+        )
+        with pytest.raises(LeaseLost):
+            await stalled.fence(db)
+        await db.rollback()
+
+    async with sessionmaker() as db:
+        await successor.fence(db)
+        await db.commit()
+
+
+async def test_release_allows_immediate_takeover(sessionmaker):
+    """Test a leader shutting down hands the lease over without waiting for expiry."""
+    leader = LeaderLease("scheduler", 60.0, sessionmaker)
+    standby = LeaderLease("scheduler", 60.0, sessionmaker)
+    assert await leader.heartbeat()
+
+    await leader.release()
+
+    assert not leader.is_leader
+    assert await standby.heartbeat()
@@ -0,0 +1,102 @@
+"""Tests for the line-protocol ingest listener."""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.models import SensorReading
+from src.services.line_protocol import LineProtocolError, LineProtocolListener, parse_line
+
+RECEIVED_AT = datetime(2025, 1, 1, 12, 0, 0)
+
+
+def test_parse_line_with_tags_and_timestamp():
+    """Test a full line is parsed into a reading row."""
+    row = parse_line(
+        "bme280,device=bme280_001,location=office t=23.4,h=45.6,p=1013.2 1731580200000000000",
+        RECEIVED_AT,
+    )
+
+    assert row["device_id"] == "bme280_001"
+    assert row["temperature_c"] == 23.4
+    assert row["humidity"] == 45.6
+    assert row["pressure_hpa"] == 1013.2
+    assert row["timestamp"] == datetime(2024, 11, 14, 10, 30, 0)
+    assert row["extra_metadata"] == {"location": "office"}
+
+
+def test_parse_line_defaults_timestamp_and_accepts_long_names():
+    """Test a line without timestamp uses the receive time."""
+    row = parse_line(
+        "bme280,device_id=d1 temperature_c=20,humidity=40i,pressure_hpa=1000", RECEIVED_AT
+    )
+
+    assert row["timestamp"] == RECEIVED_AT
+    assert row["humidity"] == 40.0
+    assert row["extra_metadata"] is None
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "bme280,device=d1 t=90,h=45,p=1013",  # temperature out of range
+        "bme280,device=d1 t=20,h=45",  # missing pressure
+        "bme280 t=20,h=45,p=1013",  # missing device tag
+        "dht22,device=d1 t=20,h=45,p=1013",  # unsupported measurement
+        "bme280,device=d1 t=abc,h=45,p=1013",  # not a number
+        "bme280,device=d1 t=nan,h=45,p=1013",  # NaN fails range check
+    ],
+)
+def test_parse_line_rejects_invalid(line):
+    """Test malformed and out-of-range lines are rejected."""
+    with pytest.raises(LineProtocolError):
+        parse_line(line, RECEIVED_AT)
+
+
+@pytest.mark.asyncio
+async def test_tcp_listener_writes_batches(db_engine):
+    """Test lines sent over TCP are written and errors are counted."""
+    session_factory = async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    listener = LineProtocolListener(session_factory, batch_size=100, flush_interval=0.01)
+    await listener.start("127.0.0.1", 0, None)
+    port = listener.tcp_server.sockets[0].getsockname()[1]
+
+    _, writer = await asyncio.open_connection("127.0.0.1", port)
+    lines = [f"bme280,device=d{i % 4} t=20,h=40,p=1000 {i}000000000" for i in range(250)]
+    writer.write(("\n".join(lines) + "\nbme280,device=d1 t=999,h=40,p=1000\n").encode())
+    await writer.drain()
+    writer.close()
+    await writer.wait_closed()
+    await asyncio.sleep(0.05)
+    await listener.stop()
+
+    async with session_factory() as db:
+        count = await db.scalar(select(func.count()).select_from(SensorReading))
+    assert count == 250
+    status = listener.status()
+    assert status["writer"]["rows_written"] == 250
+    assert status["recently_closed"][0]["errors"] == 1
+
+
+async def test_stop_closes_open_connections(db_engine):
+    """Test stop disconnects idle clients and still writes what they sent."""
+    session_factory = async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    listener = LineProtocolListener(session_factory, batch_size=100, flush_interval=0.01)
+    await listener.start("127.0.0.1", 0, None)
+    port = listener.tcp_server.sockets[0].getsockname()[1]
+
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(b"bme280,device=d1 t=20,h=40,p=1000 1000000000\n")
+    await writer.drain()
+    await asyncio.sleep(0.05)
+
+    await asyncio.wait_for(listener.stop(), timeout=5)
+
+    assert await asyncio.wait_for(reader.read(), timeout=5) == b""
+    writer.close()
+    async with session_factory() as db:
+        assert await db.scalar(select(func.count()).select_from(SensorReading)) == 1
+    assert listener.status()["connections"] == []
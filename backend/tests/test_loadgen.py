@@ -0,0 +1,60 @@
+"""Tests for the fleet load generator."""
+
+from datetime import datetime
+
+from benchmarks.fleet import HUMIDITY, PRESSURE, Fleet
+from benchmarks.loadgen import LoadShape, TargetError, run_step, saturation_rate
+
+
+class RecordingTarget:
+    """Target keeping every batch, failing those that contain a marked device."""
+
+    name = "recording"
+
+    def __init__(self, fail_device: str | None = None) -> None:
+        self.batches: list[list[dict]] = []
+        self.fail_device = fail_device
+
+    async def send(self, readings: list[dict]) -> None:
+        if any(reading["device_id"] == self.fail_device for reading in readings):
+            raise TargetError("rejected")
+        self.batches.append(readings)
+
+
+def test_fleet_is_deterministic_and_bounded():
+    """Test the same seed yields the same readings, within the producer's bounds."""
+    timestamp = datetime(2024, 6, 1, 14)
+    first = Fleet(20, seed=3).readings(500, timestamp)
+    second = Fleet(20, seed=3).readings(500, timestamp)
+
+    assert first == second
+    assert [r["device_id"] for r in first[:21]] == [
+        f"load-{i:05d}" for i in range(20)
+    ] + ["load-00000"]
+    assert all(HUMIDITY[0] - 1 <= r["humidity"] <= HUMIDITY[1] + 1 for r in first)
+    assert all(PRESSURE[0] - 1 <= r["pressure_hpa"] <= PRESSURE[1] + 1 for r in first)
+
+
+async def test_run_step_delivers_late_and_batched_readings():
+    """Test every generated reading is sent once, in batches, including held-back ones."""
+    target = RecordingTarget()
+    shape = LoadShape(duration=0.3, batch_size=10, late_percent=50, late_seconds=5)
+
+    stats = await run_step(Fleet(50), target, shape, rate=500)
+
+    sent = [reading for batch in target.batches for reading in batch]
+    assert stats.generated > 0
+    assert len(sent) == stats.generated == stats.stored
+    assert all(len(batch) <= 10 for batch in target.batches)
+    assert stats.error_rate == 0
+    assert len(stats.latencies) == stats.requests
+
+
+async def test_failures_count_towards_saturation():
+    """Test failed sends are reported by kind and mark the step saturated."""
+    target = RecordingTarget(fail_device="load-00000")
+    stats = await run_step(Fleet(2), target, LoadShape(duration=0.2), rate=100)
+
+    assert stats.errors["rejected"] == stats.failed_requests > 0
+    assert stats.saturated
+    assert saturation_rate([stats]) is None
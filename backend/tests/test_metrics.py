@@ -0,0 +1,57 @@
+"""Tests for the metrics registry."""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from src.metrics import (
+    DB_POOL_CHECKOUTS,
+    DB_POOL_CONNECT_DURATION,
+    Counter,
+    Histogram,
+    Registry,
+    instrument_engine,
+)
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test histogram buckets are cumulative and include +Inf, sum and count."""
+    registry = Registry()
+    histogram = registry.register(
+        Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    )
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value, ("/a",))
+
+    lines = registry.render().splitlines()
+
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1.0"} 3' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{route="/a"} 4' in lines
+    assert any(line.startswith('latency_seconds_sum{route="/a"} 4.25') for line in lines)
+
+
+def test_counter_escapes_label_values():
+    """Test label values are escaped in the text format."""
+    registry = Registry()
+    counter = registry.register(Counter("events_total", "Events", ("source",)))
+    counter.inc(2, ('say "hi"',))
+
+    assert 'events_total{source="say \\"hi\\""} 2' in registry.render().splitlines()
+
+
+async def test_failed_statement_leaves_no_start_time(db_engine):
+    """Test a failing statement does not leave its start time on the connection."""
+    instrument_engine(db_engine, "test")
+    # Close the fixture's connection so the next checkout opens a new one
+    await db_engine.dispose()
+    async with db_engine.connect() as conn:
+        with pytest.raises(DBAPIError):
+            await conn.execute(text("SELECT * FROM missing_table"))
+        await conn.execute(text("SELECT 1"))
+        info = conn.sync_connection.info
+
+    assert info["metrics_query_start"] == []
+    assert DB_POOL_CHECKOUTS.values[("test",)] >= 1
+    assert ("test",) in DB_POOL_CONNECT_DURATION.series
@@ -0,0 +1,75 @@
+"""Tests for t-digest percentiles."""
+
+import bisect
+import math
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.processors.tdigest import TDigest
+from src.services.data_ingestion import insert_readings
+from src.services.data_processing import merge_percentiles, process_sensor_data
+
+from .conftest import make_row
+
+
+def test_merged_digests_stay_within_error_bound():
+    """Test quantiles of merged, serialized digests respect the documented bound."""
+    rng = random.Random(3)
+    values = [rng.lognormvariate(0, 1.5) for _ in range(50_000)]
+
+    merged = TDigest()
+    for offset in range(0, len(values), 5_000):
+        part = TDigest()
+        part.update(values[offset : offset + 5_000])
+        merged.merge(TDigest.from_dict(part.to_dict()))
+
+    ordered = sorted(values)
+    assert merged.count == len(values)
+    assert merged.quantile(0) == ordered[0]
+    assert merged.quantile(1) == ordered[-1]
+    for q in (0.01, 0.05, 0.5, 0.95, 0.99):
+        rank = bisect.bisect_left(ordered, merged.quantile(q)) / len(ordered)
+        bound = math.pi / merged.compression * math.sqrt(q * (1 - q))
+        assert abs(rank - q) <= bound
+
+
+async def test_merge_percentiles_uses_stored_windows(db_session):
+    """Test stored windows are merged and only the uncovered gap is scanned."""
+    start = datetime(2024, 1, 1)
+    rows = [
+        make_row("d1", start + timedelta(minutes=i), float(i % 100), humidity=None)
+        for i in range(180)
+    ]
+    await insert_readings(db_session, rows)
+    for hour in range(2):
+        window_start = start + timedelta(hours=hour)
+        await process_sensor_data(
+            db_session,
+            "percentile",
+            window_start,
+            window_start + timedelta(minutes=59),
+            device_id="d1",
+        )
+    await db_session.commit()
+
+    result = await merge_percentiles(
+        db_session, start, start + timedelta(hours=3), device_id="d1", quantiles=(0.5,)
+    )
+
+    assert result["windows_merged"] == 2
+    assert result["raw_count"] == 60
+    assert result["temperature_c"]["count"] == 180
+    assert result["temperature_c"]["p50"] == pytest.approx(44.5, abs=1)
+    assert result["humidity"] == {"count": 0, "min": None, "max": None, "p50": None}
+
+    # Aware bounds (``...Z`` query parameters) give the same result
+    aware = await merge_percentiles(
+        db_session,
+        start.replace(tzinfo=timezone.utc),
+        (start + timedelta(hours=3)).replace(tzinfo=timezone.utc),
+        device_id="d1",
+        quantiles=(0.5,),
+    )
+    assert aware == result
@@ -0,0 +1,142 @@
+"""Tests for processing pipelines."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+from src.models import ProcessedData
+from src.processors import DownsampleProcessor
+from src.schemas.processing import PipelineStep
+from src.services import data_processing
+from src.services.data_ingestion import insert_readings
+from src.services.data_processing import run_pipeline
+
+from .conftest import make_row
+
+START = datetime(2024, 1, 1)
+
+
+async def _seed(db_session) -> None:
+    """Two devices, one reading per minute for an hour; d2 runs 10 degrees warmer."""
+    rows = [
+        make_row(
+            device,
+            START + timedelta(minutes=i),
+            20.0 + i % 10 + (10.0 if device == "d2" else 0.0),
+            humidity=50.0,
+        )
+        for device in ("d1", "d2")
+        for i in range(60)
+    ]
+    await insert_readings(db_session, rows)
+
+
+async def test_downsample_averages_buckets_per_device():
+    """Test readings are averaged per device into start-aligned buckets."""
+    processor = DownsampleProcessor(bucket_seconds=600)
+    readings = [
+        make_row("d1", START + timedelta(minutes=i), float(i), humidity=None) for i in range(15)
+    ]
+
+    derived = await processor.transform(readings, START, START + timedelta(hours=1), "bme280")
+
+    assert [row["timestamp"] for row in derived] == [START, START + timedelta(minutes=10)]
+    assert [row["count"] for row in derived] == [10, 5]
+    assert derived[0]["temperature_c"] == 4.5
+    assert derived[1]["temperature_c"] == 12.0
+    assert derived[0]["humidity"] is None
+
+
+async def test_downsample_accepts_aware_start(db_session):
+    """Test an aware start (an API ``...Z`` time or the scheduler's now) buckets as naive UTC."""
+    await _seed(db_session)
+    aware_start = START.replace(tzinfo=timezone.utc)
+    steps = [PipelineStep(id="10min", processor="downsample", params={"bucket_seconds": 600})]
+
+    _, [(_, processed)] = await run_pipeline(
+        db_session, steps, aware_start, aware_start + timedelta(minutes=59)
+    )
+
+    assert processed.result["buckets"] == 12
+
+
+async def test_pipeline_shares_one_scan_and_chains_steps(db_session, monkeypatch):
+    """Test all steps run over a single scan and chained steps read derived readings."""
+    await _seed(db_session)
+    scans = []
+    fetch = data_processing.fetch_readings
+
+    async def counting_fetch(*args, **kwargs):
+        scans.append(args)
+        return await fetch(*args, **kwargs)
+
+    monkeypatch.setattr(data_processing, "fetch_readings", counting_fetch)
+
+    steps = [
+        # Listed before its input: execution follows the DAG, not the list
+        PipelineStep(
+            id="hot",
+            processor="threshold",
+            input="10min",
+            params={"limits": {"temperature_c": {"max": 27.0}}},
+        ),
+        PipelineStep(id="avg", processor="average"),
+        PipelineStep(id="pct", processor="percentile"),
+        PipelineStep(id="10min", processor="downsample", params={"bucket_seconds": 600}),
+        PipelineStep(id="hourly", processor="average", input="10min"),
+    ]
+    raw_count, results = await run_pipeline(
+        db_session, steps, START, START + timedelta(minutes=59)
+    )
+
+    assert len(scans) == 1
+    assert raw_count == 120
+    order = [step.id for step, _ in results]
+    assert order.index("10min") < order.index("hot")
+    assert order.index("10min") < order.index("hourly")
+
+    by_id = {step.id: processed for step, processed in results}
+    assert by_id["avg"].raw_count == 120
+    assert by_id["10min"].result["buckets"] == 12
+    # Bucket means are 24.5 for d1 and 34.5 for d2: only d2's buckets exceed 27
+    assert by_id["hot"].raw_count == 12
+    assert by_id["hot"].result["violations"] == 6
+    assert by_id["hot"].result["devices"] == ["d2"]
+    assert by_id["hourly"].result["count"] == 12
+    assert by_id["pct"].result["input"] == "raw"
+    assert by_id["hourly"].result["input"] == "10min"
+
+    stored = await db_session.scalar(select(func.count()).select_from(ProcessedData))
+    assert stored == 5
+
+
+@pytest.mark.parametrize(
+    ("steps", "message"),
+    [
+        ([PipelineStep(id="a", processor="average", input="b")], "unknown input"),
+        (
+            [
+                PipelineStep(id="a", processor="average"),
+                PipelineStep(id="b", processor="average", input="a"),
+            ],
+            "does not produce readings",
+        ),
+        (
+            [
+                PipelineStep(id="a", processor="downsample", input="b"),
+                PipelineStep(id="b", processor="downsample", input="a"),
+            ],
+            "cycle",
+        ),
+        ([PipelineStep(id="a", processor="downsample", params={"window": 5})], "no parameter"),
+        ([PipelineStep(id="a", processor="threshold")], "limits"),
+    ],
+)
+async def test_invalid_pipeline_is_rejected_before_writing(db_session, steps, message):
+    """Test invalid pipelines raise ValueError and store nothing."""
+    with pytest.raises(ValueError, match=message):
+        await run_pipeline(db_session, steps, START, START + timedelta(hours=1))
+
+    stored = await db_session.scalar(select(func.count()).select_from(ProcessedData))
+    assert stored == 0
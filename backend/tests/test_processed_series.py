@@ -0,0 +1,90 @@
+"""Tests for processed result series."""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from src.models import ProcessedMetric
+from src.services import data_processing
+from src.services.data_ingestion import insert_readings
+from src.services.data_processing import process_sensor_data, query_processed_series
+
+from .conftest import make_row
+
+START = datetime(2024, 1, 1)
+
+
+async def _seed(db_session) -> None:
+    """One reading per minute for three hours, warming by one degree per hour."""
+    rows = [
+        make_row("d1", START + timedelta(minutes=i), 20.0 + i // 60, humidity=50.0)
+        for i in range(180)
+    ]
+    await insert_readings(db_session, rows)
+
+
+async def _run_hourly(db_session, processor: str, hours: range, **kwargs) -> None:
+    for hour in hours:
+        window_start = START + timedelta(hours=hour)
+        await process_sensor_data(
+            db_session,
+            processor,
+            window_start,
+            window_start + timedelta(minutes=59),
+            device_id="d1",
+            **kwargs,
+        )
+
+
+async def test_series_returns_aligned_fields(db_session):
+    """Test chosen fields come back as arrays aligned on window end, newest run winning."""
+    await _seed(db_session)
+    await _run_hourly(db_session, "average", range(3))
+    await _run_hourly(db_session, "percentile", range(3))
+    # Re-run of the second hour and a filtered run: neither adds a point
+    await _run_hourly(db_session, "average", range(1, 2))
+    await _run_hourly(db_session, "downsample", range(1), params={"bucket_seconds": 600})
+
+    series = await query_processed_series(
+        db_session, "average", ["avg_temperature_c", "count", "missing"], device_id="d1"
+    )
+
+    assert series["count"] == 3
+    assert series["timestamps"] == [
+        START + timedelta(hours=hour, minutes=59) for hour in range(3)
+    ]
+    assert series["series"] == {
+        "avg_temperature_c": [20.0, 21.0, 22.0],
+        "count": [60.0, 60.0, 60.0],
+        "missing": [None, None, None],
+    }
+
+    nested = await query_processed_series(
+        db_session,
+        "percentile",
+        ["temperature_c.p50"],
+        device_id="d1",
+        start_time=START + timedelta(hours=1),
+    )
+    assert nested["series"]["temperature_c.p50"] == [21.0, 22.0]
+
+    # Results over all devices are a separate series
+    assert (await query_processed_series(db_session, "average", ["count"]))["count"] == 0
+    downsampled = await query_processed_series(
+        db_session, "downsample", ["buckets"], device_id="d1"
+    )
+    assert downsampled["count"] == 0
+
+
+async def test_rebuild_matches_recorded_metrics(db_session, monkeypatch):
+    """Test rebuilding from stored results gives the metrics recorded by the jobs."""
+    await _seed(db_session)
+    await _run_hourly(db_session, "average", range(3))
+    await db_session.commit()
+    recorded = await db_session.scalar(select(func.count()).select_from(ProcessedMetric))
+
+    await db_session.execute(ProcessedMetric.__table__.delete())
+    await db_session.commit()
+    monkeypatch.setattr(data_processing, "AsyncSessionLocal", lambda: db_session)
+    assert await data_processing.rebuild_processed_metrics() == recorded
+    assert await data_processing.rebuild_processed_metrics() == 0
@@ -0,0 +1,95 @@
+"""Tests for request profiling and the slow-query log."""
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.exc import DBAPIError
+
+from src import profiling
+from src.config import settings
+from src.models import SensorReading
+
+
+async def test_slow_query_log_records_plan(db_engine, db_session, monkeypatch):
+    """Test statements over the threshold are logged with their query plan."""
+    monkeypatch.setattr(settings, "slow_query_threshold_ms", 0.0)
+    monkeypatch.setattr(profiling, "slow_queries", profiling.deque(maxlen=10))
+    profiling.instrument_engine(db_engine, "test")
+
+    await db_session.execute(
+        select(SensorReading).where(SensorReading.device_id == "d1").limit(5)
+    )
+
+    entry = profiling.slow_queries[-1]
+    assert entry.database == "test"
+    assert entry.statement.lstrip().startswith("SELECT")
+    assert "d1" in entry.parameters
+    assert entry.plan
+
+
+async def test_failed_statement_leaves_no_profiling_start(db_engine, monkeypatch):
+    """Test a failing statement does not skew the next statement's recorded time."""
+    monkeypatch.setattr(settings, "slow_query_threshold_ms", 0.0)
+    monkeypatch.setattr(profiling, "slow_queries", profiling.deque(maxlen=10))
+    profiling.instrument_engine(db_engine, "test")
+
+    async with db_engine.connect() as conn:
+        with pytest.raises(DBAPIError):
+            await conn.execute(text("SELECT * FROM missing_table"))
+        await conn.execute(text("SELECT 1"))
+        info = conn.sync_connection.info
+
+    assert info["profiling_query_start"] == []
+    assert [entry.statement for entry in profiling.slow_queries] == ["SELECT 1"]
+
+
+async def test_middleware_profiles_admin_request(monkeypatch):
+    """Test a flagged request with the admin token gets Server-Timing phases."""
+    monkeypatch.setattr(settings, "admin_token", "secret")
+    monkeypatch.setattr(profiling, "profiles", profiling.deque(maxlen=10))
+
+    async def app(scope, receive, send):
+        with profiling.phase("serialization"):
+            body = b"ok"
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": body})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/api/v1/data/raw",
+        "query_string": b"profile=1",
+        "headers": [(b"x-admin-token", b"secret")],
+    }
+    await profiling.ProfilingMiddleware(app)(scope, receive, send)
+
+    headers = dict(sent[0]["headers"])
+    assert b"serialization;dur=" in headers[b"server-timing"]
+    assert b"total;dur=" in headers[b"server-timing"]
+    assert profiling.profiles[-1].profile_id == headers[b"x-profile-id"].decode()
+
+    # Without the token the request passes through unprofiled
+    sent.clear()
+    scope["headers"] = []
+    await profiling.ProfilingMiddleware(app)(scope, receive, send)
+    assert b"server-timing" not in dict(sent[0]["headers"])
+    assert len(profiling.profiles) == 1
+
+
+def test_admin_token_matches(monkeypatch):
+    """Test the admin token check rejects wrong, missing and unconfigured tokens."""
+    monkeypatch.setattr(settings, "admin_token", "secret")
+    assert profiling.admin_token_matches("secret")
+    assert profiling.admin_token_matches(b"secret")
+    assert not profiling.admin_token_matches("secreT")
+    assert not profiling.admin_token_matches(None)
+
+    monkeypatch.setattr(settings, "admin_token", "")
+    assert not profiling.admin_token_matches("")
@@ -0,0 +1,288 @@
+"""Query plan checks for every filter combination of the read paths.
+
+Each combination of optional filters the query services can generate runs
+against a seeded database while its SQL is captured, and every captured
+statement is explained on the same connection. A plan fails when it reads a
+table without an index or sorts in a temporary B-tree, i.e. when no index
+serves both the filters and the ORDER BY. An ordered walk of an index that
+the LIMIT cuts short (``SCAN ... USING INDEX``) passes. SQLite runs without
+ANALYZE statistics, as deployments do.
+
+Set QUERY_PLAN_POSTGRES_URL to an asyncpg URL of a scratch database to also
+check the plans on PostgreSQL (EXPLAIN after ANALYZE, with sequential scans
+and sorts disabled so any that remain mean no index can serve the query).
+"""
+
+import itertools
+import os
+import re
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+from typing import Any
+
+import pytest
+from sqlalchemy import event, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.database import Base, sync_indexes
+from src.models import ProcessedData, ProcessedMetric, SensorReading
+from src.services import tags
+from src.services.data_ingestion import fetch_readings, query_raw_data, query_raw_rows
+from src.services.data_processing import (
+    merge_percentiles,
+    metric_fields,
+    query_processed_data,
+    query_processed_rows,
+    query_processed_series,
+)
+
+from .conftest import make_row
+
+POSTGRES_URL = os.environ.get("QUERY_PLAN_POSTGRES_URL")
+
+ORIGIN = datetime(2024, 1, 1)
+DEVICES = 40
+READINGS_PER_DEVICE = 500
+SENSOR_TYPES = ("bme280", "bme680")
+PROCESSED_WINDOWS = 300
+PROCESSORS = ("average", "rolling_average", "percentile")
+
+# Tables whose reads are checked
+CHECKED_TABLES = ("sensor_readings", "processed_data", "processed_metrics")
+
+SQLITE_PROBLEMS = (re.compile(r"^SCAN (\w+)$"), re.compile(r"USE TEMP B-TREE"))
+POSTGRES_PROBLEMS = (
+    re.compile(r"Seq Scan on (\w+)"),
+    re.compile(r"^\s*(->\s*)?(Incremental )?Sort\b"),
+)
+
+
+def _reading_rows() -> list[dict[str, Any]]:
+    rows = []
+    for device in range(DEVICES):
+        sensor_type = SENSOR_TYPES[device % len(SENSOR_TYPES)]
+        for i in range(READINGS_PER_DEVICE):
+            rows.append(
+                make_row(
+                    f"dev-{device:03d}",
+                    ORIGIN + timedelta(minutes=5 * i, seconds=device),
+                    20.0 + i % 10,
+                    metadata={"well": f"W-{device % 4}"},
+                    sensor_type=sensor_type,
+                )
+            )
+    return rows
+
+
+async def _seed(db: AsyncSession) -> None:
+    """Readings, their series index, and processed results with their metrics."""
+    rows = _reading_rows()
+    await tags.record_series(db, rows)
+    await db.execute(insert(SensorReading.__table__), rows)
+
+    processed = []
+    for window in range(PROCESSED_WINDOWS):
+        for index, processor in enumerate(PROCESSORS):
+            start = ORIGIN + timedelta(hours=window)
+            processed.append(
+                ProcessedData(
+                    processor_name=processor,
+                    processor_version="1.0.0",
+                    start_time=start,
+                    end_time=start + timedelta(minutes=59),
+                    sensor_type=SENSOR_TYPES[window % len(SENSOR_TYPES)],
+                    device_id=None if window % 3 else f"dev-{window % DEVICES:03d}",
+                    result={"avg_temperature_c": 21.5, "count": 12},
+                    raw_count=12,
+                    created_at=start + timedelta(hours=1, seconds=index),
+                )
+            )
+    db.add_all(processed)
+    await db.flush()
+    await db.execute(
+        insert(ProcessedMetric.__table__),
+        [
+            {
+                "processed_id": item.id,
+                "field": field,
+                "processor_name": item.processor_name,
+                "sensor_type": item.sensor_type,
+                "device_id": item.device_id,
+                "start_time": item.start_time,
+                "end_time": item.end_time,
+                "value": value,
+            }
+            for item in processed
+            for field, value in metric_fields(item.result).items()
+        ],
+    )
+    await db.commit()
+
+
+@pytest.fixture(
+    params=[
+        "sqlite",
+        pytest.param(
+            "postgresql",
+            marks=pytest.mark.skipif(
+                not POSTGRES_URL, reason="QUERY_PLAN_POSTGRES_URL not set"
+            ),
+        ),
+    ]
+)
+async def plan_db(request):
+    """A seeded database of the requested backend, shared by one test."""
+    # The series index cache outlives each test's database
+    tags._indexed.clear()
+    url = "sqlite+aiosqlite:///:memory:" if request.param == "sqlite" else POSTGRES_URL
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+    async with sessionmaker() as db:
+        await _seed(db)
+        if request.param == "postgresql":
+            await db.execute(text("ANALYZE"))
+            await db.execute(text("SET enable_seqscan = off"))
+            await db.execute(text("SET enable_sort = off"))
+        yield db
+    tags._indexed.clear()
+    if request.param == "postgresql":
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+async def _plans(
+    db: AsyncSession, call: Callable[[AsyncSession], Awaitable[Any]]
+) -> list[tuple[str, list[str]]]:
+    """Run a service call and explain every checked SELECT it issued."""
+    connection = await db.connection()
+    captured: list[tuple[str, Any]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany) -> None:
+        if statement.lstrip().upper().startswith("SELECT") and any(
+            table in statement for table in CHECKED_TABLES
+        ):
+            captured.append((statement, parameters))
+
+    sync_engine = connection.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", capture)
+    try:
+        await call(db)
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", capture)
+
+    sqlite = connection.dialect.name == "sqlite"
+    plans = []
+    for statement, parameters in captured:
+        prefix = "EXPLAIN QUERY PLAN " if sqlite else "EXPLAIN "
+        result = await connection.exec_driver_sql(prefix + statement, parameters)
+        lines = [str(row[-1]) if sqlite else str(row[0]) for row in result]
+        plans.append((statement, lines))
+    return plans
+
+
+def _problems(dialect: str, lines: list[str]) -> list[str]:
+    patterns = SQLITE_PROBLEMS if dialect == "sqlite" else POSTGRES_PROBLEMS
+    return [line for line in lines if any(pattern.search(line) for pattern in patterns)]
+
+
+async def _assert_indexed(db: AsyncSession, label: str, call) -> None:
+    plans = await _plans(db, call)
+    assert plans, f"{label}: no statement captured"
+    dialect = (await db.connection()).dialect.name
+    for statement, lines in plans:
+        problems = _problems(dialect, lines)
+        assert not problems, f"{label}: {problems}\n{statement}\n" + "\n".join(lines)
+
+
+START = ORIGIN + timedelta(days=1)
+END = ORIGIN + timedelta(days=1, hours=6)
+
+
+def _combinations(**options: Any) -> list[dict[str, Any]]:
+    """Every subset of the optional filters, as keyword arguments."""
+    names = list(options)
+    return [
+        {name: options[name] for name, used in zip(names, mask) if used}
+        for mask in itertools.product((False, True), repeat=len(names))
+    ]
+
+
+async def test_raw_queries_use_indexes(plan_db):
+    """Test every raw-data filter combination is served by an index in timestamp order."""
+    combinations = _combinations(
+        sensor_type="bme280", device_id="dev-002", start_time=START, end_time=END
+    )
+    combinations += [
+        {**combination, "tags": {"well": "W-2"}}
+        for combination in _combinations(sensor_type="bme280", device_id="dev-002")
+    ]
+    for filters in combinations:
+        for service in (query_raw_data, query_raw_rows):
+            await _assert_indexed(
+                plan_db, f"{service.__name__}({filters})", lambda db: service(db, **filters)
+            )
+
+
+async def test_fetch_readings_uses_indexes(plan_db):
+    """Test the processing scan is served by an index for each scope."""
+    for filters in _combinations(device_id="dev-002", tags={"well": "W-2"}):
+        await _assert_indexed(
+            plan_db,
+            f"fetch_readings({filters})",
+            lambda db: fetch_readings(db, "bme280", START, END, **filters),
+        )
+
+
+async def test_processed_queries_use_indexes(plan_db):
+    """Test every processed-data filter combination avoids scans and sorts."""
+    combinations = _combinations(
+        processor_name="rolling_average", sensor_type="bme280", start_time=START, end_time=END
+    )
+    for filters in combinations:
+        for service in (query_processed_data, query_processed_rows):
+            await _assert_indexed(
+                plan_db, f"{service.__name__}({filters})", lambda db: service(db, **filters)
+            )
+
+
+async def test_processed_series_uses_indexes(plan_db):
+    """Test result series reads are index range scans for each scope."""
+    for filters in _combinations(device_id="dev-000", start_time=START, end_time=END):
+        await _assert_indexed(
+            plan_db,
+            f"query_processed_series({filters})",
+            lambda db: query_processed_series(
+                db, "average", ["avg_temperature_c", "count"], "bme280", **filters
+            ),
+        )
+
+
+async def test_merge_percentiles_uses_indexes(plan_db):
+    """Test stored percentile windows are read in merge order from an index."""
+    for device_id in (None, "dev-000"):
+        await _assert_indexed(
+            plan_db,
+            f"merge_percentiles(device_id={device_id})",
+            lambda db: merge_percentiles(db, START, END, "bme280", device_id),
+        )
+
+
+async def test_sync_indexes_upgrades_existing_tables(db_engine):
+    """Test indexes added to the models are created on existing tables and replaced ones dropped."""
+    async with db_engine.begin() as conn:
+        await conn.exec_driver_sql("DROP INDEX idx_sensor_time")
+        await conn.exec_driver_sql(
+            "CREATE INDEX idx_sensor_device ON sensor_readings (sensor_type, device_id)"
+        )
+        await conn.run_sync(sync_indexes)
+        rows = await conn.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'sensor_readings'"
+        )
+        names = {row[0] for row in rows}
+
+    assert names >= {index.name for index in SensorReading.__table__.indexes}
+    assert "idx_sensor_device" not in names
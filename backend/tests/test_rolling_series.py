@@ -0,0 +1,133 @@
+"""Tests for the rolling series processor."""
+
+import random
+import statistics
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.processors import RollingSeriesProcessor
+from src.schemas.processing import PipelineStep
+from src.services.data_ingestion import insert_readings
+from src.services.data_processing import run_pipeline
+
+from .conftest import make_row
+
+START = datetime(2024, 1, 1)
+
+
+def _readings(count: int, seed: int = 5) -> list[dict]:
+    """Two interleaved devices at irregular intervals, with some missing values."""
+    rng = random.Random(seed)
+    readings = []
+    timestamp = START
+    for i in range(count):
+        timestamp += timedelta(seconds=rng.choice((10, 30, 60, 90)))
+        readings.append(
+            make_row(
+                f"d{i % 2}",
+                timestamp,
+                None if rng.random() < 0.1 else rng.uniform(15, 30),
+                humidity=rng.uniform(30, 70),
+                pressure_hpa=1000 + rng.uniform(0, 25),
+            )
+        )
+    return readings
+
+
+def _last_five_minutes(device_rows: list[dict], row: dict) -> list[dict]:
+    return [r for r in device_rows if r["timestamp"] > row["timestamp"] - timedelta(seconds=300)]
+
+
+def _last_seven(device_rows: list[dict], row: dict) -> list[dict]:
+    return device_rows[-7:]
+
+
+@pytest.mark.parametrize(
+    ("params", "window_of"),
+    [({"window_seconds": 300}, _last_five_minutes), ({"window_count": 7}, _last_seven)],
+)
+async def test_rolling_series_matches_brute_force(params, window_of):
+    """Test one-pass sliding statistics match recomputing every window from scratch."""
+    readings = _readings(400)
+    processor = RollingSeriesProcessor(**params, stats=["mean", "min", "max", "std"])
+
+    derived = await processor.transform(readings, START, START + timedelta(days=1), "bme280")
+
+    assert len(derived) == len(readings)
+    for index, (reading, row) in enumerate(zip(readings, derived)):
+        device_rows = [
+            r for r in readings[: index + 1] if r["device_id"] == reading["device_id"]
+        ]
+        window = window_of(device_rows, reading)
+        assert row["count"] == len(window)
+        for name in ("temperature_c", "pressure_hpa"):
+            values = [r[name] for r in window if r[name] is not None]
+            if not values:
+                assert row[name] is None
+                continue
+            assert row[name] == pytest.approx(statistics.fmean(values), abs=1e-3)
+            assert row[f"{name}_min"] == pytest.approx(min(values), abs=1e-3)
+            assert row[f"{name}_max"] == pytest.approx(max(values), abs=1e-3)
+            assert row[f"{name}_std"] == pytest.approx(statistics.pstdev(values), abs=1e-3)
+
+
+async def test_rolling_series_result_is_stored_as_arrays():
+    """Test the stored result holds per-device arrays of the requested statistics."""
+    readings = _readings(10)
+    processor = RollingSeriesProcessor(window_count=3, measurements=["humidity"])
+
+    result = await processor.process(readings, START, START + timedelta(days=1), "bme280")
+
+    assert result["points"] == 10
+    assert result["devices"] == ["d0", "d1"]
+    arrays = result["series"]["d0"]
+    assert set(arrays) == {"timestamps", "count", "humidity"}
+    assert len(arrays["timestamps"]) == len(arrays["humidity"]) == 5
+    assert arrays["count"] == [1, 2, 3, 3, 3]
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {},
+        {"window_seconds": 60, "window_count": 5},
+        {"window_count": 0},
+        {"window_count": 5, "stats": ["median"]},
+    ],
+)
+def test_rolling_series_rejects_invalid_windows(params):
+    """Test exactly one valid window and known statistics are required."""
+    with pytest.raises(ValueError):
+        RollingSeriesProcessor(**params)
+
+
+async def test_pipeline_chains_downsample_rolling_series_threshold(db_session):
+    """Test a moving average over buckets feeds a threshold check."""
+    rows = [
+        # Warms by one degree every 10 minutes
+        make_row(
+            "d1", START + timedelta(minutes=i), 20.0 + i // 10, humidity=None, pressure_hpa=None
+        )
+        for i in range(60)
+    ]
+    await insert_readings(db_session, rows)
+
+    steps = [
+        PipelineStep(id="10min", processor="downsample", params={"bucket_seconds": 600}),
+        PipelineStep(
+            id="trend", processor="rolling_series", input="10min", params={"window_count": 2}
+        ),
+        PipelineStep(
+            id="warm",
+            processor="threshold",
+            input="trend",
+            params={"limits": {"temperature_c": {"max": 23.0}}},
+        ),
+    ]
+    _, results = await run_pipeline(db_session, steps, START, START + timedelta(minutes=59))
+
+    by_id = {step.id: processed.result for step, processed in results}
+    # Bucket means 20..25; two-bucket moving averages 20, 20.5, ..., 24.5
+    assert by_id["trend"]["series"]["d1"]["temperature_c"] == [20, 20.5, 21.5, 22.5, 23.5, 24.5]
+    assert by_id["warm"]["violations"] == 2
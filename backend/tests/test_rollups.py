@@ -0,0 +1,133 @@
+"""Tests for the prefix-sum rollups."""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from src.models import ReadingRollup
+from src.services import rollups
+from src.services.data_ingestion import insert_readings
+
+from .conftest import make_row
+
+
+def _expected(rows: list[dict], start: datetime, end: datetime) -> tuple[int, int, float]:
+    values = [r["temperature_c"] for r in rows if start <= r["timestamp"] <= end]
+    present = [v for v in values if v is not None]
+    return len(values), len(present), sum(present)
+
+
+async def test_period_totals_match_raw_with_late_data(db_session):
+    """Test rollup totals equal a raw aggregate, including after late readings."""
+    rng = random.Random(7)
+    origin = datetime(2024, 1, 1)
+    rows = [
+        make_row(
+            "d1",
+            origin + timedelta(minutes=rng.randrange(60 * 72)),
+            rng.choice([None, 20.0, 21.5]),
+        )
+        for _ in range(300)
+    ]
+    in_order = sorted(rows[:200], key=lambda r: r["timestamp"])
+    for offset in range(0, len(in_order), 50):
+        await insert_readings(db_session, in_order[offset : offset + 50])
+    # Late batch spread over the whole range
+    await insert_readings(db_session, rows[200:])
+    await db_session.commit()
+
+    periods = [
+        (origin + timedelta(minutes=30), origin + timedelta(hours=50, minutes=5)),
+        (origin, origin + timedelta(days=3)),
+        (origin + timedelta(hours=5, minutes=10), origin + timedelta(hours=5, minutes=40)),
+    ]
+    totals = await rollups.period_totals(db_session, "bme280", "d1", periods)
+
+    for (start, end), result in zip(periods, totals):
+        count, present, total = _expected(rows, start, end)
+        assert result[:2] == [count, present]
+        assert result[2] == pytest.approx(total)
+
+
+async def test_rebuild_matches_incremental(db_session, monkeypatch):
+    """Test rebuilding from readings gives the same running totals."""
+    origin = datetime(2024, 1, 1)
+    await insert_readings(
+        db_session,
+        [make_row("d1", origin + timedelta(minutes=25 * i), 20.0 + i) for i in range(10)],
+    )
+    await db_session.commit()
+    query = select(ReadingRollup).order_by(ReadingRollup.bucket_start)
+    incremental = [
+        (r.bucket_start, r.reading_count, r.temperature_c_sum)
+        for r in (await db_session.execute(query)).scalars()
+    ]
+
+    await db_session.execute(ReadingRollup.__table__.delete())
+    await db_session.commit()
+    monkeypatch.setattr(rollups, "AsyncSessionLocal", lambda: db_session)
+    assert await rollups.rebuild_rollups() == len(incremental)
+
+    db_session.expire_all()
+    rebuilt = [
+        (r.bucket_start, r.reading_count, r.temperature_c_sum)
+        for r in (await db_session.execute(query)).scalars()
+    ]
+    assert rebuilt == incremental
+
+
+async def test_device_summary_tiles(db_session):
+    """Test the summary returns every period with means over non-null values."""
+    end = datetime(2024, 3, 10, 12, 30)
+    await insert_readings(
+        db_session,
+        [
+            make_row("d1", end - timedelta(hours=2), 20.0),
+            make_row("d1", end - timedelta(days=3), None),
+            make_row("d1", end - timedelta(days=100), 30.0),
+        ],
+    )
+    await db_session.commit()
+
+    tiles = {
+        tile["period"]: tile
+        for tile in await rollups.device_summary(
+            db_session, "bme280", "d1", end, custom_start=end - timedelta(days=4)
+        )
+    }
+
+    assert list(tiles) == ["day", "week", "month", "six_months", "year", "ytd", "custom"]
+    assert tiles["day"]["reading_count"] == 1
+    assert tiles["week"]["reading_count"] == 2
+    assert tiles["week"]["temperature_c"] == {"count": 1, "sum": 20.0, "mean": 20.0}
+    assert tiles["six_months"]["temperature_c"]["mean"] == pytest.approx(25.0)
+    assert tiles["ytd"]["reading_count"] == 2
+    assert tiles["custom"]["reading_count"] == 2
+
+
+async def test_device_summary_converts_aware_bounds(db_session):
+    """Test aware bounds select the same periods as the equivalent naive UTC ones."""
+    end = datetime(2024, 3, 10, 12, 30)
+    await insert_readings(
+        db_session,
+        [
+            make_row("d1", end - timedelta(hours=2), 20.0),
+            # After the end, but inside a window whose offset was dropped
+            make_row("d1", end + timedelta(hours=1), 25.0),
+        ],
+    )
+    await db_session.commit()
+
+    offset = timezone(timedelta(hours=2))
+    aware_end = end.replace(tzinfo=timezone.utc).astimezone(offset)
+    aware = await rollups.device_summary(
+        db_session, "bme280", "d1", aware_end, custom_start=aware_end - timedelta(days=1)
+    )
+    naive = await rollups.device_summary(
+        db_session, "bme280", "d1", end, custom_start=end - timedelta(days=1)
+    )
+
+    assert aware == naive
+    assert aware[0]["reading_count"] == 1
@@ -0,0 +1,41 @@
+"""Tests for the fast JSON response path."""
+
+from datetime import datetime
+
+import orjson
+
+from src.schemas.sensor import BME280Reading, SensorReadingResponse
+from src.serialization import json_response
+from src.services.data_ingestion import create_sensor_readings, query_raw_rows
+
+
+async def test_raw_rows_match_response_model(db_session):
+    """Test row dictionaries encode exactly like SensorReadingResponse."""
+    readings = [
+        BME280Reading(
+            device_id="dev_1",
+            timestamp=datetime(2024, 1, 1, 0, 0, i, 250000),
+            temperature_c=21.5 + i,
+            humidity=40.0,
+            pressure_hpa=1013.25,
+            metadata={"site": "a"} if i else None,
+        )
+        for i in range(3)
+    ]
+    await create_sensor_readings(db_session, readings, "bme280")
+    await db_session.commit()
+
+    rows = await query_raw_rows(db_session, device_id="dev_1", limit=10)
+    body = orjson.loads(json_response({"count": len(rows), "data": rows}).body)
+
+    assert body["count"] == 3
+    assert [row["timestamp"] for row in body["data"]] == [
+        "2024-01-01T00:00:02.250000",
+        "2024-01-01T00:00:01.250000",
+        "2024-01-01T00:00:00.250000",
+    ]
+    for row in body["data"]:
+        expected = SensorReadingResponse.model_validate(
+            {**row, "extra_metadata": row["metadata"]}
+        ).model_dump(mode="json", by_alias=True)
+        assert row == expected
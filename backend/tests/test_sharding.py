@@ -0,0 +1,120 @@
+"""Tests for hash-sharded SQLite storage."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from src.models import DeviceState, SensorReading
+from src.schemas.sensor import BME280Reading
+from src.services import anomaly, data_ingestion, device_state, rollups, tags
+from src.sharding import ShardSet, shard_url
+
+from .conftest import make_row
+
+
+@pytest.fixture
+async def shards(tmp_path, monkeypatch):
+    """Three file-backed shards used by every service that reads or writes them."""
+    shard_set = ShardSet(f"sqlite+aiosqlite:///{tmp_path}/sensors.db", 3)
+    await shard_set.init()
+    for module in (data_ingestion, device_state, rollups, tags, anomaly):
+        monkeypatch.setattr(module, "shards", shard_set)
+    tags._indexed.clear()
+    yield shard_set
+    tags._indexed.clear()
+    await shard_set.dispose()
+
+
+async def _count(shards: ShardSet, model) -> int:
+    async def count(session) -> int:
+        return await session.scalar(select(func.count()).select_from(model))
+
+    return sum(await shards.gather(count))
+
+
+def test_shard_url_derives_file_per_shard():
+    """Test shard URLs are derived from the main database file name."""
+    assert shard_url("sqlite+aiosqlite:///./sensor_data.db", 2) == (
+        "sqlite+aiosqlite:///sensor_data.shard2.db"
+    )
+    with pytest.raises(ValueError):
+        shard_url("sqlite+aiosqlite:///:memory:", 0)
+
+
+@pytest.mark.asyncio
+async def test_sharded_ingest_and_merged_queries(shards, db_session):
+    """Test readings are routed per device and merged back in timestamp order."""
+    base = datetime(2025, 1, 1)
+    devices = [f"dev_{i}" for i in range(6)]
+    readings = [
+        BME280Reading(
+            device_id=devices[i % len(devices)],
+            temperature_c=20.0,
+            humidity=50.0,
+            pressure_hpa=1000.0,
+            timestamp=base + timedelta(minutes=i),
+        )
+        for i in range(60)
+    ]
+
+    assert await data_ingestion.create_sensor_readings(db_session, readings) == 60
+    assert len({shards.index_for(d) for d in devices}) > 1
+
+    latest = await data_ingestion.query_raw_data(db_session, limit=10)
+    assert [r.timestamp for r in latest] == [
+        base + timedelta(minutes=i) for i in range(59, 49, -1)
+    ]
+
+    single = await data_ingestion.query_raw_data(db_session, device_id="dev_1", limit=100)
+    assert len(single) == 10
+    assert {r.device_id for r in single} == {"dev_1"}
+
+    window = await data_ingestion.fetch_readings(
+        db_session, "bme280", base, base + timedelta(minutes=59)
+    )
+    timestamps = [r["timestamp"] for r in window]
+    assert len(window) == 60
+    assert timestamps == sorted(timestamps)
+
+
+async def test_summaries_are_written_with_each_shard(shards, db_session):
+    """Test summaries live in the device's shard and are read back across shards."""
+    base = datetime(2025, 1, 1)
+    devices = [f"dev_{i}" for i in range(6)]
+    rows = [
+        make_row(devices[i % 6], base + timedelta(minutes=i), metadata={"well": "W-1"})
+        for i in range(60)
+    ]
+    await data_ingestion.insert_readings(db_session, rows)
+
+    states = await device_state.list_device_states(db_session)
+    assert [(s.device_id, s.reading_count) for s in states] == [(d, 10) for d in devices]
+    # Nothing was written to the main database
+    assert await db_session.scalar(select(func.count()).select_from(DeviceState)) == 0
+
+    (totals,) = await rollups.period_totals(
+        db_session, "bme280", "dev_1", [(base, base + timedelta(hours=1))]
+    )
+    assert totals[0] == 10
+    series = await tags.list_series(db_session, tags={"well": "W-1"})
+    assert [s.device_id for s in series] == devices
+
+    tagged = await data_ingestion.query_raw_rows(db_session, tags={"well": "W-1"}, limit=5)
+    assert [r["timestamp"] for r in tagged] == [
+        base + timedelta(minutes=i) for i in range(59, 54, -1)
+    ]
+
+
+async def test_failed_shard_write_rolls_back_its_summaries(shards, db_session, monkeypatch):
+    """Test a shard transaction that fails leaves neither readings nor summaries behind."""
+
+    async def fail(db, rows) -> None:
+        raise RuntimeError("scoring failed")
+
+    monkeypatch.setattr(data_ingestion, "record_anomalies", fail)
+    with pytest.raises(RuntimeError):
+        await data_ingestion.insert_readings(db_session, [make_row("dev_1")])
+
+    assert await _count(shards, SensorReading) == 0
+    assert await _count(shards, DeviceState) == 0
@@ -0,0 +1,97 @@
+"""Tests for startup phases, warm-up and readiness."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import Response
+
+from src.routers import health
+from src.services import warmup
+from src.services.anomaly import AnomalyEngine
+from src.services.data_ingestion import insert_readings
+from src.startup import StartupTracker
+
+from .conftest import make_row
+
+
+async def test_tracker_times_phases_and_readiness():
+    """Test phases are recorded in order, failures are named and draining ends readiness."""
+    tracker = StartupTracker()
+    async with tracker.phase("init_db"):
+        pass
+    with pytest.raises(RuntimeError):
+        async with tracker.phase("warmup"):
+            raise RuntimeError("boom")
+
+    assert [name for name, _ in tracker.phases] == ["init_db"]
+    assert tracker.failed == "warmup"
+    assert not tracker.ready
+
+    tracker.mark_ready()
+    assert tracker.status()["ready"]
+    tracker.mark_draining()
+    assert not tracker.ready
+    assert tracker.status()["draining"]
+
+
+async def test_readiness_requires_startup_and_database(monkeypatch):
+    """Test readiness fails before startup completes and when the database check fails."""
+    tracker = StartupTracker()
+    monkeypatch.setattr(health, "startup", tracker)
+    checks = []
+
+    async def check_database(timeout: float) -> float:
+        checks.append(timeout)
+        if len(checks) > 1:
+            raise TimeoutError()
+        return 0.001
+
+    monkeypatch.setattr(health, "check_database", check_database)
+
+    response = Response()
+    body = await health.readiness(response)
+    assert response.status_code == 503
+    assert body["status"] == "not_ready"
+    assert checks == []
+
+    tracker.mark_ready()
+    response = Response()
+    body = await health.readiness(response)
+    assert response.status_code == 200
+    assert body["database"]["status"] == "connected"
+
+    response = Response()
+    body = await health.readiness(response)
+    assert response.status_code == 503
+    assert body["database"] == {"status": "unreachable", "error": "TimeoutError"}
+
+
+async def test_prime_anomaly_engine_restores_detector_state(db_session, monkeypatch):
+    """Test recent readings are replayed into the detectors without raising events."""
+    now = datetime.utcnow().replace(microsecond=0)
+    rows = [
+        make_row(
+            "d1",
+            now - timedelta(minutes=minute),
+            20.0 + minute % 3 * 0.1,
+            humidity=None,
+            pressure_hpa=None,
+        )
+        for minute in range(30, 0, -1)
+    ]
+    await insert_readings(db_session, rows)
+    await db_session.commit()
+
+    engine = AnomalyEngine(
+        alpha=0.1, warmup=20, z_threshold=4.0, rate_limits={}, flatline_readings=30
+    )
+    monkeypatch.setattr(warmup, "anomaly_engine", engine)
+    monkeypatch.setattr(warmup, "AsyncSessionLocal", lambda: db_session)
+
+    assert await warmup.prime_anomaly_engine() == 30
+    slot = engine.slots[("bme280", "d1", "temperature_c")]
+    assert slot.count == 30
+
+    # Warmed up: a jump is a spike on the first reading after the restart
+    events = engine.score([{**rows[-1], "timestamp": now, "temperature_c": 30.0}])
+    assert [event["kind"] for event in events] == ["spike"]
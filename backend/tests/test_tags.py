@@ -0,0 +1,159 @@
+"""Tests for the metadata tag index."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select, update
+
+from src.models import SensorReading
+from src.services import data_ingestion, tags
+from src.services.data_ingestion import (
+    fetch_readings,
+    insert_readings,
+    query_raw_data,
+    query_raw_rows,
+)
+from src.services.data_processing import process_sensor_data
+from src.services.hot_tier import HotTier
+
+from .conftest import make_row
+
+
+@pytest.fixture(autouse=True)
+def _clear_index_cache():
+    """Each test uses a fresh database, so start with an empty cache."""
+    tags._indexed.clear()
+    yield
+    tags._indexed.clear()
+
+
+def _row(device_id: str, timestamp: datetime, metadata: dict | None) -> dict:
+    return make_row(device_id, timestamp, metadata=metadata)
+
+
+async def _ingest(db_session) -> datetime:
+    start = datetime(2024, 1, 1)
+    await insert_readings(
+        db_session,
+        [
+            _row("d1", start, {"location": "office", "note": "x"}),
+            _row("d1", start + timedelta(minutes=1), {"location": "office"}),
+            _row("d2", start + timedelta(minutes=1), {"location": "office", "well": "INJ-1"}),
+            _row("d3", start, None),
+        ],
+    )
+    # d1 moves to the lab
+    await insert_readings(
+        db_session, [_row("d1", start + timedelta(minutes=5), {"location": "lab"})]
+    )
+    await db_session.commit()
+    return start
+
+
+async def test_tag_filters_resolve_devices_and_spans(db_session):
+    """Test filters match only readings that carried the tags."""
+    start = await _ingest(db_session)
+
+    office = await query_raw_rows(db_session, tags={"location": "office"})
+    assert sorted((r["device_id"], r["timestamp"]) for r in office) == [
+        ("d1", start),
+        ("d1", start + timedelta(minutes=1)),
+        ("d2", start + timedelta(minutes=1)),
+    ]
+
+    well = await fetch_readings(
+        db_session,
+        "bme280",
+        start,
+        start + timedelta(hours=1),
+        tags={"location": "office", "well": "INJ-1"},
+    )
+    assert [r["device_id"] for r in well] == ["d2"]
+    assert await query_raw_rows(db_session, tags={"location": "roof"}) == []
+
+    series = await tags.list_series(db_session, tags={"location": "lab"})
+    assert [(s.device_id, s.tags) for s in series] == [("d1", {"location": "lab"})]
+
+
+async def test_tag_filters_accept_aware_time_bounds(db_session):
+    """Test tagged reads clamp timezone-aware bounds to the naive stored spans."""
+    start = await _ingest(db_session)
+    aware = (start + timedelta(minutes=1)).replace(tzinfo=timezone.utc)
+
+    rows = await query_raw_rows(db_session, tags={"location": "office"}, start_time=aware)
+    assert sorted(r["device_id"] for r in rows) == ["d1", "d2"]
+
+    readings = await query_raw_data(
+        db_session, tags={"location": "office"}, end_time=aware, limit=2
+    )
+    assert sorted((r.device_id, r.timestamp) for r in readings) == [
+        ("d1", start + timedelta(minutes=1)),
+        ("d2", start + timedelta(minutes=1)),
+    ]
+
+
+async def test_returning_tag_set_excludes_the_readings_between(db_session, monkeypatch):
+    """Test a device that goes A -> B -> A matches A only for the A readings."""
+    tier = HotTier(retention=timedelta(days=36500), max_points_per_device=100)
+    tier.ready = True
+    monkeypatch.setattr(data_ingestion, "hot_tier", tier)
+    monkeypatch.setattr("src.services.hot_tier.hot_tier", tier)
+
+    start = datetime(2024, 1, 1)
+    for minutes, location in ((0, "office"), (5, "lab"), (10, "office")):
+        await insert_readings(
+            db_session,
+            [_row("d1", start + timedelta(minutes=minutes), {"location": location})],
+        )
+    await db_session.commit()
+    expected = [start, start + timedelta(minutes=10)]
+
+    office = await query_raw_rows(db_session, tags={"location": "office"})
+    assert sorted(r["timestamp"] for r in office) == expected
+
+    end = start + timedelta(hours=1)
+    cached = await fetch_readings(db_session, "bme280", start, end, tags={"location": "office"})
+    tier.enabled = False
+    from_db = await fetch_readings(db_session, "bme280", start, end, tags={"location": "office"})
+    assert [r["timestamp"] for r in from_db] == expected
+    assert cached == from_db
+
+
+async def test_rebuild_assigns_series_to_existing_readings(db_session):
+    """Test readings stored before series ids are backfilled by the rebuild."""
+    start = await _ingest(db_session)
+    await db_session.execute(update(SensorReading).values(series_id=None))
+    await db_session.commit()
+
+    assert await tags._rebuild(db_session) == 5
+    unassigned = await db_session.scalar(
+        select(func.count()).where(SensorReading.series_id.is_(None))
+    )
+    assert unassigned == 0
+    office = await query_raw_rows(db_session, tags={"location": "office"})
+    assert sorted((r["device_id"], r["timestamp"]) for r in office) == [
+        ("d1", start),
+        ("d1", start + timedelta(minutes=1)),
+        ("d2", start + timedelta(minutes=1)),
+    ]
+
+
+async def test_processing_with_tags(db_session):
+    """Test processing jobs can target a tag and record it."""
+    start = await _ingest(db_session)
+
+    processed = await process_sensor_data(
+        db_session, "average", start, start + timedelta(hours=1), tags={"location": "office"}
+    )
+
+    assert processed.raw_count == 3
+    assert processed.result["tags"] == {"location": "office"}
+
+
+def test_parse_tag_filters_rejects_unindexed_keys():
+    """Test malformed filters and keys outside TAG_KEYS are rejected."""
+    assert tags.parse_tag_filters(["well=INJ-1"]) == {"well": "INJ-1"}
+    with pytest.raises(ValueError, match="key=value"):
+        tags.parse_tag_filters(["office"])
+    with pytest.raises(ValueError, match="not indexed"):
+        tags.parse_tag_filters(["note=x"])